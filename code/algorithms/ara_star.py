@@ -0,0 +1,282 @@
+import time
+
+from code.algorithms.astar2 import RushHourAStar2, default_heuristic_settings
+from code.algorithms.bucket_queue import BucketQueue
+from code.game.bitboard import BitBoard
+from code.game.rush_hour import RushHour
+from code.game.state import BoardSpec
+
+
+class RushHourARAStar:
+    """
+    Anytime repairing A* (ARA*) for the rush hour game. The search starts with
+    the heuristic multiplied by a high weight, which finds a first solution
+    quickly, and then lowers the weight step by step. Every next search goes
+    on from the states, g values and open list of the previous one instead of
+    starting over, and every shorter solution is handed to the caller as soon
+    as it is found, together with a bound on how far it can be from optimal.
+    """
+
+    def __init__(self, initial_state, initial_weight=5, weight_step=1, final_weight=1, time_limit=None, min_slides=False, **heuristic_settings):
+        """
+        Set up the solver. The heuristic settings are passed on to
+        RushHourAStar2, whose heuristics are used. Without settings the
+        distance to the exit and the directly blocking cars are used, or in
+        minimum slides mode the slide blocking heuristic. These never
+        overestimate, so the bounds that are reported hold.
+
+        Parameters:
+        initial_state (RushHour): The initial state of the game.
+        initial_weight (float): The weight of the heuristic in the first search.
+        weight_step (float): How much the weight is lowered after every search.
+        final_weight (float): The lowest weight, 1 gives an optimal solution at the end.
+        time_limit (float): Stop after this many seconds, or None to run until optimal.
+        min_slides (bool): Count a slide of any distance as one move.
+        """
+        self.initial_state = initial_state
+
+        if not heuristic_settings:
+            heuristic_settings = default_heuristic_settings(min_slides)
+        self.heuristics = RushHourAStar2(initial_state, **heuristic_settings)
+
+        # the static vehicle specs shared by all compact states, and the
+        # bitboard for their moves
+        self.spec = BoardSpec(initial_state)
+        self.bitboard = BitBoard(initial_state)
+
+        # weight schedule and time budget
+        self.initial_weight = initial_weight
+        self.weight_step = weight_step
+        self.final_weight = final_weight
+        self.time_limit = time_limit
+
+        # count a slide of any distance as one move if asked for
+        self.min_slides = min_slides
+
+        # keep track of visited states
+        self.states_visited = 0
+
+    def solutions(self):
+        """
+        Run the searches with lower and lower weights and yield the best
+        solution after every search in which it got shorter or in which its
+        bound got tighter.
+
+        Returns:
+        generator of tuple: The moves (vehicle name, distance) of the solution,
+        the weight of the search that found it and the bound, the solution is
+        at most bound times as long as the shortest one.
+        """
+        start_time = time.time()
+
+        initial_state = self.spec.encode(self.initial_state)
+
+        # the g values and predecessors are kept over all searches
+        self.g_values = {initial_state: 0}
+        self.predecessors = {initial_state: None}
+
+        # the goal state with the shortest path found so far, and the length
+        # and bound of the last solution that was handed out
+        solution_length = None
+        solution_bound = None
+        self.goal_state = initial_state if self.spec.is_win(initial_state) else None
+
+        weight = self.initial_weight
+        open_states = {initial_state}
+
+        # in minimum slides mode a slide of any distance costs one move
+        legal_moves = self.bitboard.legal_slides if self.min_slides else self.bitboard.legal_moves
+
+        while True:
+            # the open states are queued again on their key for this weight
+            open_list = BucketQueue(scale=100, best_g=self.g_values)
+            for state in open_states:
+                open_list.push(state, self.key(state, weight), self.g_values[state])
+
+            # states that get a lower g after they were expanded wait for the next search
+            closed = set()
+            inconsistent = set()
+
+            # expand until no open state can lead to a shorter solution
+            while not open_list.empty():
+                if self.goal_state is not None and self.g_values[self.goal_state] <= open_list.min_f():
+                    break
+                if self.time_limit is not None and time.time() - start_time > self.time_limit:
+                    break
+
+                popped = open_list.pop()
+                if popped is None:
+                    break
+                current_state, current_g = popped
+                open_states.discard(current_state)
+                closed.add(current_state)
+
+                for i, distance in legal_moves(current_state):
+                    next_state = current_state.move(i, distance)
+                    next_g = current_g + 1
+
+                    if next_g >= self.g_values.get(next_state, float('inf')):
+                        continue
+
+                    self.g_values[next_state] = next_g
+                    self.predecessors[next_state] = current_state
+                    self.states_visited += 1
+
+                    # a goal is never expanded, it only tightens the solution
+                    if self.spec.is_win(next_state):
+                        if self.goal_state is None or next_g < self.g_values[self.goal_state]:
+                            self.goal_state = next_state
+                        continue
+
+                    if next_state in closed:
+                        inconsistent.add(next_state)
+                    else:
+                        open_states.add(next_state)
+                        open_list.push(next_state, self.key(next_state, weight), next_g)
+
+            out_of_time = self.time_limit is not None and time.time() - start_time > self.time_limit
+
+            if self.goal_state is None:
+                print("No solution found within the time limit." if out_of_time else "No solution found.")
+                return
+
+            open_states |= inconsistent
+
+            # only hand out a solution when it is shorter or its bound is tighter
+            bound = self.suboptimality_bound(open_states, weight)
+            if solution_length is None or self.g_values[self.goal_state] < solution_length or bound < solution_bound:
+                solution_length = self.g_values[self.goal_state]
+                solution_bound = bound
+                yield self.calculate_moves(self.backtrack_path(self.goal_state)), weight, bound
+
+            # the solution is proven optimal, the schedule is done or the time is up
+            if bound <= 1 or weight <= self.final_weight or out_of_time:
+                return
+
+            weight = max(self.final_weight, weight - self.weight_step)
+
+    def key(self, state, weight):
+        """
+        Calculate the key of a state in the open list for the given weight.
+
+        Parameters:
+        state (State): The compact state.
+        weight (float): The weight of the heuristic.
+
+        Returns:
+        float: g plus the weighted heuristic value.
+        """
+        return self.g_values[state] + weight * self.heuristic(state)
+
+    def heuristic(self, state):
+        """
+        Calculate the heuristic value of a compact state with the heuristics of
+        astar2. The deadlock penalty of astar2 can make the value negative, which
+        is not useful in a weighted key, so it is at least 0.
+
+        Parameters:
+        state (State): The compact state.
+
+        Returns:
+        int: The heuristic value.
+        """
+        table = self.heuristics.transposition_table
+        if state not in table:
+            self.heuristics.combined_heuristics(self.spec.decode(state), state)
+        return max(0, table[state])
+
+    def suboptimality_bound(self, open_states, weight):
+        """
+        Calculate how many times longer than the shortest solution the current
+        solution can be at most. Every shorter solution has to pass through an
+        open state, so the lowest unweighted f of the open states is a lower
+        bound on the shortest solution.
+
+        Parameters:
+        open_states (set of State): The open and inconsistent states.
+        weight (float): The weight of the search that just ended.
+
+        Returns:
+        float: The bound, 1 if the solution is the shortest.
+        """
+        solution_g = self.g_values[self.goal_state]
+        lower_bound = min((self.g_values[state] + self.heuristic(state) for state in open_states), default=solution_g)
+
+        if lower_bound >= solution_g:
+            return 1
+        if lower_bound <= 0:
+            return weight
+        return min(weight, solution_g / lower_bound)
+
+    def backtrack_path(self, goal_state):
+        """
+        Backtrack from the goal state to the initial state.
+
+        Parameters:
+        goal_state (State): The goal state.
+
+        Returns:
+        list of State: The path from the initial state to the goal state.
+        """
+        path = []
+        current_state = goal_state
+        while current_state is not None:
+            path.append(current_state)
+            current_state = self.predecessors[current_state]
+        return path[::-1]
+
+    def calculate_moves(self, solution_path):
+        """
+        Calculate the moves made along a path of compact states.
+
+        Parameters:
+        solution_path (list of State): The states from the initial state to the goal state.
+
+        Returns:
+        list of tuple: The moves (vehicle name, distance).
+        """
+        return [self.spec.move_between(solution_path[i - 1], solution_path[i]) for i in range(1, len(solution_path))]
+
+    def ara_star(self):
+        """
+        Run the anytime search, print every solution as it comes in and return
+        the last one.
+
+        Returns:
+        list of tuple: The moves of the shortest solution found, or None.
+        """
+        print("Starting ARA*...")
+        print("Initial Board:")
+        self.initial_state.display_board()
+
+        start_time = time.time()
+        best_moves = None
+
+        for moves, weight, bound in self.solutions():
+            best_moves = moves
+            print(f"Solution of {len(moves)} moves with weight {weight}, at most {bound:.2f} times "
+                  f"the shortest, after {time.time() - start_time:.2f} seconds")
+
+        print(f"Number of states visited: {self.states_visited}")
+        return best_moves
+
+
+if __name__ == "__main__":
+
+    rush_hour_game = RushHour()
+
+    solver = RushHourARAStar(rush_hour_game)
+    start_time = time.time()
+    solution_path = solver.ara_star()
+    end_time = time.time()
+
+    if solution_path is not None:
+        print("Solution sequence of moves:")
+        for move in solution_path:
+            print(move)
+        print(f"Solution found in {len(solution_path)} moves!")
+
+        elapsed_time = end_time - start_time
+        print(f"Time taken to solve the board: {elapsed_time:.2f} seconds")
+    else:
+        print("No solution found.")
@@ -1,20 +1,47 @@
-from queue import PriorityQueue
 import copy
+from code.algorithms.bucket_queue import BucketQueue
+from code.algorithms.incremental_heuristics import IncrementalHeuristics
 from code.game.rush_hour import RushHour, Vehicle
-import pandas as pd
+from code.game.bitboard import BitBoard
+from code.game.compiler import compile_board
+from code.game.state import BoardSpec
+from code.game.loader import parse_board_csv
 import time
 
 
 
 class RushHourAStar:
+
+    # The f values are multiplied by this before they are rounded for the open list
+    F_SCALE = 10000
  
-    def __init__(self, initial_state):
+    def __init__(self, initial_state, use_bitboard=False, use_compiled=False, min_slides=False, use_incremental_heuristics=False, budget=None):
         """
         In this method we initialize the variables needed later.
         """
         # Initial state and number of states
         self.initial_state = initial_state
         self.num_of_states = 0
+
+        # Use the bitboard engine for move generation if asked for, or the
+        # move generator compiled for this board which replaces it
+        if use_compiled:
+            self.bitboard = compile_board(initial_state)
+        else:
+            self.bitboard = BitBoard(initial_state) if use_bitboard else None
+
+        # The static vehicle specs shared by all compact states
+        self.spec = BoardSpec(initial_state)
+
+        # Count a slide of any distance as one move if asked for
+        self.min_slides = min_slides
+
+        # Update the heuristic of a successor from the components of its
+        # parent and the move between them if asked for
+        self.incremental_heuristics = IncrementalHeuristics(self.spec) if use_incremental_heuristics else None
+
+        # The limits of the search, a SearchBudget, or None to run until done
+        self.budget = budget
         
         
     def a_star(self):
@@ -26,52 +53,94 @@ class RushHourAStar:
         print("Initial Board:")
         self.initial_state.display_board()
         
-        # Save visited states
-        visited = set()
-        
         # Keep track of time
         start_time = time.time()
         
-        # Queue to manage AStar frontier
-        priority_queue = PriorityQueue()
-        
-        # Initial state with heuristic added to queue
-        priority_queue.put((self.heuristics(self.initial_state), self.initial_state))
-        visited.add(self.initial_state.get_state_hashable())
+        initial_state = self.spec.encode(self.initial_state)
         
         # Dictionary to store the predecessor of each state
-        predecessors = {self.initial_state.get_state_hashable(): None}
+        predecessors = {}
+        predecessors[initial_state] = None
         
-        # Dictionary to store g scores 
-        g_scores = {self.initial_state.get_state_hashable(): 0}
+        # Dictionary to store g scores, its keys are the visited states
+        g_scores = {}
+        g_scores[initial_state] = 0
+
+        # Queue to manage AStar frontier, it only holds compact states. The f values
+        # are scaled so the small dynamic component of the heuristic still counts,
+        # and entries of states that were reached again with a lower g are skipped
+        priority_queue = BucketQueue(scale=self.F_SCALE, best_g=g_scores)
+        
+        # The heuristic components of the queued states, for incremental heuristics
+        heuristic_components = {}
+        if self.incremental_heuristics is not None:
+            heuristic_components[initial_state] = self.incremental_heuristics.initial(self.initial_state)
+
+        # Initial state with heuristic added to queue
+        initial_heuristic = self.heuristics(self.initial_state)
+        priority_queue.push(initial_state, initial_heuristic, 0)
+
+        # The budget also remembers the state with the lowest heuristic so far
+        budget = self.budget
+        if budget is not None:
+            budget.start()
+            budget.consider(initial_state, initial_heuristic)
+
+        # In minimum slides mode a slide of any distance costs one move
+        generate_next_states = self.generate_next_slide_states if self.min_slides else self.generate_next_states
 
         while not priority_queue.empty():
             
-            # Dequeue the next state
-            current_state = priority_queue.get()[1]
+            # Dequeue the next state, stop if only stale entries were left
+            popped = priority_queue.pop()
+            if popped is None:
+                break
+            current_state, current_g = popped
+
+            # Stop with the best state so far if the budget has run out
+            if budget is not None and budget.expand():
+                return budget.partial_result(self.spec)
 
             # Check if current state is the goal state
-            if self.check_win(current_state):
+            if self.spec.is_win(current_state):
                 print("Winning state found!")
                 print(f"Time taken to solve the board: {round(time.time() - start_time, 2)} seconds")
                 print(f"Number of states visited: {self.num_of_states}")
-                current_state.display_board()
+                self.spec.decode(current_state).display_board()
                 
                 # Return the path to the solution
                 return self.backtrack_path(current_state, predecessors)
             
-            # Generate and enqueue all possible next states from the current state
-            for next_state in self.generate_next_states(current_state):
-                state_hash = next_state.get_state_hashable()
+            current_game = self.spec.decode(current_state)
+
+            # The components of the current state, from scratch if it has none stored,
+            # like a state that is queued again after it was expanded
+            current_components = None
+            if self.incremental_heuristics is not None:
+                current_components = heuristic_components.pop(current_state, None)
+                if current_components is None:
+                    current_components = self.incremental_heuristics.initial(current_game)
+
+            # Generate and enqueue all possible next states from the full board of the current state
+            for next_game in generate_next_states(current_game):
+                next_state = self.spec.encode(next_game)
                 
                 # Get g scores
-                tentative_g_score = g_scores[current_state.get_state_hashable()] + 1
+                tentative_g_score = current_g + 1
                 
-                if state_hash not in visited or tentative_g_score < g_scores[state_hash]:
-                    visited.add(state_hash)
-                    g_scores[state_hash] = tentative_g_score
-                    priority_queue.put((tentative_g_score + self.heuristics(next_state), next_state))
-                    predecessors[state_hash] = current_state
+                if next_state not in g_scores or tentative_g_score < g_scores[next_state]:
+                    g_scores[next_state] = tentative_g_score
+                    if current_components is not None:
+                        vehicle_name, distance = self.spec.move_between(current_state, next_state)
+                        next_components = self.incremental_heuristics.update(current_components, next_game, self.spec.index[vehicle_name], distance)
+                        heuristic_components[next_state] = next_components
+                        heuristic_value = self.heuristics_from_components(next_game, next_components)
+                    else:
+                        heuristic_value = self.heuristics(next_game)
+                    priority_queue.push(next_state, tentative_g_score + heuristic_value, tentative_g_score)
+                    if budget is not None:
+                        budget.consider(next_state, heuristic_value)
+                    predecessors[next_state] = current_state
                     self.num_of_states += 1 
 
         print("No solution found.")
@@ -111,6 +180,34 @@ class RushHourAStar:
         return (distance_to_exit + deadlock_penalty + blocking_cars_in_row * weight + indirect_blocking_cars + dynamic_component)
     
     
+    def heuristics_from_components(self, state, components):
+        """
+        Heuristic function from the heuristic components of a state, the
+        same value as heuristics without looking at the whole board.
+
+        Parameters:
+        state (RushHour): The state to evaluate.
+        components (HeuristicComponents): The heuristic components of the state.
+
+        Returns:
+        int: Heuristic value.
+        """
+        red_car = state.vehicles.get('X')
+
+        # Calculate the red car's distance to exit
+        distance_to_exit = state.board_size - (red_car.col + red_car.length)
+
+        # The deadlock penalty is minus the number of full rows and columns
+        deadlock_penalty = -components.full_lines
+
+        weight = 100 # This factor can be changed, the same as in heuristics
+
+        # Dynamic component, increases as number of states increaases
+        dynamic_component = self.num_of_states * 0.0001 # This factor can be changed
+
+        return (distance_to_exit + deadlock_penalty + components.row_blockers * weight + components.indirect + dynamic_component)
+    
+
     def indirect_blocking_cars_heuristic(self, state):
         """
         Calculate the number of cars that are indirectly blocking the
@@ -192,6 +289,9 @@ class RushHourAStar:
         Returns:
         bool: True if it's a winning state, False otherwise.
         """
+        # The bitboard only has to look at the red car offset
+        if self.bitboard is not None:
+            return self.bitboard.check_win(state)
 
         red_car = state.vehicles.get('X')
         if not red_car:
@@ -214,6 +314,9 @@ class RushHourAStar:
         Returns:
         list of State: A list of all possible next states.
         """
+        # Let the bitboard decide the legal moves if it is enabled
+        if self.bitboard is not None:
+            return self.bitboard.generate_next_states(current_state)
 
         # List of states
         next_states = []
@@ -240,6 +343,29 @@ class RushHourAStar:
         return next_states
 
 
+    def generate_next_slide_states(self, current_state):
+        """
+        Generate all next states in which one vehicle slid any distance.
+
+        Parameters:
+        current_state (RushHour): The current state of the game.
+
+        Returns:
+        list of RushHour: A list of all states one slide away.
+        """
+        # Let the bitboard decide the legal slides if it is enabled
+        if self.bitboard is not None:
+            return self.bitboard.generate_next_states(current_state, slides=True)
+
+        next_states = []
+        for vehicle_name, distance in current_state.iter_slides():
+            new_state = clone_rush_hour_state(current_state)
+            new_state.move_vehicle(vehicle_name, distance)
+            next_states.append(new_state)
+
+        return next_states
+
+
     def calculate_new_position(self, vehicle, distance):
         if vehicle.orientation == 'H':
             return vehicle.row, vehicle.col + distance
@@ -256,14 +382,14 @@ class RushHourAStar:
         goal_state (State): The goal state from which to start backtracking.
 
         Returns:
-        list of State: The path from the initial state to the goal state.
+        list of RushHour: The path from the initial state to the goal state.
         """
         # Store the path
         path = []
         current_state = goal_state
-        while current_state:
-            path.append(current_state)
-            current_state = predecessors.get(current_state.get_state_hashable())
+        while current_state is not None:
+            path.append(self.spec.decode(current_state))
+            current_state = predecessors.get(current_state)
         # Reverse the path to start from the initial state
         return path[::-1]
     
@@ -274,11 +400,12 @@ def read_all_vehicles_bfs(file_path):
     for the vehicles such as name, orientation, length, starting column
     and starting row. Furthermore we add the vehicle instance to the dictionary.
     """
-    rush_hour_file = pd.read_csv(file_path)
+    with open(file_path) as file:
+        rush_hour_file = parse_board_csv(file)
     vehicles = {}
 
     # Loops through the csv file and assigns the values to variables
-    for car in rush_hour_file.values:
+    for car in rush_hour_file:
         name = car[0]
         orientation = car[1]
 
@@ -312,6 +439,9 @@ def clone_rush_hour_state(rush_hour_state):
         cloned_vehicle = Vehicle(vehicle.name, vehicle.length, vehicle.orientation, vehicle.row, vehicle.col)
         cloned_game.vehicles[name] = cloned_vehicle
 
+    # The vehicles are not added again, so copy the zobrist hash
+    cloned_game.zobrist_hash = rush_hour_state.zobrist_hash
+
     return cloned_game
     
     
@@ -1,12 +1,24 @@
-from queue import PriorityQueue
 import copy
+import struct
+from code.algorithms.bucket_queue import BucketQueue
+from code.algorithms.checkpoint import board_fingerprint
+from code.algorithms.incremental_heuristics import IncrementalHeuristics
+from code.algorithms.pattern_database import PatternDatabaseHeuristic
 from code.game.rush_hour import RushHour, Vehicle
+from code.game.bitboard import BitBoard
+from code.game.compiler import compile_board
+from code.game.state import BoardSpec, State
 import time
-import cProfile
 
 
 class RushHourAStar2:
-    def __init__(self, initial_state, use_distance_heuristic=False, use_direct_blocking_heuristic=False, use_indirect_blocking_heuristic=False, use_car_mobility_heuristic=False, use_deadlock_penalty=False, distance_weight=1, direct_blocking_weight=1, indirect_blocking_weight=1, car_mobility_weight=1):
+
+    # A checkpoint stores the g and the heuristic value of every queued state,
+    # and the g at which every expanded state was expanded
+    CHECKPOINT_RECORD = struct.Struct('<Id')
+    EXPANDED_RECORD = struct.Struct('<I')
+
+    def __init__(self, initial_state, use_distance_heuristic=False, use_direct_blocking_heuristic=False, use_indirect_blocking_heuristic=False, use_car_mobility_heuristic=False, use_deadlock_penalty=False, distance_weight=1, direct_blocking_weight=1, indirect_blocking_weight=1, car_mobility_weight=1, use_pattern_database_heuristic=False, pattern_database_weight=1, pattern_databases=None, pattern_combination='max', use_slide_blocking_heuristic=False, slide_blocking_weight=1, f_scale=1, use_bitboard=False, use_compiled=False, min_slides=False, use_batched_heuristics=False, use_incremental_heuristics=False, budget=None, checkpoint=None):
 
         self.initial_state = initial_state
 
@@ -20,6 +32,18 @@ class RushHourAStar2:
         self.direct_blocking_weight = direct_blocking_weight
         self.indirect_blocking_weight = indirect_blocking_weight
         self.car_mobility_weight = car_mobility_weight
+        self.use_pattern_database_heuristic = use_pattern_database_heuristic
+        self.pattern_database_weight = pattern_database_weight
+        self.use_slide_blocking_heuristic = use_slide_blocking_heuristic
+        self.slide_blocking_weight = slide_blocking_weight
+        self.pattern_databases = pattern_databases
+        self.pattern_combination = pattern_combination
+
+        # the pattern databases are built once for this board and then read
+        # from disk, pattern_databases is a list of vehicle name lists or None
+        # to choose them automatically
+        if use_pattern_database_heuristic:
+            self.pattern_database = PatternDatabaseHeuristic(initial_state, pattern_databases, pattern_combination, min_slides)
 
         # keep track of visited states
         self.states_visited = 0
@@ -27,6 +51,44 @@ class RushHourAStar2:
         # initialise transposition table
         self.transposition_table = {}
 
+        # the f values are integers for integer weights, other weights are
+        # scaled by this before they are rounded for the open list
+        self.f_scale = f_scale
+
+        # use the bitboard engine for move generation if asked for, or the
+        # move generator compiled for this board which replaces it
+        if use_compiled:
+            self.bitboard = compile_board(initial_state)
+        else:
+            self.bitboard = BitBoard(initial_state) if use_bitboard else None
+
+        # the static vehicle specs shared by all compact states
+        self.spec = BoardSpec(initial_state)
+
+        # compute the heuristics of all successors of an expansion at once
+        # with NumPy if asked for, which is only imported then
+        self.use_batched_heuristics = use_batched_heuristics
+        self.batch_heuristics = None
+        if use_batched_heuristics:
+            from code.algorithms.batch_heuristics import BatchHeuristics
+            self.batch_heuristics = BatchHeuristics(self.spec)
+
+        # update the heuristics of a successor from the components of its
+        # parent and the move between them if asked for, this replaces the
+        # batched evaluation
+        self.use_incremental_heuristics = use_incremental_heuristics
+        self.incremental_heuristics = IncrementalHeuristics(self.spec) if use_incremental_heuristics else None
+
+        # count a slide of any distance as one move if asked for
+        self.min_slides = min_slides
+
+        # the limits of the search, a SearchBudget, or None to run until done
+        self.budget = budget
+
+        # save the progress to disk now and then, a SearchCheckpoint, and
+        # resume from it if it holds a checkpoint of this search
+        self.checkpoint = checkpoint
+
 
     def astar(self):
         """
@@ -41,41 +103,89 @@ class RushHourAStar2:
         print("Initial Board:")
         self.initial_state.display_board()
 
-        # save visited states
-        visited = set()
-        # priority queue for heuristics
-        queue = PriorityQueue()
+        # the lowest g found for every state, its keys are the visited states
+        g_scores = {}
+        # priority queue for heuristics, bucketed on the integer f value.
+        # a state reached again with a lower g is queued again, and the
+        # entries with its old g are skipped
+        queue = BucketQueue(scale=self.f_scale, best_g=g_scores)
 
         initial_g = 0  # cost from initial state to current state
 
-        initial_heuristic = self.combined_heuristics(self.initial_state)
+        # the queue and dictionaries only hold compact states
+        initial_state = self.spec.encode(self.initial_state)
+
+        initial_heuristic = self.combined_heuristics(self.initial_state, initial_state)
 
         initial_f = initial_g + initial_heuristic
 
-        # add the initial state to the queue
-        queue.put((initial_f, self.initial_state, initial_g))
+        # Dictionary to store the predecessor of each state
+        predecessors = {}
 
+        # the heuristic components of the queued states, for incremental heuristics
+        heuristic_components = {}
+        if self.incremental_heuristics is not None:
+            heuristic_components[initial_state] = self.incremental_heuristics.initial(self.initial_state)
 
-        visited.add(self.initial_state.get_state_hashable())
+        # continue from the checkpoint if there is one
+        checkpoint = self.checkpoint
+        restored = None
+        if checkpoint is not None:
+            restored = checkpoint.restore(self.checkpoint_fingerprint())
 
-        # Dictionary to store the predecessor of each state
-        predecessors = {self.initial_state.get_state_hashable(): (None, 0)}
+        if restored is not None:
+            self.restore_checkpoint(restored, queue, g_scores, predecessors)
+        else:
+            # add the initial state to the queue
+            g_scores[initial_state] = initial_g
+            queue.push(initial_state, initial_f, initial_g)
+            predecessors[initial_state] = (None, 0)
+            if checkpoint is not None:
+                checkpoint.append('discovered', initial_state + initial_state + self.CHECKPOINT_RECORD.pack(initial_g, initial_heuristic))
 
         # debugging
         print("Starting BFS...")
 
+        # in minimum slides mode a slide of any distance costs one move
+        generate_next_states = self.generate_next_slide_states if self.min_slides else self.generate_next_states
+
+        # the budget also remembers the state with the lowest heuristic so far
+        budget = self.budget
+        if budget is not None:
+            budget.start()
+            budget.consider(initial_state, initial_heuristic)
+
         while not queue.empty():
-            # dequeue the next state (with the lowest heuristic value)
-            _, current_state, g_value = queue.get()
+            # every state we found and expanded is in the journals, so this is a good moment to save
+            if checkpoint is not None and checkpoint.due():
+                checkpoint.save({'states_visited': self.states_visited})
+
+            # dequeue the next state (with the lowest heuristic value), stop if only stale entries were left
+            popped = queue.pop()
+            if popped is None:
+                break
+            current_state, g_value = popped
+
+            # stop with the best state so far if the budget has run out,
+            # the state is not in the closed journal yet so a resumed search queues it again
+            if budget is not None and budget.expand():
+                if checkpoint is not None:
+                    checkpoint.save({'states_visited': self.states_visited}, wait=True)
+                return budget.partial_result(self.spec)
+
+            if checkpoint is not None:
+                checkpoint.append('expanded', current_state + self.EXPANDED_RECORD.pack(g_value))
 
             # check if current state is the goal state
-            if self.check_win(current_state):
+            if self.spec.is_win(current_state):
+                goal_game = self.spec.decode(current_state)
+
                 # Print the state hash of the goal state
-                print(f"Goal State Hash: {current_state.get_state_hashable()}")
+                print(f"Goal State Hash: {goal_game.get_state_hashable()}")
 
                 # debugging
                 print("Winning state found!")
-                current_state.display_board()
+                goal_game.display_board()
 
                 # return the path to the solution
                 solution_path = self.backtrack_path(current_state, predecessors)
@@ -84,33 +194,119 @@ class RushHourAStar2:
                 moves = self.calculate_moves(solution_path)
 
                 print(f"Number of states visited: {self.states_visited}")
+
+                # the search is done, so the checkpoint is not needed anymore
+                if checkpoint is not None:
+                    checkpoint.finish()
                 return moves
 
-            # generate and enqueue all possible next states from the current state
-            for next_state in self.generate_next_states(current_state):
-                state_hash = next_state.get_state_hashable()
-                if state_hash not in visited:
-                    visited.add(state_hash)
+            # generate all possible next states from the current state and keep the new ones
+            # and those reached with a lower g, the successors are generated on the full board
+            # of the current state
+            current_game = self.spec.decode(current_state)
+            next_games = []
+            next_states = []
+            next_g = g_value + 1
+            for next_game in generate_next_states(current_game):
+                next_state = self.spec.encode(next_game)
+                if next_state not in g_scores or next_g < g_scores[next_state]:
+                    g_scores[next_state] = next_g
 
                     # increment states visited counter
                     self.states_visited += 1
 
-                    next_g = g_value + 1
+                    next_games.append(next_game)
+                    next_states.append(next_state)
+
+            # heuristic value of each new state, from the components of the current
+            # state if incremental, or all at once if batched
+            if self.incremental_heuristics is not None:
+                heuristic_values = self.combined_heuristics_incremental(current_game, current_state, next_games, next_states, heuristic_components)
+            else:
+                heuristic_values = self.combined_heuristics_batch(next_games, next_states)
+
+            for next_state, heuristic_value in zip(next_states, heuristic_values):
 
-                    # update queue with heuristic value of each state
-                    heuristic_value = self.combined_heuristics(next_state)
+                # update queue with heuristic value of each state
+                next_f = next_g + heuristic_value
 
-                    next_f = next_g + heuristic_value
+                queue.push(next_state, next_f, next_g)
+                if budget is not None:
+                    budget.consider(next_state, heuristic_value)
 
-                    queue.put((next_f, next_state, next_g))
+                # Record the predecessor of the next_state
+                predecessors[next_state] = (current_state, next_g)
+                if checkpoint is not None:
+                    checkpoint.append('discovered', next_state + current_state + self.CHECKPOINT_RECORD.pack(next_g, heuristic_value))
 
-                    # Record the predecessor of the next_state
-                    predecessors[state_hash] = (current_state, next_g)
 
+        if checkpoint is not None:
+            checkpoint.finish()
 
         print("No solution found.")
         return None
 
+    def checkpoint_fingerprint(self):
+        """
+        Describe this search for its checkpoint: the board and every
+        setting that changes the heuristic values or the order of the queue.
+
+        Returns:
+        dict: The fingerprint of the search.
+        """
+        settings = {name: value for name, value in vars(self).items() if name.startswith('use_') or name.endswith('_weight')}
+        settings['pattern_databases'] = [list(pattern) for pattern in self.pattern_databases] if self.pattern_databases is not None else None
+        settings['pattern_combination'] = self.pattern_combination
+        return board_fingerprint('RushHourAStar2', self.initial_state, f_scale=self.f_scale, min_slides=self.min_slides, **settings)
+
+    def restore_checkpoint(self, restored, queue, g_scores, predecessors):
+        """
+        Rebuild the search from a checkpoint. The discovered journal holds
+        every state with its predecessor, g and heuristic value in the order
+        they were queued, a state that was reached again with a lower g once
+        more, and the expanded journal the states that were taken from the
+        queue with their g. The entries that are left are queued again in the
+        same order, which gives every bucket of the queue the same order it
+        had, so the search goes on exactly as it would have.
+
+        Parameters:
+        restored (tuple): The counters and journals of the checkpoint.
+        queue (BucketQueue): The empty queue to fill.
+        g_scores (dict): The empty dictionary of the lowest g of every state to fill.
+        predecessors (dict): The empty dictionary of predecessors to fill.
+        """
+        counters, journals = restored
+        width = len(self.spec.vehicles)
+        record_size = 2 * width + self.CHECKPOINT_RECORD.size
+        expanded_size = width + self.EXPANDED_RECORD.size
+
+        data = journals.get('discovered', b'')
+        expanded = journals.get('expanded', b'')
+        expanded = {
+            (expanded[start:start + width], self.EXPANDED_RECORD.unpack_from(expanded, start + width)[0])
+            for start in range(0, len(expanded), expanded_size)
+        }
+
+        # a later record of a state always has a lower g, so it replaces the earlier ones
+        records = []
+        for number, start in enumerate(range(0, len(data), record_size)):
+            state = State(data[start:start + width])
+            g, heuristic_value = self.CHECKPOINT_RECORD.unpack_from(data, start + 2 * width)
+
+            # the initial state is stored as its own predecessor
+            predecessor = State(data[start + width:start + 2 * width]) if number else None
+
+            g_scores[state] = g
+            predecessors[state] = (predecessor, g)
+            records.append((state, g, heuristic_value))
+
+        for state, g, heuristic_value in records:
+            if g_scores[state] == g and (state, g) not in expanded:
+                queue.push(state, g + heuristic_value, g)
+
+        self.states_visited = counters['states_visited']
+        print(f"Resumed from a checkpoint with {len(data) // record_size} states.")
+
     def calculate_moves(self, solution_path):
         """
         Calculate the sequence of moves from the solution path.
@@ -125,7 +321,7 @@ class RushHourAStar2:
         for i in range(1, len(solution_path)):
             previous_state = solution_path[i - 1]
             current_state = solution_path[i]
-            move = state_to_move(previous_state, current_state)
+            move = self.spec.move_between(previous_state, current_state)
             if move:
                 moves.append(move)
         return moves
@@ -140,6 +336,9 @@ class RushHourAStar2:
         Returns:
         list of State: A list of all possible next states.
         """
+        # Let the bitboard decide the legal moves if it is enabled
+        if self.bitboard is not None:
+            return self.bitboard.generate_next_states(current_state)
 
         # list of states
         next_states = []
@@ -168,6 +367,29 @@ class RushHourAStar2:
         return next_states
 
 
+    def generate_next_slide_states(self, current_state):
+        """
+        Generate all next states in which one vehicle slid any distance.
+
+        Parameters:
+        current_state (RushHour): The current state of the game.
+
+        Returns:
+        list of RushHour: A list of all states one slide away.
+        """
+        # let the bitboard decide the legal slides if it is enabled
+        if self.bitboard is not None:
+            return self.bitboard.generate_next_states(current_state, slides=True)
+
+        next_states = []
+        for vehicle_name, distance in current_state.iter_slides():
+            new_state = clone_rush_hour_state(current_state)
+            new_state.move_vehicle(vehicle_name, distance)
+            next_states.append(new_state)
+
+        return next_states
+
+
     def calculate_new_position(self, vehicle, distance):
         if vehicle.orientation == 'H':
             return vehicle.row, vehicle.col + distance
@@ -188,9 +410,9 @@ class RushHourAStar2:
         # store the path
         path = []
         current_state = goal_state
-        while current_state:
+        while current_state is not None:
             path.append(current_state)
-            current_state, _ = predecessors.get(current_state.get_state_hashable(), (None, None))
+            current_state, _ = predecessors.get(current_state, (None, None))
         # reverse the path to start from the initial state
         return path[::-1]
 
@@ -204,6 +426,9 @@ class RushHourAStar2:
         Returns:
         bool: True if it's a winning state, False otherwise.
         """
+        # The bitboard only has to look at the red car offset
+        if self.bitboard is not None:
+            return self.bitboard.check_win(state)
 
         red_car = state.vehicles.get('X')
         if not red_car:
@@ -285,6 +510,31 @@ class RushHourAStar2:
                         indirect_blocking_cars += 1
         return indirect_blocking_cars
 
+    def slide_blocking_heuristic(self, state):
+        """
+        Calculate a lower bound on the number of slides to the exit: one for
+        the red car if it is not at the exit yet, and one for every vehicle
+        between the red car and the exit, as each of them has to slide out of
+        the way. Unlike the distance and the directly blocking cells, this
+        never overestimates when a slide of any distance counts as one move.
+
+        Parameters:
+        state (RushHour): The current state of the game.
+
+        Returns:
+        int: The lower bound on the number of slides.
+        """
+        red_car = state.vehicles.get('X')
+        if not red_car or red_car.orientation != 'H':
+            return float('inf')
+
+        red_car_end_col = red_car.col + red_car.length
+        if red_car_end_col == state.board_size:
+            return 0
+
+        blocking_vehicles = set(state.board[red_car.row][red_car_end_col:]) - {'.'}
+        return 1 + len(blocking_vehicles)
+
     def is_vehicle_blocked(self, vehicle, state):
         """
         Check if a vehicle is blocked on both sides.
@@ -353,13 +603,157 @@ class RushHourAStar2:
 
         return deadlock_penalty
 
-    def combined_heuristics(self, state):
-        """For easy implementation in the bfs method."""
-        state_hash = state.get_state_hashable()
+    def combined_heuristics(self, state, state_hash=None):
+        """For easy implementation in the bfs method.
+        The transposition table is keyed on state_hash, which defaults
+        to the hashable string of the state."""
+        if state_hash is None:
+            state_hash = state.get_state_hashable()
         # check if the heuristic value is already computed
         if state_hash in self.transposition_table:
             return self.transposition_table[state_hash]
 
+        heuristic_value = self.evaluate_heuristics(state)
+
+        self.transposition_table[state_hash] = heuristic_value
+
+        return heuristic_value
+
+    def combined_heuristics_batch(self, states, state_hashes):
+        """
+        Calculate the combined heuristic values of several states, like
+        combined_heuristics, but the states that are not in the
+        transposition table yet are evaluated together.
+
+        Parameters:
+        states (list of RushHour): The states to evaluate.
+        state_hashes (list of State): The compact states, the keys of the table.
+
+        Returns:
+        list: The heuristic value of every state.
+        """
+        if self.batch_heuristics is None:
+            return [self.combined_heuristics(state, state_hash) for state, state_hash in zip(states, state_hashes)]
+
+        missing = [i for i, state_hash in enumerate(state_hashes) if state_hash not in self.transposition_table]
+        if missing:
+            values = self.evaluate_heuristics_batch([states[i] for i in missing], [state_hashes[i] for i in missing])
+            for i, heuristic_value in zip(missing, values):
+                self.transposition_table[state_hashes[i]] = heuristic_value
+
+        return [self.transposition_table[state_hash] for state_hash in state_hashes]
+
+    def evaluate_heuristics_batch(self, states, compact_states):
+        """
+        Calculate the combined heuristic values of several states at once
+        with array operations, the same values evaluate_heuristics gives.
+        Boards without a horizontal red car, and the slide blocking
+        heuristic, are evaluated one by one.
+
+        Parameters:
+        states (list of RushHour): The states to evaluate.
+        compact_states (list of State): The same states in compact form.
+
+        Returns:
+        list: The heuristic value of every state.
+        """
+        if self.batch_heuristics.red_index is None or self.use_slide_blocking_heuristic:
+            return [self.evaluate_heuristics(state) for state in states]
+
+        # the pattern databases are looked up per state
+        extra = None
+        if self.use_pattern_database_heuristic:
+            extra = [self.pattern_database_weight * self.pattern_database(state) for state in states]
+
+        return self.batch_heuristics.evaluate(
+            compact_states,
+            distance_weight=self.distance_weight if self.use_distance_heuristic else None,
+            direct_blocking_weight=self.direct_blocking_weight if self.use_direct_blocking_heuristic else None,
+            indirect_blocking_weight=self.indirect_blocking_weight if self.use_indirect_blocking_heuristic else None,
+            car_mobility_weight=self.car_mobility_weight if self.use_car_mobility_heuristic else None,
+            extra=extra,
+            deadlock_penalty=self.use_deadlock_penalty,
+        )
+
+    def combined_heuristics_incremental(self, parent, parent_hash, states, state_hashes, components):
+        """
+        Calculate the combined heuristic values of the successors of a state
+        from the heuristic components of that state and the move to each
+        successor. The components of the successors are stored for when they
+        are expanded, and those of the parent are dropped.
+
+        Parameters:
+        parent (RushHour): The state that was expanded.
+        parent_hash (State): The compact form of that state.
+        states (list of RushHour): The successors to evaluate.
+        state_hashes (list of State): The compact successors, the keys of the tables.
+        components (dict): The heuristic components of the queued states.
+
+        Returns:
+        list: The heuristic value of every successor.
+        """
+        # a state without stored components, like one restored from a checkpoint, starts from scratch
+        parent_components = components.pop(parent_hash, None)
+        if parent_components is None:
+            parent_components = self.incremental_heuristics.initial(parent)
+
+        heuristic_values = []
+        for state, state_hash in zip(states, state_hashes):
+            vehicle_name, distance = self.spec.move_between(parent_hash, state_hash)
+            state_components = self.incremental_heuristics.update(parent_components, state, self.spec.index[vehicle_name], distance)
+            components[state_hash] = state_components
+
+            heuristic_value = self.heuristics_from_components(state, state_components)
+            self.transposition_table[state_hash] = heuristic_value
+            heuristic_values.append(heuristic_value)
+
+        return heuristic_values
+
+    def heuristics_from_components(self, state, components):
+        """
+        Calculate the combined heuristic value of a state from its heuristic
+        components, adding the terms in the same order as evaluate_heuristics.
+
+        Parameters:
+        state (RushHour): The current state of the game.
+        components (HeuristicComponents): The heuristic components of the state.
+
+        Returns:
+        int: The weighted sum of the enabled heuristics, and the deadlock penalty if enabled.
+        """
+        red_car = state.vehicles['X']
+
+        heuristic_value = 0
+        if self.use_distance_heuristic:
+            heuristic_value += self.distance_weight * (state.board_size - (red_car.col + red_car.length))
+        if self.use_direct_blocking_heuristic:
+            heuristic_value += self.direct_blocking_weight * components.direct
+        if self.use_indirect_blocking_heuristic:
+            heuristic_value += self.indirect_blocking_weight * components.indirect
+        if self.use_car_mobility_heuristic:
+            heuristic_value += self.car_mobility_weight * (len(state.vehicles) - components.mobile)
+        if self.use_pattern_database_heuristic:
+            heuristic_value += self.pattern_database_weight * self.pattern_database(state)
+        if self.use_slide_blocking_heuristic:
+            heuristic_value += self.slide_blocking_weight * self.slide_blocking_heuristic(state)
+
+        # deadlock penalty is minus the number of full rows and columns
+        if self.use_deadlock_penalty:
+            heuristic_value += -components.full_lines
+
+        return heuristic_value
+
+    def evaluate_heuristics(self, state):
+        """
+        Calculate the combined heuristic value of a state without storing it,
+        for solvers that keep their own bounded table of heuristic values.
+
+        Parameters:
+        state (RushHour): The current state of the game.
+
+        Returns:
+        int: The weighted sum of the enabled heuristics, and the deadlock penalty if enabled.
+        """
         heuristic_value = 0
         if self.use_distance_heuristic:
              heuristic_value += self.distance_weight * self.distance_to_exit_heuristic(state)
@@ -369,11 +763,14 @@ class RushHourAStar2:
             heuristic_value += self.indirect_blocking_weight * self.indirect_blocking_cars_heuristic(state)
         if self.use_car_mobility_heuristic:
             heuristic_value += self.car_mobility_weight * self.car_mobility_heuristic(state)
+        if self.use_pattern_database_heuristic:
+            heuristic_value += self.pattern_database_weight * self.pattern_database(state)
+        if self.use_slide_blocking_heuristic:
+            heuristic_value += self.slide_blocking_weight * self.slide_blocking_heuristic(state)
 
-        deadlock_penalty = self.check_deadlock_patterns(state)
-        heuristic_value += deadlock_penalty # deadlock penalty is zero or negative
-
-        self.transposition_table[state_hash] = heuristic_value
+        if self.use_deadlock_penalty:
+            deadlock_penalty = self.check_deadlock_patterns(state)
+            heuristic_value += deadlock_penalty # deadlock penalty is zero or negative
 
         return heuristic_value
 
@@ -385,6 +782,23 @@ class RushHourAStar2:
 
 
 
+def default_heuristic_settings(min_slides=False):
+    """
+    The heuristic settings that never overestimate the number of moves, for
+    the solvers that promise a shortest solution. The distance to the exit
+    and the directly blocking cells count cells, so with a slide of any
+    distance as one move only the slide blocking heuristic stays admissible.
+
+    Parameters:
+    min_slides (bool): Whether a slide of any distance counts as one move.
+
+    Returns:
+    dict: The heuristic settings for RushHourAStar2.
+    """
+    if min_slides:
+        return {'use_slide_blocking_heuristic': True}
+    return {'use_distance_heuristic': True, 'use_direct_blocking_heuristic': True}
+
 def state_to_move(previous_state, current_state):
     """
     Convert a state into a move by comparing it with its predecessor.
@@ -428,6 +842,9 @@ def clone_rush_hour_state(rush_hour_state):
         cloned_vehicle = Vehicle(vehicle.name, vehicle.length, vehicle.orientation, vehicle.row, vehicle.col)
         cloned_game.vehicles[name] = cloned_vehicle
 
+    # The vehicles are not added again, so copy the zobrist hash
+    cloned_game.zobrist_hash = rush_hour_state.zobrist_hash
+
     return cloned_game
 
 if __name__ == "__main__":
@@ -438,7 +855,7 @@ if __name__ == "__main__":
     solver = RushHourAStar2(rush_hour_game, use_distance_heuristic=True, use_direct_blocking_heuristic=True, use_indirect_blocking_heuristic=True, use_car_mobility_heuristic=True, use_deadlock_penalty=True, distance_weight=6, direct_blocking_weight=3, indirect_blocking_weight=2, car_mobility_weight=4)
     start_time = time.time()
     solution_path = solver.astar()
-    #cProfile.run('solver.bfs()')
+    #import cProfile; cProfile.run('solver.astar()')
     end_time = time.time()
     if solution_path:
         print("Solution sequence of moves:")
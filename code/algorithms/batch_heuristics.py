@@ -0,0 +1,127 @@
+import numpy as np
+
+
+class BatchHeuristics:
+    """
+    In this class we compute the heuristic terms of RushHourAStar2 for a
+    whole batch of compact states at once with NumPy. The states are
+    turned into one occupancy tensor of vehicle indices, and every term
+    is a few array operations on it, giving the same values as the
+    methods of RushHourAStar2 that look at one board at a time.
+    """
+
+    def __init__(self, spec):
+        """
+        In this method we precompute, for every vehicle on every offset,
+        the cells it covers and the cells it slides into forward and
+        backward, as indices into the flattened board.
+        """
+        size = spec.board_size
+        self.board_size = size
+        self.vehicle_count = len(spec.vehicles)
+        longest = max(vehicle.length for vehicle in spec.vehicles)
+
+        def cell(vehicle, offset):
+            return vehicle.lane * size + offset if vehicle.orientation == 'H' else offset * size + vehicle.lane
+
+        # cells[i, offset] are the cells of vehicle i, padded with its first
+        # cell, ahead and behind the cell a unit slide moves into or -1.
+        # is_vehicle_blocked tries a slide forward over the whole length of
+        # the vehicle, jump[i, offset] are the cells it passes, padded the
+        # same way, and can_jump if it stays on the board
+        self.cells = np.zeros((self.vehicle_count, size, longest), dtype=np.int64)
+        self.ahead = np.full((self.vehicle_count, size), -1, dtype=np.int64)
+        self.behind = np.full((self.vehicle_count, size), -1, dtype=np.int64)
+        self.jump = np.zeros((self.vehicle_count, size, longest), dtype=np.int64)
+        self.can_jump = np.zeros((self.vehicle_count, size), dtype=bool)
+        for i, vehicle in enumerate(spec.vehicles):
+            for offset in range(size - vehicle.length + 1):
+                covered = [cell(vehicle, offset + k) for k in range(vehicle.length)]
+                self.cells[i, offset] = covered + covered[:1] * (longest - vehicle.length)
+                if offset + vehicle.length < size:
+                    self.ahead[i, offset] = cell(vehicle, offset + vehicle.length)
+                if offset > 0:
+                    self.behind[i, offset] = cell(vehicle, offset - 1)
+                if offset + 2 * vehicle.length <= size:
+                    passed = [cell(vehicle, offset + vehicle.length + k) for k in range(vehicle.length)]
+                    self.jump[i, offset] = passed + passed[:1] * (longest - vehicle.length)
+                    self.can_jump[i, offset] = True
+
+        self.vertical = np.array([vehicle.orientation == 'V' for vehicle in spec.vehicles])
+
+        # the terms around the red car need a horizontal red car
+        red_index = spec.red_index
+        self.red_index = red_index if red_index is not None and spec.vehicles[red_index].orientation == 'H' else None
+        if self.red_index is not None:
+            self.red_row = spec.vehicles[red_index].lane
+            self.red_length = spec.vehicles[red_index].length
+
+
+    def occupancy(self, offsets):
+        """
+        In this method we build the occupancy tensor of a batch of states:
+        for every state and cell the index of the vehicle on it, or -1.
+        """
+        batch = len(offsets)
+        size = self.board_size
+
+        grid = np.full((batch, size * size), -1, dtype=np.int64)
+        covered = self.cells[np.arange(self.vehicle_count), offsets]
+        grid[np.arange(batch)[:, None, None], covered] = np.arange(self.vehicle_count)[None, :, None]
+        return grid.reshape(batch, size, size)
+
+
+    def evaluate(self, states, distance_weight=None, direct_blocking_weight=None, indirect_blocking_weight=None, car_mobility_weight=None, extra=None, deadlock_penalty=True):
+        """
+        In this method we return the weighted sum of the terms whose weight
+        is given, plus the deadlock penalty if asked for, for a list of
+        compact states, in the order evaluate_heuristics adds them up. Extra
+        is an array of already weighted values added after the mobility
+        term, like the pattern database distances.
+        """
+        offsets = np.frombuffer(b''.join(states), dtype=np.uint8).reshape(len(states), self.vehicle_count).astype(np.int64)
+        grid = self.occupancy(offsets)
+        flat = grid.reshape(len(states), -1)
+        empty = grid < 0
+
+        heuristic_value = np.zeros(len(states), dtype=np.int64)
+
+        if self.red_index is not None:
+            nose = offsets[:, self.red_index] + self.red_length
+            red_lane = grid[:, self.red_row, :]
+            in_front = (red_lane >= 0) & (np.arange(self.board_size) >= nose[:, None])
+
+        if distance_weight is not None:
+            heuristic_value = heuristic_value + distance_weight * (self.board_size - nose)
+        if direct_blocking_weight is not None:
+            heuristic_value = heuristic_value + direct_blocking_weight * in_front.sum(axis=1)
+
+        if indirect_blocking_weight is not None or car_mobility_weight is not None:
+            # both terms allow a step back into a free cell
+            states_index = np.arange(len(states))[:, None]
+            vehicles_index = np.arange(self.vehicle_count)
+            behind = self.behind[vehicles_index, offsets]
+            backward = (behind >= 0) & (flat[states_index, behind] < 0)
+
+        if indirect_blocking_weight is not None:
+            # a vertical vehicle in front of the red car counts when it can
+            # neither step back nor slide forward over its whole length
+            jump = self.jump[vehicles_index, offsets]
+            forward = self.can_jump[vehicles_index, offsets] & (flat[states_index[:, :, None], jump] < 0).all(axis=2)
+            blocked = self.vertical & ~(forward | backward)
+            blocking = in_front & np.take_along_axis(blocked, np.maximum(red_lane, 0), axis=1)
+            heuristic_value = heuristic_value + indirect_blocking_weight * blocking.sum(axis=1)
+        if car_mobility_weight is not None:
+            # a vehicle is mobile when it can step forward or back
+            ahead = self.ahead[vehicles_index, offsets]
+            movable = ((ahead >= 0) & (flat[states_index, ahead] < 0)) | backward
+            heuristic_value = heuristic_value + car_mobility_weight * (self.vehicle_count - movable.sum(axis=1))
+
+        if extra is not None:
+            heuristic_value = heuristic_value + extra
+
+        # the deadlock penalty is minus the number of full rows and columns
+        if deadlock_penalty:
+            heuristic_value = heuristic_value - (~empty.any(axis=2)).sum(axis=1) - (~empty.any(axis=1)).sum(axis=1)
+
+        return heuristic_value.tolist()
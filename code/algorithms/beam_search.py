@@ -0,0 +1,201 @@
+import heapq
+import time
+from collections import deque
+
+from code.algorithms.astar2 import RushHourAStar2
+from code.game.bitboard import BitBoard
+from code.game.rush_hour import RushHour
+from code.game.state import BoardSpec
+
+
+class RushHourBeamSearch:
+    """
+    Beam search for the rush hour game. Every depth only the beam_width
+    states with the best heuristic value are kept, so time and memory grow
+    with the beam width times the depth instead of with the state space.
+    States that were generated recently are kept in a history of a fixed
+    size and not used again. If the beam runs empty or gets too deep, the
+    search can start over with a wider beam.
+    """
+
+    def __init__(self, initial_state, beam_width=500, history_size=200000, max_depth=None, widen_factor=2, max_retries=3, min_slides=False, **heuristic_settings):
+        """
+        Set up the solver. The heuristic settings are passed on to
+        RushHourAStar2, whose heuristics score the states.
+
+        Parameters:
+        initial_state (RushHour): The initial state of the game.
+        beam_width (int): The number of states kept per depth.
+        history_size (int): The number of recent states that are not used again.
+        max_depth (int): The deepest the search goes, by default 10 times the number of cells.
+        widen_factor (int): The beam width is multiplied by this for every retry.
+        max_retries (int): How many times the search starts over with a wider beam.
+        min_slides (bool): Count a slide of any distance as one move.
+        """
+        self.initial_state = initial_state
+
+        if not heuristic_settings:
+            heuristic_settings = {'use_distance_heuristic': True, 'use_direct_blocking_heuristic': True, 'use_indirect_blocking_heuristic': True}
+        self.heuristics = RushHourAStar2(initial_state, **heuristic_settings)
+
+        # the static vehicle specs shared by all compact states, and the
+        # bitboard for their moves
+        self.spec = BoardSpec(initial_state)
+        self.bitboard = BitBoard(initial_state)
+
+        # beam settings
+        self.beam_width = beam_width
+        self.history_size = history_size
+        self.max_depth = max_depth if max_depth is not None else 10 * initial_state.board_size ** 2
+        self.widen_factor = widen_factor
+        self.max_retries = max_retries
+
+        # count a slide of any distance as one move if asked for
+        self.min_slides = min_slides
+
+        # keep track of visited states
+        self.states_visited = 0
+
+    def beam_search(self):
+        """
+        Perform the beam search, and start over with a wider beam when it fails.
+
+        Returns:
+        list of tuple: The moves (vehicle name, distance) from the initial state
+        to the goal state, or None if no solution was found.
+        """
+        print("Starting beam search...")
+        print("Initial Board:")
+        self.initial_state.display_board()
+
+        beam_width = self.beam_width
+
+        for attempt in range(self.max_retries + 1):
+            print(f"Searching with beam width {beam_width}")
+
+            moves = self.search(beam_width)
+            if moves is not None:
+                print("Winning state found!")
+                print(f"Number of states visited: {self.states_visited}")
+                return moves
+
+            beam_width *= self.widen_factor
+
+        print("No solution found.")
+        return None
+
+    def search(self, beam_width):
+        """
+        Perform one beam search with the given width.
+
+        Parameters:
+        beam_width (int): The number of states kept per depth.
+
+        Returns:
+        list of tuple: The moves to the goal, or None if the beam ran empty
+        or reached the maximum depth.
+        """
+        initial_state = self.spec.encode(self.initial_state)
+        if self.spec.is_win(initial_state):
+            return []
+
+        # in minimum slides mode a slide of any distance costs one move
+        legal_moves = self.bitboard.legal_slides if self.min_slides else self.bitboard.legal_moves
+
+        # the recent states in a set, and in a queue to forget the oldest ones
+        history = {initial_state}
+        history_order = deque([initial_state])
+
+        # every depth is a list of (state, index of the parent in the previous depth)
+        layers = [[(initial_state, None)]]
+
+        for depth in range(self.max_depth):
+            candidates = []
+
+            for parent_index, (current_state, _) in enumerate(layers[-1]):
+
+                # the children are scored on the board of their parent, moved in place
+                board = self.spec.decode(current_state)
+
+                for i, distance in legal_moves(current_state):
+                    next_state = current_state.move(i, distance)
+                    if next_state in history:
+                        continue
+
+                    self.states_visited += 1
+
+                    if self.spec.is_win(next_state):
+                        layers.append([(next_state, parent_index)])
+                        return self.calculate_moves(self.backtrack_path(layers))
+
+                    # mark it at once, so the same state from another parent is skipped
+                    history.add(next_state)
+                    history_order.append(next_state)
+                    move = board.make_move(self.spec.vehicles[i].name, distance)
+                    candidates.append((self.heuristics.evaluate_heuristics(board), next_state, parent_index))
+                    board.unmake_move(move)
+
+            if not candidates:
+                return None
+
+            # keep the best states, ties go to the state that comes first
+            best = heapq.nsmallest(beam_width, candidates, key=lambda candidate: (candidate[0], candidate[1]))
+            layers.append([(state, parent_index) for _, state, parent_index in best])
+
+            # forget the oldest states when the history is full
+            while len(history_order) > self.history_size:
+                history.discard(history_order.popleft())
+
+        return None
+
+    def backtrack_path(self, layers):
+        """
+        Follow the parent indices from the goal in the last depth back to the
+        initial state.
+
+        Parameters:
+        layers (list): For every depth the list of (state, parent index).
+
+        Returns:
+        list of State: The path from the initial state to the goal state.
+        """
+        path = []
+        index = 0
+        for layer in reversed(layers):
+            state, parent_index = layer[index]
+            path.append(state)
+            index = parent_index
+        return path[::-1]
+
+    def calculate_moves(self, solution_path):
+        """
+        Calculate the moves made along a path of compact states.
+
+        Parameters:
+        solution_path (list of State): The states from the initial state to the goal state.
+
+        Returns:
+        list of tuple: The moves (vehicle name, distance).
+        """
+        return [self.spec.move_between(solution_path[i - 1], solution_path[i]) for i in range(1, len(solution_path))]
+
+
+if __name__ == "__main__":
+
+    rush_hour_game = RushHour()
+
+    solver = RushHourBeamSearch(rush_hour_game)
+    start_time = time.time()
+    solution_path = solver.beam_search()
+    end_time = time.time()
+
+    if solution_path is not None:
+        print("Solution sequence of moves:")
+        for move in solution_path:
+            print(move)
+        print(f"Solution found in {len(solution_path)} moves!")
+
+        elapsed_time = end_time - start_time
+        print(f"Time taken to solve the board: {elapsed_time:.2f} seconds")
+    else:
+        print("No solution found.")
@@ -1,6 +1,11 @@
 from queue import Queue
 import copy
+from code.algorithms.budget import blocking_heuristic
+from code.algorithms.checkpoint import board_fingerprint
 from code.game.rush_hour import RushHour, Vehicle
+from code.game.bitboard import BitBoard
+from code.game.compiler import compile_board
+from code.game.state import BoardSpec, State
 import time
 
 
@@ -10,7 +15,7 @@ class RushHourBFS:
     algorithm for our rush hour gameboards.
     """
 
-    def __init__(self, initial_state):
+    def __init__(self, initial_state, use_bitboard=False, use_compiled=False, min_slides=False, budget=None, checkpoint=None):
         """
         In this method we define some initial starting variables.
         """
@@ -21,6 +26,26 @@ class RushHourBFS:
         # create a counter for the states visited
         self.states_visited = 0
 
+        # use the bitboard engine for move generation if asked for, or the
+        # move generator compiled for this board which replaces it
+        if use_compiled:
+            self.bitboard = compile_board(initial_state)
+        else:
+            self.bitboard = BitBoard(initial_state) if use_bitboard else None
+
+        # the static vehicle specs shared by all compact states
+        self.spec = BoardSpec(initial_state)
+
+        # count a slide of any distance as one move if asked for
+        self.min_slides = min_slides
+
+        # the limits of the search, a SearchBudget, or None to run until done
+        self.budget = budget
+
+        # save the progress to disk now and then, a SearchCheckpoint, and
+        # resume from it if it holds a checkpoint of this search
+        self.checkpoint = checkpoint
+
 
     def bfs(self):
         """
@@ -33,39 +58,71 @@ class RushHourBFS:
         print("Initial Board:")
         self.initial_state.display_board()
 
-        # save unique visited states
-        visited = set()
+        # we only store the compact states (one offset per vehicle)
+        initial_state = self.spec.encode(self.initial_state)
 
         # queue to manage BFS frontier
         queue = Queue()
 
-        # add the initial state to the queue
-        queue.put(self.initial_state)
+        # create a dctionary to store the predecessor for each state,
+        # its keys are also all the unique states we have visited
+        predecessors = {}
 
-        # and to the visited set
-        visited.add(self.initial_state.get_state_hashable())
+        # the number of states we took from the queue
+        expanded = 0
 
-        # create a dctionary to store the predecessor for each state
-        predecessors = {self.initial_state.get_state_hashable(): None}
+        # continue from the checkpoint if there is one
+        checkpoint = self.checkpoint
+        restored = None
+        if checkpoint is not None:
+            restored = checkpoint.restore(board_fingerprint('RushHourBFS', self.initial_state, min_slides=self.min_slides))
+
+        if restored is not None:
+            expanded = self.restore_checkpoint(restored, queue, predecessors)
+        else:
+            # add the initial state to the queue
+            queue.put(initial_state)
+            predecessors[initial_state] = None
+            if checkpoint is not None:
+                checkpoint.append('discovered', initial_state + initial_state)
 
         # debugging
         print("Starting BFS...")
 
+        budget = self.budget
+        if budget is not None:
+            budget.start()
+
         # condition to keep on running our algorithm
         while not queue.empty():
 
+            # every state we found is in the journal, so this is a good moment to save
+            if checkpoint is not None and checkpoint.due():
+                checkpoint.save({'expanded': expanded, 'states_visited': self.states_visited})
+
             # dequeue the next state
             current_state = queue.get()
 
+            # stop with the best state so far if the budget has run out,
+            # the checkpoint puts the current state back in the queue
+            if budget is not None:
+                budget.consider(current_state, blocking_heuristic(self.spec, current_state))
+                if budget.expand():
+                    if checkpoint is not None:
+                        checkpoint.save({'expanded': expanded, 'states_visited': self.states_visited}, wait=True)
+                    return budget.partial_result(self.spec)
+
+            expanded += 1
+
             # debugging
             #print(f"Current state: {current_state}")
 
             # check if current state is the goal state
-            if self.check_win(current_state):
+            if self.spec.is_win(current_state):
 
                 # debugging
                 print("Winning state found!")
-                current_state.display_board()
+                self.spec.decode(current_state).display_board()
 
                 # return the path to the solution
                 solution_path = self.backtrack_path(current_state, predecessors)
@@ -76,31 +133,60 @@ class RushHourBFS:
                 # print the number of states we visited
                 print(f"Number of states visited: {self.states_visited}")
 
+                # the search is done, so the checkpoint is not needed anymore
+                if checkpoint is not None:
+                    checkpoint.finish()
+
                 # return all the moves we have done to get to the solution
                 return moves
 
             # generate and enqueue all possible next states from the current state
-            for next_state in self.generate_next_states(current_state):
-                state_hash = next_state.get_state_hashable()
+            for next_state in self.generate_next_compact_states(current_state):
 
                 # check if it is a unique state
-                if state_hash not in visited:
-
-                    # add it to the visited set
-                    visited.add(state_hash)
+                if next_state not in predecessors:
 
                     # and put it in the queue
                     queue.put(next_state)
 
                     # save/record the predecessor of the next_state
-                    predecessors[state_hash] = current_state
+                    predecessors[next_state] = current_state
+                    if checkpoint is not None:
+                        checkpoint.append('discovered', next_state + current_state)
 
                     # increase the counter
                     self.states_visited += 1
 
+        if checkpoint is not None:
+            checkpoint.finish()
+
         print("No solution found.")
         return None
 
+    def restore_checkpoint(self, restored, queue, predecessors):
+        """
+        In this method we rebuild the search from a checkpoint. The journal
+        holds every state we found with its predecessor, in the order we
+        found them, so the queue is the part of it that was not taken from
+        the queue yet. Returns the number of states taken from the queue.
+        """
+        counters, journals = restored
+        width = len(self.spec.vehicles)
+        data = journals.get('discovered', b'')
+
+        for number, start in enumerate(range(0, len(data), 2 * width)):
+            state = State(data[start:start + width])
+
+            # the initial state is stored as its own predecessor
+            predecessors[state] = State(data[start + width:start + 2 * width]) if number else None
+
+            if number >= counters['expanded']:
+                queue.put(state)
+
+        self.states_visited = counters['states_visited']
+        print(f"Resumed from a checkpoint with {len(data) // (2 * width)} states.")
+        return counters['expanded']
+
     def calculate_moves(self, solution_path):
         """
         In this method we will calculate the order of the moves done
@@ -119,18 +205,43 @@ class RushHourBFS:
             current_state = solution_path[i]
 
             # find the move that has been done and append it to the list
-            move = state_to_move(previous_state, current_state)
+            move = self.spec.move_between(previous_state, current_state)
             if move:
                 moves.append(move)
 
         return moves
 
+    def generate_next_compact_states(self, current_state):
+        """
+        In this method we will generate all the possible next compact
+        states from the compact state we are in.
+        """
+
+        # the bitboard works on the offsets directly
+        if self.bitboard is not None:
+            if self.min_slides:
+                moves = self.bitboard.legal_slides(current_state)
+            else:
+                moves = self.bitboard.legal_moves(current_state)
+            return [current_state.move(i, distance) for i, distance in moves]
+
+        # otherwise we go through the list based board
+        if self.min_slides:
+            next_states = self.generate_next_slide_states(self.spec.decode(current_state))
+        else:
+            next_states = self.generate_next_states(self.spec.decode(current_state))
+        return [self.spec.encode(next_state) for next_state in next_states]
+
     def generate_next_states(self, current_state):
         """
         In this method we will generate all the possible next states from
         the current state we are in.
         """
 
+        # let the bitboard decide the legal moves if it is enabled
+        if self.bitboard is not None:
+            return self.bitboard.generate_next_states(current_state)
+
         # create an empty list for the next states
         next_states = []
 
@@ -163,6 +274,30 @@ class RushHourBFS:
         return next_states
 
 
+    def generate_next_slide_states(self, current_state):
+        """
+        In this method we will generate all the next states in which one
+        vehicle slid any distance, so every reachable offset in its lane.
+        """
+
+        # let the bitboard decide the legal slides if it is enabled
+        if self.bitboard is not None:
+            return self.bitboard.generate_next_states(current_state, slides=True)
+
+        # create an empty list for the next states
+        next_states = []
+
+        # the game scans every lane for the reachable offsets
+        for vehicle_name, distance in current_state.iter_slides():
+
+            # make a copy of the current state and apply the slide
+            new_state = clone_rush_hour_state(current_state)
+            new_state.move_vehicle(vehicle_name, distance)
+            next_states.append(new_state)
+
+        return next_states
+
+
     def calculate_new_position(self, vehicle, distance):
         """
         In this method we will calculate the new position for
@@ -194,11 +329,11 @@ class RushHourBFS:
         # set that the current state is the goal state
         current_state = goal_state
 
-        while current_state:
+        while current_state is not None:
             path.append(current_state)
 
             # get all the predecessor states from the goal state
-            current_state = predecessors.get(current_state.get_state_hashable())
+            current_state = predecessors.get(current_state)
 
         # reverse the path to start from the initial state
         return path[::-1]
@@ -209,6 +344,10 @@ class RushHourBFS:
         if the game has been won.
         """
 
+        # the bitboard only has to look at the red car offset
+        if self.bitboard is not None:
+            return self.bitboard.check_win(state)
+
         # get the position of the red car
         red_car = state.vehicles.get('X')
 
@@ -271,6 +410,9 @@ def clone_rush_hour_state(rush_hour_state):
         cloned_vehicle = Vehicle(vehicle.name, vehicle.length, vehicle.orientation, vehicle.row, vehicle.col)
         cloned_game.vehicles[name] = cloned_vehicle
 
+    # the vehicles are not added again, so copy the zobrist hash
+    cloned_game.zobrist_hash = rush_hour_state.zobrist_hash
+
     # return the cloned game state
     return cloned_game
 
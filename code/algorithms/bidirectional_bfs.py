@@ -0,0 +1,272 @@
+import time
+from itertools import islice
+
+from code.game.bitboard import BitBoard
+from code.game.rush_hour import RushHour
+from code.game.state import BoardSpec, State
+
+
+class RushHourBidirectionalBFS:
+    """
+    In this class we will define methods to perform a bidirectional breadth
+    first search for our rush hour gameboards. One search goes forward from
+    the initial state, the other one backward from all goal states, until
+    the two meet in the middle.
+
+    The goal states are every placement of the other vehicles around the red
+    car at the exit, most of which cannot be reached from the initial state.
+    The backward side only starts once there are fewer of them than states
+    in the forward frontier. That happens on the 6x6 boards, but the 9x9 and
+    12x12 boards have millions of goal states, and there this is a forward
+    breadth first search that is no faster than RushHourBFS.
+    """
+
+    def __init__(self, initial_state, min_slides=False):
+        """
+        In this method we define some initial starting variables.
+        """
+
+        # we set the initial state and its compact version
+        self.initial_state = initial_state
+        self.spec = BoardSpec(initial_state)
+        self.bitboard = BitBoard(initial_state)
+
+        # count a slide of any distance as one move if asked for
+        self.min_slides = min_slides
+
+        # create a counter for the states visited
+        self.states_visited = 0
+
+
+    def bfs(self):
+        """
+        In this method we perform the bidirectional breadth first search and
+        return the moves of an optimal solution, in the same format as
+        RushHourBFS.calculate_moves, or None if there is no solution.
+        """
+
+        print("Starting bidirectional BFS...")
+        print("Initial Board:")
+        self.initial_state.display_board()
+
+        initial_state = self.spec.encode(self.initial_state)
+
+        # the goal states are the first layer of the backward side, they are
+        # generated lazily and set to None once all of them are there
+        goal_states = self.generate_goal_states(initial_state)
+
+        # for both sides we store the depth and the neighbour one step closer
+        # to where that side started, for the path afterwards
+        forward_parents = {initial_state: None}
+        forward_depths = {initial_state: 0}
+        forward_layer = [initial_state]
+
+        backward_parents = {}
+        backward_depths = {}
+        backward_layer = []
+
+        meeting_state = initial_state if self.spec.is_win(initial_state) else None
+
+        while meeting_state is None and forward_layer and (backward_layer or goal_states is not None):
+
+            # only generate one goal state more than the forward frontier has
+            # states, on large boards there are far more goal states than
+            # that and the backward side is never expanded. The goal states
+            # are only stored for the backward side once all of them are there
+            if goal_states is not None:
+                backward_layer.extend(islice(goal_states, max(0, len(forward_layer) + 1 - len(backward_layer))))
+                if len(backward_layer) <= len(forward_layer):
+                    goal_states = None
+                    for goal_state in backward_layer:
+                        backward_parents[goal_state] = None
+                        backward_depths[goal_state] = 0
+                    continue
+
+            # expand the smallest frontier by one whole layer, while not all
+            # goal states are there the forward side checks for goals itself
+            if goal_states is not None or len(forward_layer) <= len(backward_layer):
+                forward_layer, meeting_state = self.expand_layer(
+                    forward_layer, forward_parents, forward_depths, backward_depths,
+                    check_goal=goal_states is not None)
+            else:
+                backward_layer, meeting_state = self.expand_layer(
+                    backward_layer, backward_parents, backward_depths, forward_depths)
+
+        if meeting_state is None:
+            print("No solution found.")
+            return None
+
+        print("Winning path found!")
+        print(f"Number of states visited: {self.states_visited}")
+
+        # join the forward half path and the backward half path
+        solution_path = self.backtrack_path(meeting_state, forward_parents)[::-1]
+        solution_path += self.backtrack_path(meeting_state, backward_parents)[1:]
+
+        self.spec.decode(solution_path[-1]).display_board()
+
+        return self.calculate_moves(solution_path)
+
+
+    def expand_layer(self, layer, parents, depths, other_depths, check_goal=False):
+        """
+        In this method we expand one complete layer of one side. Every
+        new state that the other side has seen is a meeting point, and
+        of those we keep the one with the shortest total path.
+        """
+        next_layer = []
+        meeting_state = None
+        best_length = None
+
+        for current_state in layer:
+            depth = depths[current_state] + 1
+
+            for next_state in self.generate_next_states(current_state):
+                if next_state in depths:
+                    continue
+
+                parents[next_state] = current_state
+                depths[next_state] = depth
+                next_layer.append(next_state)
+                self.states_visited += 1
+
+                # check if the two searches meet in this state
+                if next_state in other_depths:
+                    length = depth + other_depths[next_state]
+                    if best_length is None or length < best_length:
+                        meeting_state = next_state
+                        best_length = length
+
+                # without all goal states the forward side stops at the first goal
+                elif check_goal and meeting_state is None and self.spec.is_win(next_state):
+                    meeting_state = next_state
+
+        return next_layer, meeting_state
+
+
+    def generate_next_states(self, current_state):
+        """
+        In this method we generate all the next compact states. Rush hour
+        moves can always be undone, so the backward search uses the same
+        moves as the forward search.
+        """
+        if self.min_slides:
+            moves = self.bitboard.legal_slides(current_state)
+        else:
+            moves = self.bitboard.legal_moves(current_state)
+        return [current_state.move(i, distance) for i, distance in moves]
+
+
+    def generate_goal_states(self, initial_state):
+        """
+        In this method we generate all goal states one at a time: the red
+        car at the exit and every other vehicle somewhere in its lane without
+        overlapping. Vehicles that share a lane can never pass each other, so
+        we keep their order, which leaves out goal states that cannot be
+        reached.
+        """
+        red_index = self.spec.red_index
+        if red_index is None:
+            return
+
+        vehicles = self.spec.vehicles
+        max_offsets = self.bitboard.max_offsets
+        masks = self.bitboard.masks
+
+        # for every vehicle the vehicle just before it in the same lane
+        previous_in_lane = []
+        for i, spec in enumerate(vehicles):
+            previous = None
+            for j, other in enumerate(vehicles):
+                if (other.orientation == spec.orientation and other.lane == spec.lane
+                        and initial_state[j] < initial_state[i]
+                        and (previous is None or initial_state[j] > initial_state[previous])):
+                    previous = j
+            previous_in_lane.append(previous)
+
+        # place the red car first and then the vehicles from the top left to
+        # the bottom right of the board, so crossing vehicles are placed close
+        # after each other and the vehicle before one in the lane comes first
+        def first_cell(i):
+            spec = vehicles[i]
+            if spec.orientation == 'H':
+                return spec.lane * self.spec.board_size + initial_state[i]
+            return initial_state[i] * self.spec.board_size + spec.lane
+
+        order = sorted(range(len(vehicles)), key=lambda i: (i != red_index, first_cell(i)))
+
+        offsets = [0] * len(vehicles)
+
+        def place(position, occupied):
+            if position == len(order):
+                yield State(offsets)
+                return
+
+            i = order[position]
+            previous = previous_in_lane[i]
+
+            # the red car is at the exit, the others anywhere after the
+            # vehicle before them in their lane
+            if i == red_index:
+                candidates = [max_offsets[i]]
+            elif previous is not None:
+                candidates = range(offsets[previous] + vehicles[previous].length, max_offsets[i] + 1)
+            else:
+                candidates = range(max_offsets[i] + 1)
+
+            for offset in candidates:
+                if not occupied & masks[i][offset]:
+                    offsets[i] = offset
+                    yield from place(position + 1, occupied | masks[i][offset])
+
+        yield from place(0, 0)
+
+
+    def backtrack_path(self, state, parents):
+        """
+        In this method we follow the parents from a state back to where
+        that side of the search started.
+        """
+        path = []
+        while state is not None:
+            path.append(state)
+            state = parents.get(state)
+        return path
+
+
+    def calculate_moves(self, solution_path):
+        """
+        In this method we will calculate the order of the moves done
+        to get from our initial state to the solution state.
+        """
+        moves = []
+        for i in range(1, len(solution_path)):
+            move = self.spec.move_between(solution_path[i - 1], solution_path[i])
+            if move:
+                moves.append(move)
+        return moves
+
+
+if __name__ == "__main__":
+
+    # create an instance of the rush hour game
+    rush_hour_game = RushHour()
+
+    solver = RushHourBidirectionalBFS(rush_hour_game)
+
+    # find the solution and time it
+    start_time = time.time()
+    solution_path = solver.bfs()
+    end_time = time.time()
+
+    if solution_path:
+        print("Solution sequence of moves:")
+        for move in solution_path:
+            print(move)
+        print(f"Solution found in {len(solution_path)} moves!")
+
+        elapsed_time = end_time - start_time
+        print(f"Time taken to solve the board: {elapsed_time:.2f} seconds")
+
+    else:
+        print("No solution found.")
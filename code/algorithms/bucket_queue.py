@@ -0,0 +1,116 @@
+import heapq
+
+
+class BucketQueue:
+    """
+    An open list for the A* solvers, with one bucket of states per integer f
+    value. Within a bucket the states are grouped by g, and the states
+    closest to the initial state (lowest g) come out first. The heaps only hold the distinct f
+    and g values, so most pushes and pops are a list append or pop. There is
+    no locking, the queue is only meant for a single thread.
+
+    When a dictionary of best g values is given, a state may be pushed again
+    with a lower g, and the older entries are skipped when they come out.
+    """
+
+    def __init__(self, scale=1, best_g=None):
+        """
+        Create an empty queue.
+
+        Parameters:
+        scale (int): The f values are multiplied by this and rounded to an integer.
+        best_g (dict): The lowest g known for every state, used to skip stale entries.
+        """
+        self.scale = scale
+        self.best_g = best_g
+
+        # f key -> {g: list of states}, and heaps of the keys that are in use
+        self.buckets = {}
+        self.f_keys = []
+        self.g_keys = {}
+
+        self.size = 0
+
+    def push(self, state, f, g):
+        """
+        Add a state to the queue.
+
+        Parameters:
+        state (State): The state to add.
+        f (float): The f value of the state.
+        g (int): The cost from the initial state to the state.
+        """
+        f_key = round(f * self.scale)
+
+        bucket = self.buckets.get(f_key)
+        if bucket is None:
+            bucket = self.buckets[f_key] = {}
+            self.g_keys[f_key] = []
+            heapq.heappush(self.f_keys, f_key)
+
+        states = bucket.get(g)
+        if states is None:
+            states = bucket[g] = []
+            heapq.heappush(self.g_keys[f_key], g)
+
+        states.append(state)
+        self.size += 1
+
+    def pop(self):
+        """
+        Remove and return the state with the lowest f, and of those the
+        lowest g. Stale entries are skipped.
+
+        Returns:
+        tuple: The state and its g, or None if the queue is empty.
+        """
+        while self.f_keys:
+            f_key = self.f_keys[0]
+            bucket = self.buckets[f_key]
+            g_keys = self.g_keys[f_key]
+            g = g_keys[0]
+            states = bucket[g]
+
+            state = states.pop()
+            self.size -= 1
+
+            # Clean up the lists and keys that are now empty
+            if not states:
+                del bucket[g]
+                heapq.heappop(g_keys)
+                if not bucket:
+                    del self.buckets[f_key]
+                    del self.g_keys[f_key]
+                    heapq.heappop(self.f_keys)
+
+            # The state was pushed again with a lower g after this entry
+            if self.best_g is not None and self.best_g[state] != g:
+                continue
+
+            return state, g
+
+        return None
+
+    def min_f(self):
+        """
+        Return the lowest f value in the queue. A stale entry can make it
+        lower than the lowest f of the states that are really queued.
+
+        Returns:
+        float: The lowest f value, or infinity if the queue is empty.
+        """
+        if not self.f_keys:
+            return float('inf')
+        return self.f_keys[0] / self.scale
+
+    def empty(self):
+        """
+        Check if there are no entries left, stale entries included.
+
+        Returns:
+        bool: True if the queue is empty.
+        """
+        return self.size == 0
+
+    def __len__(self):
+        return self.size
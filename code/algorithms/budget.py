@@ -0,0 +1,172 @@
+import os
+import sys
+import time
+
+
+def resident_memory():
+    """
+    In this function we return the resident memory of this process in
+    bytes. Linux tells the current size, elsewhere we fall back on the
+    largest size so far, and on 0 when neither is available.
+    """
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        return 0
+
+    # macos reports bytes, linux and the bsds kilobytes
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+
+def blocking_heuristic(spec, state):
+    """
+    In this function we return the distance of the red car to the exit
+    plus the number of vehicles standing in its way, for a compact state.
+    The solvers without a heuristic of their own use it to pick the best
+    state of a search that was stopped.
+    """
+    if spec.red_index is None:
+        return 0
+
+    red_car = spec.vehicles[spec.red_index]
+    red_end = state[spec.red_index] + red_car.length
+    heuristic = spec.board_size - red_end
+
+    for vehicle, offset in zip(spec.vehicles, state):
+
+        # a vertical vehicle in a column ahead that covers the row of the red car
+        if vehicle.orientation == 'V' and vehicle.lane >= red_end and offset <= red_car.lane < offset + vehicle.length:
+            heuristic += 1
+
+    return heuristic
+
+
+class PartialResult:
+    """
+    In this class we store what a solver found before its budget ran out:
+    why it stopped, the best state so far with its heuristic value, the
+    number of expansions and the seconds it ran. A partial result counts
+    as false, so code that checks `if solution:` treats it as no solution.
+    """
+
+    __slots__ = ('reason', 'best_state', 'heuristic', 'expansions', 'seconds')
+
+    def __init__(self, reason, best_state, heuristic, expansions, seconds):
+        """
+        In this method we set the values of the partial result.
+        """
+        self.reason = reason
+        self.best_state = best_state
+        self.heuristic = heuristic
+        self.expansions = expansions
+        self.seconds = seconds
+
+
+    def __bool__(self):
+        return False
+
+
+    def __repr__(self):
+        return f"PartialResult(reason={self.reason!r}, heuristic={self.heuristic}, expansions={self.expansions}, seconds={self.seconds:.2f})"
+
+
+class SearchBudget:
+    """
+    In this class we keep the limits of one search: the number of
+    expansions, the seconds, the resident memory and a cancel flag that
+    another thread or process can set. The solvers call expand once per
+    expanded state. Counting is checked every time, the clock, the memory
+    and the cancel flag only every check_interval expansions, so the check
+    stays cheap. Every limit is optional.
+    """
+
+    def __init__(self, max_expansions=None, max_seconds=None, max_memory_bytes=None, cancel_event=None, check_interval=256):
+        """
+        In this method we set the limits. The cancel event can be any
+        object with an is_set method, like threading.Event or
+        multiprocessing.Event.
+        """
+        self.max_expansions = max_expansions
+        self.max_seconds = max_seconds
+        self.max_memory_bytes = max_memory_bytes
+        self.cancel_event = cancel_event
+        self.check_interval = check_interval
+
+        # cancel can also be called on the budget itself
+        self.cancelled = False
+
+        self.start()
+
+
+    def start(self):
+        """
+        In this method we start counting and timing from zero, the solvers
+        call it when their search starts.
+        """
+        self.start_time = time.time()
+        self.expansions = 0
+        self.exceeded = None
+
+        # the best state so far and its heuristic value
+        self.best_state = None
+        self.best_heuristic = None
+
+
+    def cancel(self):
+        """
+        In this method we ask the search to stop at its next check.
+        """
+        self.cancelled = True
+
+
+    def consider(self, state, heuristic):
+        """
+        In this method we remember a state if it has the lowest heuristic
+        value so far.
+        """
+        if self.best_heuristic is None or heuristic < self.best_heuristic:
+            self.best_state = state
+            self.best_heuristic = heuristic
+
+
+    def expand(self):
+        """
+        In this method we count one expansion and return the reason the
+        search has to stop, or None if it can go on.
+        """
+        if self.max_expansions is not None and self.expansions >= self.max_expansions:
+            self.exceeded = 'max expansions'
+            return self.exceeded
+
+        self.expansions += 1
+
+        if self.expansions % self.check_interval == 0:
+            if self.cancelled or (self.cancel_event is not None and self.cancel_event.is_set()):
+                self.exceeded = 'cancelled'
+            elif self.max_seconds is not None and time.time() - self.start_time > self.max_seconds:
+                self.exceeded = 'max seconds'
+            elif self.max_memory_bytes is not None and resident_memory() > self.max_memory_bytes:
+                self.exceeded = 'max memory'
+
+        return self.exceeded
+
+
+    def partial_result(self, spec=None):
+        """
+        In this method we return the partial result of a stopped search.
+        With the board spec a compact best state is decoded into a rush
+        hour game.
+        """
+        best_state = self.best_state
+        if spec is not None and best_state is not None and not hasattr(best_state, 'vehicles'):
+            best_state = spec.decode(best_state)
+
+        print(f"Search stopped on {self.exceeded} after {self.expansions} expansions.")
+        return PartialResult(self.exceeded, best_state, self.best_heuristic, self.expansions, time.time() - self.start_time)
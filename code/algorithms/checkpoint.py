@@ -0,0 +1,208 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+from code.game.compiler import board_csv
+
+
+# The journals of a checkpoint are its path, the name of the journal and this
+JOURNAL_SUFFIX = '.journal'
+
+
+def board_fingerprint(solver_name, game, **settings):
+    """
+    In this function we describe a search in a way that can be stored
+    with its checkpoint: the solver, a hash of the board and the settings
+    that change the order of the search. A checkpoint is only resumed by
+    a search with the same fingerprint.
+    """
+    return {
+        'solver': solver_name,
+        'board': hashlib.sha256(board_csv(game).encode()).hexdigest(),
+        'settings': settings,
+    }
+
+
+class SearchCheckpoint:
+    """
+    In this class we save the progress of a long search to disk, so a run
+    that dies can continue where it was. The data of the search is kept
+    in append-only journals: the solver appends a fixed size record for
+    every state it finds, and only the new records are written at every
+    checkpoint. The small metadata file, with the counters of the search
+    and how long every journal is, is replaced atomically after the
+    journals are on disk, so it never points at data that is not there.
+
+    Writing happens on a background thread. The search loop only swaps
+    the buffers of new records for empty ones, which takes microseconds,
+    and while the previous checkpoint is still being written the next one
+    waits.
+    """
+
+    def __init__(self, path, interval=60):
+        """
+        In this method we set the path of the metadata file, the journals
+        are stored next to it, and the seconds between two checkpoints.
+        """
+        self.path = path
+        self.interval = interval
+
+        # the records that are not written yet, and the bytes of every
+        # journal that are written or being written
+        self.buffers = {}
+        self.lengths = {}
+
+        self.fingerprint = None
+        self.writer = None
+        self.last_save = time.monotonic()
+
+        # the number of checkpoints and the longest time save took
+        self.saves = 0
+        self.longest_save = 0.0
+
+
+    def journal_path(self, name):
+        return f"{self.path}.{name}{JOURNAL_SUFFIX}"
+
+
+    def restore(self, fingerprint):
+        """
+        In this method we load the last checkpoint of the same search.
+        Returns the counters of the search and the bytes of every journal,
+        or None if there is no checkpoint, in which case a new one is
+        started. The journals are cut back to the length in the metadata,
+        so the records of a half finished write are dropped.
+        """
+        self.fingerprint = fingerprint
+        self.buffers = {}
+        self.lengths = {}
+        self.last_save = time.monotonic()
+
+        if not os.path.exists(self.path):
+            self.remove_journals()
+            return None
+
+        with open(self.path) as file:
+            metadata = json.load(file)
+
+        if metadata['fingerprint'] != fingerprint:
+            raise ValueError(f"{self.path} is a checkpoint of a different search")
+
+        journals = {}
+        for name, length in metadata['lengths'].items():
+            with open(self.journal_path(name), 'r+b') as file:
+                journals[name] = file.read(length)
+                file.truncate(length)
+
+            if len(journals[name]) != length:
+                raise ValueError(f"the journal {name} of {self.path} is shorter than its checkpoint")
+            self.lengths[name] = length
+
+        return metadata['counters'], journals
+
+
+    def append(self, name, data):
+        """
+        In this method we add a record to a journal, it is written at the
+        next checkpoint.
+        """
+        buffer = self.buffers.get(name)
+        if buffer is None:
+            buffer = self.buffers[name] = bytearray()
+        buffer += data
+
+
+    def due(self):
+        """
+        In this method we check if it is time for a checkpoint and the
+        previous one is written.
+        """
+        if time.monotonic() - self.last_save < self.interval:
+            return False
+        return self.writer is None or not self.writer.is_alive()
+
+
+    def save(self, counters, wait=False):
+        """
+        In this method we start writing a checkpoint with the given
+        counters of the search. The new records are handed to the writer
+        thread, so this returns at once unless we wait for it.
+        """
+        start_time = time.perf_counter()
+
+        # the previous checkpoint has to be on disk before this one
+        if self.writer is not None:
+            self.writer.join()
+
+        buffers, self.buffers = self.buffers, {}
+        for name, buffer in buffers.items():
+            self.lengths[name] = self.lengths.get(name, 0) + len(buffer)
+
+        metadata = {'fingerprint': self.fingerprint, 'counters': counters, 'lengths': dict(self.lengths)}
+        self.writer = threading.Thread(target=self.write, args=(buffers, metadata), daemon=True)
+        self.writer.start()
+
+        self.last_save = time.monotonic()
+        self.saves += 1
+        self.longest_save = max(self.longest_save, time.perf_counter() - start_time)
+
+        if wait:
+            self.writer.join()
+
+
+    def write(self, buffers, metadata):
+        """
+        In this method the writer thread appends the new records to the
+        journals and then replaces the metadata file.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+
+        for name, buffer in buffers.items():
+            with open(self.journal_path(name), 'ab') as file:
+                file.write(buffer)
+                file.flush()
+                os.fsync(file.fileno())
+
+        # write to a temporary file first, so a crash never leaves half a file
+        temporary_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary_path, 'w') as file:
+            json.dump(metadata, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_path, self.path)
+
+
+    def finish(self):
+        """
+        In this method we remove the checkpoint when the search is done,
+        so the next run starts from the beginning.
+        """
+        if self.writer is not None:
+            self.writer.join()
+            self.writer = None
+
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.remove_journals()
+
+
+    def remove_journals(self):
+        """
+        In this method we remove the journal files of this checkpoint, also
+        those of a run that died before its first metadata was written.
+        Only files named like a journal, the path, a journal name and the
+        journal suffix, are removed, never other files next to the path.
+        """
+        directory = os.path.dirname(os.path.abspath(self.path))
+        prefix = os.path.basename(self.path) + '.'
+
+        if not os.path.isdir(directory):
+            return
+
+        for file_name in os.listdir(directory):
+            if not (file_name.startswith(prefix) and file_name.endswith(JOURNAL_SUFFIX)):
+                continue
+            if file_name[len(prefix):-len(JOURNAL_SUFFIX)].isidentifier():
+                os.remove(os.path.join(directory, file_name))
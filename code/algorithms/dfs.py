@@ -1,5 +1,11 @@
 import time
+from code.algorithms.budget import blocking_heuristic
+from code.algorithms.checkpoint import board_fingerprint
 from code.game.rush_hour import RushHour, Vehicle
+from code.game.bitboard import BitBoard
+from code.game.compiler import compile_board
+from code.game.state import BoardSpec, State
+from code.game.zobrist import ZobristDict
 
 class RushHourDFS:
     """
@@ -7,7 +13,7 @@ class RushHourDFS:
     search algorithm that can solve our rush hour problem.
     """
 
-    def __init__(self, initial_state):
+    def __init__(self, initial_state, use_bitboard=False, use_compiled=False, use_zobrist=False, in_place=False, budget=None, checkpoint=None):
         """
         In this method we will define the starting state and initialise
         some starting variables.
@@ -15,10 +21,32 @@ class RushHourDFS:
 
         # create some starting/initial variables
         self.initial_state = initial_state
-        self.visited = set()
+        self.spec = BoardSpec(initial_state)
+
+        # key the visited states on their zobrist hash if asked for
+        self.use_zobrist = use_zobrist
+        self.visited = ZobristDict(self.spec) if use_zobrist else set()
         self.solution_path = []
         self.states_visited = 0
 
+        # use the bitboard engine for move generation if asked for, or the
+        # move generator compiled for this board which replaces it
+        if use_compiled:
+            self.bitboard = compile_board(initial_state)
+        else:
+            self.bitboard = BitBoard(initial_state) if use_bitboard else None
+
+        # search on one mutable board with make/unmake moves if asked for
+        self.in_place = in_place
+        self.solution_moves = []
+
+        # the limits of the search, a SearchBudget, or None to run until done
+        self.budget = budget
+
+        # save the progress to disk now and then, a SearchCheckpoint, and
+        # resume from it if it holds a checkpoint of this search
+        self.checkpoint = checkpoint
+
     def depth_first_search(self):
         """
         In this method we run the depth first search algorithm
@@ -26,23 +54,54 @@ class RushHourDFS:
         gamestates from the initial to the final board.
         """
 
+        if self.budget is not None:
+            self.budget.start()
+
+        # continue from the checkpoint if there is one
+        checkpoint = self.checkpoint
+        restored = None
+        if checkpoint is not None:
+            restored = checkpoint.restore(board_fingerprint('RushHourDFS', self.initial_state, in_place=self.in_place))
+
+        # the in place search keeps only one board in memory
+        if self.in_place:
+            return self.depth_first_search_in_place(restored)
+
         # start the timer when we run the algorithm
         start_time = time.time()
 
-        # add the initial state to the visited set
-        self.visited.add(self.initial_state.get_state_hashable())
+        if restored is not None:
+            stack = self.restore_checkpoint(restored)
+        else:
+            # add the initial state to the visited set
+            self.visit(self.initial_state)
 
-        # create a stack for our iterative depth first search
-        stack = [self.initial_state]
+            # create a stack for our iterative depth first search
+            stack = [self.initial_state]
+            if checkpoint is not None:
+                checkpoint.append('pushed', self.spec.encode(self.initial_state))
 
         # loop if the stack is not empty
         while stack:
 
+            # every state we pushed and popped is in the journals, so this is a good moment to save
+            if checkpoint is not None and checkpoint.due():
+                checkpoint.save({'states_visited': self.states_visited})
+
             # get the top from the stack
             current_state = stack.pop()
 
+            # stop with the best state so far if the budget has run out,
+            # the state is not in the popped journal yet so a resumed search pushes it again
+            if self.budget_exceeded(current_state):
+                if checkpoint is not None:
+                    checkpoint.save({'states_visited': self.states_visited}, wait=True)
+                return self.budget.partial_result(self.spec)
+
             # append the top of the stack to the solution path
             self.solution_path.append(current_state)
+            if checkpoint is not None:
+                checkpoint.append('popped', self.spec.encode(current_state))
 
             # stop condition - check if we have won
             if self.check_win(current_state):
@@ -54,27 +113,220 @@ class RushHourDFS:
 
             # create next states
             for next_state in self.generate_next_states(current_state):
-                state_hash = next_state.get_state_hashable()
 
                 # check if those states are new states
-                if state_hash not in self.visited:
-                    self.visited.add(state_hash)
+                if self.visit(next_state):
 
                     # put the state on the stack
                     stack.append(next_state)
+                    if checkpoint is not None:
+                        checkpoint.append('pushed', self.spec.encode(next_state))
 
                     # increase the states visited counter
                     self.states_visited += 1
 
+        # the search is done, so the checkpoint is not needed anymore
+        if checkpoint is not None:
+            checkpoint.finish()
+
         # return the paht with our solution
         return self.solution_path
 
+    def restore_checkpoint(self, restored):
+        """
+        In this method we rebuild the search from a checkpoint. The journals
+        hold every state in the order it was pushed and popped. Every state
+        is pushed once, and the stack only takes states off its top, so the
+        states that were pushed and not popped are the stack in the same
+        order. Returns the stack.
+        """
+        counters, journals = restored
+        width = len(self.spec.vehicles)
+
+        pushed = journals.get('pushed', b'')
+        popped = journals.get('popped', b'')
+
+        # every pushed state is a visited state
+        games = {}
+        for start in range(0, len(pushed), width):
+            state = State(pushed[start:start + width])
+            games[state] = self.spec.decode(state)
+            self.visit(games[state])
+
+        popped = [State(popped[start:start + width]) for start in range(0, len(popped), width)]
+        self.solution_path = [games[state] for state in popped]
+
+        popped = set(popped)
+        stack = [game for state, game in games.items() if state not in popped]
+
+        self.states_visited = counters['states_visited']
+        print(f"Resumed from a checkpoint with {len(games)} states.")
+        return stack
+
+    def depth_first_search_in_place(self, restored=None):
+        """
+        In this method we run the depth first search on a single mutable
+        board. The stack holds the moves we made and, per depth, the
+        generator of the moves we still have to try, so going back up is
+        just undoing the last move. The solution path of states is only
+        built at the end by replaying the moves.
+        """
+        checkpoint = self.checkpoint
+
+        # work on a copy, so the initial state stays as it is
+        board = self.clone_rush_hour_state(self.initial_state)
+
+        # the moves that lead to the current board and the move generators,
+        # and the last move the deepest generator gave that we came back from
+        if restored is not None:
+            move_stack, move_generators, last_move = self.restore_checkpoint_in_place(restored, board)
+        else:
+            self.visit(board)
+            if checkpoint is not None:
+                checkpoint.append('visited', self.spec.encode(board))
+
+            move_stack = []
+            move_generators = [board.iter_moves()]
+            last_move = None
+
+        while move_generators and not self.check_win(board):
+
+            # stop with the best state so far if the budget has run out
+            stopped = self.budget_exceeded(board)
+
+            # the moves and the last move are enough to build the generators again
+            if checkpoint is not None and (stopped or checkpoint.due()):
+                checkpoint.save({'states_visited': self.states_visited, 'move_stack': list(move_stack), 'last_move': last_move}, wait=stopped)
+
+            if stopped:
+                return self.budget.partial_result(self.spec)
+
+            # try the next move of the deepest board
+            for move in move_generators[-1]:
+                board.make_move(*move)
+
+                # go deeper if this is a new state
+                if self.visit(board):
+                    move_stack.append(move)
+                    move_generators.append(board.iter_moves())
+                    last_move = None
+                    if checkpoint is not None:
+                        checkpoint.append('visited', self.spec.encode(board))
+
+                    # increase the states visited counter
+                    self.states_visited += 1
+                    break
+
+                board.unmake_move(move)
+
+            # no moves left on this depth, so go one level back up
+            else:
+                move_generators.pop()
+                if move_stack:
+                    last_move = move_stack.pop()
+                    board.unmake_move(last_move)
+
+        # the search is done, so the checkpoint is not needed anymore
+        if checkpoint is not None:
+            checkpoint.finish()
+
+        # return an empty path if we have not found a solution
+        if not move_generators:
+            return []
+
+        print(f"Number of states visited: {self.states_visited}")
+
+        # replay the moves to get the states on the solution path
+        self.solution_moves = move_stack
+        self.solution_path = [self.initial_state]
+        for vehicle_name, distance in move_stack:
+            next_state = self.clone_rush_hour_state(self.solution_path[-1])
+            next_state.move_vehicle(vehicle_name, distance)
+            self.solution_path.append(next_state)
+
+        return self.solution_path
+
+    def restore_checkpoint_in_place(self, restored, board):
+        """
+        In this method we rebuild the in place search from a checkpoint.
+        The journal holds every visited state. The generators give their
+        moves in a fixed order, so we make a new generator for every depth
+        and let it give moves until the move we took from it, and the
+        deepest one until the last move we came back from. Returns the
+        move stack, the move generators and the last move.
+        """
+        counters, journals = restored
+        width = len(self.spec.vehicles)
+
+        visited = journals.get('visited', b'')
+        for start in range(0, len(visited), width):
+            self.visit(self.spec.decode(State(visited[start:start + width])))
+
+        move_stack = [tuple(move) for move in counters['move_stack']]
+        last_move = tuple(counters['last_move']) if counters['last_move'] is not None else None
+
+        move_generators = []
+        for depth, move in enumerate(move_stack + [last_move]):
+            move_generators.append(board.iter_moves())
+            if move is None:
+                break
+
+            # the generator reads the board, so it has to be at this depth
+            for generated_move in move_generators[-1]:
+                if generated_move == move:
+                    break
+
+            if depth < len(move_stack):
+                board.make_move(*move)
+
+        self.states_visited = counters['states_visited']
+        print(f"Resumed from a checkpoint with {len(visited) // width} states.")
+        return move_stack, move_generators, last_move
+
+    def budget_exceeded(self, state):
+        """
+        In this method we let the budget remember the state if it is the
+        best one so far, count the expansion and return whether the
+        search has to stop. Without a budget it never has to stop.
+        """
+        if self.budget is None:
+            return False
+
+        compact_state = self.spec.encode(state)
+        self.budget.consider(compact_state, blocking_heuristic(self.spec, compact_state))
+        return self.budget.expand() is not None
+
+    def visit(self, state):
+        """
+        In this method we add a state to the visited set and return
+        whether it is a new state.
+        """
+
+        # the zobrist hash is kept up to date by move_vehicle, the compact
+        # state is only compared when the hash is already taken
+        if self.use_zobrist:
+            exact_state = self.spec.encode(state)
+            if self.visited.contains_hashed(state.zobrist_hash, exact_state):
+                return False
+            self.visited.set_hashed(state.zobrist_hash, exact_state, None)
+            return True
+
+        state_hash = state.get_state_hashable()
+        if state_hash in self.visited:
+            return False
+        self.visited.add(state_hash)
+        return True
+
     def generate_next_states(self, current_state):
         """
         In this method we create the new states from the state
         we are currently on.
         """
 
+        # let the bitboard decide the legal moves if it is enabled
+        if self.bitboard is not None:
+            return self.bitboard.generate_next_states(current_state)
+
         # create an empty list for new / next states
         next_states = []
 
@@ -123,6 +375,10 @@ class RushHourDFS:
         is a solution to solve the game.
         """
 
+        # the bitboard only has to look at the red car offset
+        if self.bitboard is not None:
+            return self.bitboard.check_win(state)
+
         # get our red car from the vehicles
         red_car = state.vehicles.get('X')
 
@@ -152,6 +408,9 @@ class RushHourDFS:
             cloned_vehicle = Vehicle(vehicle.name, vehicle.length, vehicle.orientation, vehicle.row, vehicle.col)
             cloned_game.vehicles[name] = cloned_vehicle
 
+        # the vehicles are not added again, so copy the zobrist hash
+        cloned_game.zobrist_hash = rush_hour_state.zobrist_hash
+
         return cloned_game
 
 if __name__ == "__main__":
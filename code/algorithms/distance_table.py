@@ -0,0 +1,250 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+
+from code.game.bitboard import BitBoard
+from code.game.compiler import board_csv
+from code.game.rush_hour import RushHour
+from code.game.state import BoardSpec
+
+
+# Directory where the distance tables are stored
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'distance_tables')
+
+# Every file starts with this, followed by the length of the json header
+MAGIC = b'RHDT2'
+
+# Every distance is stored as an unsigned 16 bit little endian number
+DISTANCE = struct.Struct('<H')
+
+# Distance stored for states from which the exit cannot be reached
+UNREACHABLE = 0xFFFF
+
+
+class RushHourDistanceTable:
+    """
+    In this class we precompute, once per board, the number of moves to
+    the exit for every state that can be reached from the initial state.
+    The reachable states are enumerated by a breadth first search, and
+    then a second breadth first search goes backward from all goal states
+    at the same time. The table is stored on disk as the sorted compact
+    states followed by a two byte distance per state and memory-mapped, so
+    afterwards every position of the board is answered optimally without
+    searching: we only step to a neighbour that is one move closer.
+    """
+
+    def __init__(self, initial_state, min_slides=False, cache_dir=CACHE_DIR):
+        """
+        In this method we load the table of the board from the cache, or
+        build and store it first.
+        """
+        self.initial_state = initial_state
+        self.spec = BoardSpec(initial_state)
+        self.bitboard = BitBoard(initial_state)
+
+        # count a slide of any distance as one move if asked for
+        self.min_slides = min_slides
+
+        # every state is one byte per vehicle
+        self.width = len(self.spec.vehicles)
+
+        self.load_table(cache_dir)
+
+
+    def load_table(self, cache_dir):
+        """
+        In this method we memory-map the table file of this board and build
+        and store the file first if it is not there. Without a cache
+        directory the table is only kept in memory.
+        """
+        metadata = {
+            'board': hashlib.sha256(board_csv(self.initial_state).encode()).hexdigest(),
+            'min_slides': self.min_slides,
+            'format': MAGIC.decode(),
+        }
+        key = hashlib.sha256(json.dumps(metadata, sort_keys=True).encode()).hexdigest()
+
+        if cache_dir is None:
+            states, distances = self.build_table()
+            self.data = states + distances
+            self.start = 0
+            self.count = len(distances) // DISTANCE.size
+            return
+
+        path = os.path.join(cache_dir, f"table_{key}.bin")
+
+        if not os.path.exists(path):
+            states, distances = self.build_table()
+            metadata['count'] = len(distances) // DISTANCE.size
+            header = json.dumps(metadata, sort_keys=True).encode()
+
+            # write to a temporary file first, so a crash never leaves half a file
+            os.makedirs(cache_dir, exist_ok=True)
+            temporary_path = f"{path}.{os.getpid()}.tmp"
+            with open(temporary_path, 'wb') as file:
+                file.write(MAGIC)
+                file.write(struct.pack('<I', len(header)))
+                file.write(header)
+                file.write(states)
+                file.write(distances)
+            os.replace(temporary_path, path)
+
+        with open(path, 'rb') as file:
+            self.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self.mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a distance table")
+
+        # the states start after the header, and the distances after the states
+        header_length, = struct.unpack_from('<I', self.mmap, len(MAGIC))
+        self.data = self.mmap
+        self.start = len(MAGIC) + 4 + header_length
+        self.count = json.loads(self.mmap[len(MAGIC) + 4:self.start])['count']
+
+
+    def build_table(self):
+        """
+        In this method we enumerate all states reachable from the initial
+        state and compute their distance to the nearest goal state. Rush
+        hour moves can always be undone, so the backward search uses the
+        normal moves. Returns the sorted states as one bytes object and the
+        distances in the same order.
+        """
+        initial_state = self.spec.encode(self.initial_state)
+
+        # forward: every state that can be reached
+        reachable = {initial_state}
+        layer = [initial_state]
+        while layer:
+            next_layer = []
+            for state in layer:
+                for next_state in self.neighbours(state):
+                    if next_state not in reachable:
+                        reachable.add(next_state)
+                        next_layer.append(next_state)
+            layer = next_layer
+
+        # backward: all goal states at distance zero, then layer by layer
+        distance_of = {state: 0 for state in reachable if self.spec.is_win(state)}
+        layer = list(distance_of)
+        distance = 0
+        while layer:
+            distance += 1
+            next_layer = []
+            for state in layer:
+                for next_state in self.neighbours(state):
+                    if next_state not in distance_of:
+                        distance_of[next_state] = distance
+                        next_layer.append(next_state)
+            layer = next_layer
+
+            # a clamped distance would leave solve without a next state
+            if layer and distance >= UNREACHABLE:
+                raise ValueError(f"The board has states more than {UNREACHABLE - 1} moves from the exit")
+
+        states = sorted(reachable)
+        distances = b''.join(DISTANCE.pack(distance_of.get(state, UNREACHABLE)) for state in states)
+        return b''.join(states), distances
+
+
+    def neighbours(self, state):
+        """
+        In this method we return all compact states one move away.
+        """
+        if self.min_slides:
+            moves = self.bitboard.legal_slides(state)
+        else:
+            moves = self.bitboard.legal_moves(state)
+        return [state.move(i, distance) for i, distance in moves]
+
+
+    def __len__(self):
+        return self.count
+
+
+    def distance(self, state):
+        """
+        In this method we return the number of moves from a compact state
+        or rush hour game to the exit, UNREACHABLE if there is no way out,
+        or None if the state is not in the reachable part of the board.
+        """
+        if isinstance(state, RushHour):
+            state = self.spec.encode(state)
+
+        # binary search over the sorted fixed width states
+        data, start, width = self.data, self.start, self.width
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if data[start + middle * width:start + (middle + 1) * width] < state:
+                low = middle + 1
+            else:
+                high = middle
+
+        if low < self.count and data[start + low * width:start + (low + 1) * width] == state:
+            return DISTANCE.unpack_from(data, start + self.count * width + low * DISTANCE.size)[0]
+        return None
+
+
+    def solve(self, state=None):
+        """
+        In this method we return a shortest list of moves (vehicle name,
+        distance) from a compact state or rush hour game to the exit, by
+        always taking a move to a state that is one move closer. Without a
+        state the initial state is used. Returns None if there is no way
+        out, the state is not in the table or the table has no closer
+        neighbour for a state.
+        """
+        if state is None:
+            state = self.initial_state
+        if isinstance(state, RushHour):
+            state = self.spec.encode(state)
+
+        distance = self.distance(state)
+        if distance is None or distance == UNREACHABLE:
+            return None
+
+        moves = []
+        while distance > 0:
+            for next_state in self.neighbours(state):
+                if self.distance(next_state) == distance - 1:
+                    moves.append(self.spec.move_between(state, next_state))
+                    state = next_state
+                    distance -= 1
+                    break
+            else:
+                # no neighbour is one move closer, so the table does not fit this board
+                return None
+
+        return moves
+
+
+if __name__ == "__main__":
+
+    # python -m code.algorithms.distance_table [gameboard csv files]
+    # precomputes the tables of the given boards, or asks for one board
+    if len(sys.argv) > 1:
+        from code.game.loader import load_board
+        games = {path: load_board(path) for path in sys.argv[1:]}
+    else:
+        games = {'chosen board': RushHour()}
+
+    for name, rush_hour_game in games.items():
+        start_time = time.time()
+        table = RushHourDistanceTable(rush_hour_game)
+        elapsed_time = time.time() - start_time
+
+        print(f"{name}: {len(table)} reachable states, loaded in {elapsed_time:.2f} seconds")
+
+        start_time = time.time()
+        solution_path = table.solve()
+        elapsed_time = time.time() - start_time
+
+        if solution_path is not None:
+            print(f"Solution found in {len(solution_path)} moves in {elapsed_time * 1000:.2f} milliseconds!")
+        else:
+            print("No solution found.")
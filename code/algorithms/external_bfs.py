@@ -0,0 +1,304 @@
+import heapq
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from code.game.bitboard import BitBoard
+from code.game.rush_hour import RushHour
+from code.game.state import BoardSpec, State
+
+
+# Number of states read from a layer or run file at once
+READ_CHUNK = 4096
+
+# Most run files that are merged at once, more runs are merged in rounds
+MAX_MERGE_FILES = 128
+
+# Rough number of bytes a buffered state costs on top of its own size,
+# for the set slot and the list pointer
+BUFFER_OVERHEAD = 64
+
+
+class RushHourExternalBFS:
+    """
+    In this class we perform the breadth first search with the layers on
+    disk instead of in memory. Every layer is a file of sorted packed
+    states, one byte per vehicle. The next layer is generated into a
+    buffer of bounded size, which is sorted and written as a run file
+    whenever it is full. The runs are then merged, and the states that are
+    already in the current or the previous layer are removed while
+    merging: rush hour moves can always be undone, so a new state can only
+    be a duplicate of those two layers. The solution path is found
+    afterwards by walking back through the layer files.
+    """
+
+    def __init__(self, initial_state, max_memory_bytes=64 * 1024 * 1024, scratch_dir=None, keep_files=False, min_slides=False):
+        """
+        In this method we define some initial starting variables.
+        """
+
+        # we set the initial state and its compact version
+        self.initial_state = initial_state
+        self.spec = BoardSpec(initial_state)
+        self.bitboard = BitBoard(initial_state)
+
+        # every state is one byte per vehicle in the files
+        self.width = len(self.spec.vehicles)
+
+        # the buffer of new states is written to disk above this many states
+        self.buffer_limit = max(1, max_memory_bytes // (sys.getsizeof(self.spec.encode(initial_state)) + BUFFER_OVERHEAD))
+
+        # directory for the layer and run files, a temporary one by default
+        self.scratch_dir = scratch_dir
+        self.keep_files = keep_files
+
+        # count a slide of any distance as one move if asked for
+        self.min_slides = min_slides
+
+        # create counters for the states visited and the run files written
+        self.states_visited = 0
+        self.runs_written = 0
+
+
+    def bfs(self):
+        """
+        In this method we perform the breadth first search layer by layer on
+        disk and return the moves of the solution, in the same format as
+        RushHourBFS.calculate_moves, or None if there is no solution.
+        """
+        print("Starting external memory BFS...")
+        print("Initial Board:")
+        self.initial_state.display_board()
+
+        initial_state = self.spec.encode(self.initial_state)
+        if self.spec.is_win(initial_state):
+            return []
+
+        scratch_dir = tempfile.mkdtemp(prefix='rush_hour_bfs_', dir=self.scratch_dir)
+
+        try:
+            # the first layer only holds the initial state
+            layer_paths = [os.path.join(scratch_dir, 'layer_0.bin')]
+            with open(layer_paths[0], 'wb') as file:
+                file.write(initial_state)
+
+            goal = None
+            layer_size = 1
+
+            while goal is None and layer_size > 0:
+                depth = len(layer_paths) - 1
+                run_paths, goal = self.expand_layer(layer_paths[depth], scratch_dir, depth)
+
+                if goal is None:
+                    # merge the runs into the next layer without the duplicates
+                    next_layer_path = os.path.join(scratch_dir, f'layer_{depth + 1}.bin')
+                    layer_size = self.merge_runs(run_paths, layer_paths[max(0, depth - 1):], next_layer_path)
+                    layer_paths.append(next_layer_path)
+                    self.states_visited += layer_size
+
+                for run_path in run_paths:
+                    os.remove(run_path)
+
+            if goal is None:
+                print("No solution found.")
+                return None
+
+            solution_path = self.backtrack_path(goal, layer_paths)
+
+        finally:
+            if not self.keep_files:
+                shutil.rmtree(scratch_dir, ignore_errors=True)
+
+        print("Winning path found!")
+        print(f"Number of states visited: {self.states_visited}")
+        self.spec.decode(solution_path[-1]).display_board()
+
+        return self.calculate_moves(solution_path)
+
+
+    def expand_layer(self, layer_path, scratch_dir, depth):
+        """
+        In this method we generate the successors of every state in a layer
+        file into sorted run files. Returns the paths of the runs, and the
+        goal state with its parent as soon as a goal is generated.
+        """
+        run_paths = []
+        buffer = set()
+
+        for current_state in self.read_states(layer_path):
+            for next_state in self.neighbours(current_state):
+
+                # every goal in this layer is a shortest solution
+                if self.spec.is_win(next_state):
+                    return run_paths, (next_state, current_state)
+
+                buffer.add(next_state)
+
+                # the buffer is full, write it to disk as a sorted run
+                if len(buffer) >= self.buffer_limit:
+                    run_paths.append(self.write_run(buffer, scratch_dir, depth, len(run_paths)))
+                    buffer = set()
+
+        if buffer:
+            run_paths.append(self.write_run(buffer, scratch_dir, depth, len(run_paths)))
+
+        return run_paths, None
+
+
+    def write_run(self, buffer, scratch_dir, depth, number):
+        """
+        In this method we write a buffer of states sorted to a run file.
+        """
+        path = os.path.join(scratch_dir, f'run_{depth + 1}_{number}.bin')
+        with open(path, 'wb') as file:
+            file.write(b''.join(sorted(buffer)))
+
+        self.runs_written += 1
+        return path
+
+
+    def merge_runs(self, run_paths, exclude_paths, layer_path):
+        """
+        In this method we merge sorted run files into one sorted layer file,
+        leaving out duplicates and the states of the excluded layer files.
+        Returns the number of states in the new layer.
+        """
+        # with too many runs to open at once, merge groups of them first
+        while len(run_paths) > MAX_MERGE_FILES:
+            merged_paths = []
+            for start in range(0, len(run_paths), MAX_MERGE_FILES):
+                group = run_paths[start:start + MAX_MERGE_FILES]
+                merged_path = f"{group[0]}.merged"
+                self.merge_runs(group, [], merged_path)
+                for run_path in group:
+                    os.remove(run_path)
+                merged_paths.append(merged_path)
+            run_paths[:] = merged_paths
+
+        merged = heapq.merge(*(self.read_states(path) for path in run_paths))
+        excluded = heapq.merge(*(self.read_states(path) for path in exclude_paths))
+        next_excluded = next(excluded, None)
+
+        count = 0
+        previous_state = None
+
+        with open(layer_path, 'wb') as file:
+            for state in merged:
+                if state == previous_state:
+                    continue
+                previous_state = state
+
+                # both streams are sorted, so we only walk forward
+                while next_excluded is not None and next_excluded < state:
+                    next_excluded = next(excluded, None)
+                if next_excluded == state:
+                    continue
+
+                file.write(state)
+                count += 1
+
+        return count
+
+
+    def read_states(self, path):
+        """
+        In this method we read the packed states of a file one at a time,
+        a chunk of states per read.
+        """
+        width = self.width
+        with open(path, 'rb') as file:
+            while True:
+                data = file.read(width * READ_CHUNK)
+                if not data:
+                    return
+                for start in range(0, len(data), width):
+                    yield State(data[start:start + width])
+
+
+    def contains(self, layer_path, state):
+        """
+        In this method we check if a sorted layer file holds a state by a
+        binary search on disk.
+        """
+        width = self.width
+        with open(layer_path, 'rb') as file:
+            low, high = 0, os.path.getsize(layer_path) // width
+            while low < high:
+                middle = (low + high) // 2
+                file.seek(middle * width)
+                if file.read(width) < state:
+                    low = middle + 1
+                else:
+                    high = middle
+
+            file.seek(low * width)
+            return file.read(width) == state
+
+
+    def neighbours(self, state):
+        """
+        In this method we return all compact states one move away.
+        """
+        if self.min_slides:
+            moves = self.bitboard.legal_slides(state)
+        else:
+            moves = self.bitboard.legal_moves(state)
+        return [state.move(i, distance) for i, distance in moves]
+
+
+    def backtrack_path(self, goal, layer_paths):
+        """
+        In this method we walk back from the goal through the layer files:
+        the parent of a state on layer d is any of its neighbours on layer
+        d - 1, because every move can be undone.
+        """
+        goal_state, parent = goal
+        path = [goal_state, parent]
+
+        for depth in range(len(layer_paths) - 2, -1, -1):
+            for neighbour in self.neighbours(path[-1]):
+                if self.contains(layer_paths[depth], neighbour):
+                    path.append(neighbour)
+                    break
+
+        return path[::-1]
+
+
+    def calculate_moves(self, solution_path):
+        """
+        In this method we will calculate the order of the moves done
+        to get from our initial state to the solution state.
+        """
+        moves = []
+        for i in range(1, len(solution_path)):
+            move = self.spec.move_between(solution_path[i - 1], solution_path[i])
+            if move:
+                moves.append(move)
+        return moves
+
+
+if __name__ == "__main__":
+
+    # create an instance of the rush hour game
+    rush_hour_game = RushHour()
+
+    solver = RushHourExternalBFS(rush_hour_game)
+
+    # find the solution and time it
+    start_time = time.time()
+    solution_path = solver.bfs()
+    end_time = time.time()
+
+    if solution_path:
+        print("Solution sequence of moves:")
+        for move in solution_path:
+            print(move)
+        print(f"Solution found in {len(solution_path)} moves!")
+
+        elapsed_time = end_time - start_time
+        print(f"Time taken to solve the board: {elapsed_time:.2f} seconds")
+
+    else:
+        print("No solution found.")
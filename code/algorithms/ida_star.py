@@ -0,0 +1,277 @@
+import time
+
+from code.algorithms.astar2 import RushHourAStar2, default_heuristic_settings
+from code.game.rush_hour import RushHour
+from code.game.bitboard import BitBoard
+from code.game.state import BoardSpec
+
+
+class BoundedTranspositionTable:
+    """
+    A transposition table with a fixed number of slots, so its memory use
+    never grows during the search. Every state has one slot, picked by its
+    zobrist hash, and a new state simply replaces the state in its slot.
+    The exact compact state is kept next to the value, so a state that
+    lands in the slot of another state is never mistaken for it.
+    """
+
+    def __init__(self, size):
+        """
+        Create a table with the given number of slots.
+
+        Parameters:
+        size (int): The number of slots in the table.
+        """
+        self.size = size
+        self.states = [None] * size
+        self.values = [None] * size
+
+    def get(self, zobrist_hash, state):
+        """
+        Look up the value stored for a state.
+
+        Parameters:
+        zobrist_hash (int): The zobrist hash of the state.
+        state (State): The compact state.
+
+        Returns:
+        list or None: The stored value, or None if the state is not in the table.
+        """
+        slot = zobrist_hash % self.size
+        if self.states[slot] == state:
+            return self.values[slot]
+        return None
+
+    def put(self, zobrist_hash, state, value):
+        """
+        Store the value of a state, replacing whatever was in its slot.
+
+        Parameters:
+        zobrist_hash (int): The zobrist hash of the state.
+        state (State): The compact state.
+        value (list): The value to store.
+        """
+        slot = zobrist_hash % self.size
+        self.states[slot] = state
+        self.values[slot] = value
+
+
+class RushHourIDAStar:
+    """
+    Iterative deepening A* for the rush hour game. Every iteration is a
+    depth first search that cuts off states whose f = g + h is above the
+    bound, and the next bound is the lowest f that was cut off. Only the
+    current path is kept in memory, together with an optional transposition
+    table of a fixed size which remembers the heuristic value of a state and
+    the lowest g at which it was reached in the current iteration.
+    """
+
+    def __init__(self, initial_state, max_table_entries=1000000, min_slides=False, **heuristic_settings):
+        """
+        Set up the solver. The heuristic settings are passed on to
+        RushHourAStar2, whose heuristics are used. Without settings the
+        distance to the exit and the directly blocking cars are used, or in
+        minimum slides mode the slide blocking heuristic. These never
+        overestimate, so the solution found is a shortest one.
+
+        Parameters:
+        initial_state (RushHour): The initial state of the game.
+        max_table_entries (int): The number of slots in the transposition table, 0 to not use one.
+        min_slides (bool): Count a slide of any distance as one move.
+        """
+        self.initial_state = initial_state
+
+        # the heuristics of astar2, its own unbounded table is never used
+        if not heuristic_settings:
+            heuristic_settings = default_heuristic_settings(min_slides)
+        self.heuristics = RushHourAStar2(initial_state, **heuristic_settings)
+
+        # the static vehicle specs shared by all compact states, and the
+        # bitboard for their moves
+        self.spec = BoardSpec(initial_state)
+        self.bitboard = BitBoard(initial_state)
+
+        # the transposition table has a fixed size, or is not used at all
+        self.table = BoundedTranspositionTable(max_table_entries) if max_table_entries else None
+
+        # count a slide of any distance as one move if asked for
+        self.min_slides = min_slides
+
+        # keep track of visited states and the number of iterations
+        self.states_visited = 0
+        self.iterations = 0
+
+    def ida_star(self):
+        """
+        Perform iterative deepening A* to find a solution to the Rush Hour game.
+
+        Returns:
+        list of tuple: The moves (vehicle name, distance) from the initial state
+        to the goal state, or None if there is no solution.
+        """
+        print("Starting IDA*...")
+        print("Initial Board:")
+        self.initial_state.display_board()
+
+        initial_state = self.spec.encode(self.initial_state)
+
+        if self.spec.is_win(initial_state):
+            print("Winning state found!")
+            return []
+
+        bound = self.heuristic(initial_state)
+
+        while True:
+            self.iterations += 1
+            print(f"Iteration {self.iterations} with bound {bound}")
+
+            solution_path, next_bound = self.bounded_search(initial_state, bound)
+
+            if solution_path is not None:
+                print("Winning state found!")
+                self.spec.decode(solution_path[-1]).display_board()
+                print(f"Number of states visited: {self.states_visited}")
+                return self.calculate_moves(solution_path)
+
+            # nothing was cut off, so every reachable state has been searched
+            if next_bound == float('inf'):
+                print("No solution found.")
+                return None
+
+            bound = next_bound
+
+    def bounded_search(self, initial_state, bound):
+        """
+        Perform one depth first iteration below the given bound.
+
+        Parameters:
+        initial_state (State): The compact initial state.
+        bound (int): The highest f value that is searched.
+
+        Returns:
+        tuple: The states from the initial state to the goal or None, and
+        the lowest f value above the bound.
+        """
+        next_bound = float('inf')
+
+        # in minimum slides mode a slide of any distance costs one move
+        legal_moves = self.bitboard.legal_slides if self.min_slides else self.bitboard.legal_moves
+
+        # for every state on the current path its zobrist hash and the moves
+        # it still has to try, the states also as a set to skip cycles at once
+        path = [initial_state]
+        hashes = [self.spec.zobrist(initial_state)]
+        remaining_moves = [iter(legal_moves(initial_state))]
+        on_path = {initial_state}
+
+        while path:
+            current_state = path[-1]
+
+            for i, distance in remaining_moves[-1]:
+                next_state = current_state.move(i, distance)
+                if next_state in on_path:
+                    continue
+
+                next_hash = self.spec.zobrist_move(hashes[-1], current_state, i, distance)
+                next_g = len(path)
+                entry = self.lookup(next_hash, next_state)
+                next_f = next_g + entry[0]
+
+                # cut off above the bound, remember the lowest f cut off
+                if next_f > bound:
+                    next_bound = min(next_bound, next_f)
+                    continue
+
+                # already searched in this iteration with at least as many moves left
+                if entry[2] == self.iterations and entry[1] <= next_g:
+                    continue
+                entry[1] = next_g
+                entry[2] = self.iterations
+
+                self.states_visited += 1
+                path.append(next_state)
+
+                if self.spec.is_win(next_state):
+                    return path, next_bound
+
+                # go one level deeper
+                hashes.append(next_hash)
+                remaining_moves.append(iter(legal_moves(next_state)))
+                on_path.add(next_state)
+                break
+
+            else:
+                # all moves of this state are done, go one level back up
+                on_path.discard(path.pop())
+                hashes.pop()
+                remaining_moves.pop()
+
+        return None, next_bound
+
+    def lookup(self, zobrist_hash, state):
+        """
+        Find the table entry of a state, and create it if it is not there.
+
+        Parameters:
+        zobrist_hash (int): The zobrist hash of the state.
+        state (State): The compact state.
+
+        Returns:
+        list: The heuristic value, the lowest g and the iteration in which it was reached.
+        """
+        if self.table is None:
+            return [self.heuristic(state), None, None]
+
+        entry = self.table.get(zobrist_hash, state)
+        if entry is None:
+            entry = [self.heuristic(state), None, None]
+            self.table.put(zobrist_hash, state, entry)
+        return entry
+
+    def heuristic(self, state):
+        """
+        Calculate the heuristic value of a compact state with the heuristics
+        of astar2, which need the full board. The deadlock penalty of astar2
+        can make the value negative, which would let a goal beyond the bound
+        pass the cut off, so it is at least 0.
+
+        Parameters:
+        state (State): The compact state.
+
+        Returns:
+        int: The heuristic value.
+        """
+        return max(0, self.heuristics.evaluate_heuristics(self.spec.decode(state)))
+
+    def calculate_moves(self, solution_path):
+        """
+        Calculate the moves made along a path of compact states.
+
+        Parameters:
+        solution_path (list of State): The states from the initial state to the goal state.
+
+        Returns:
+        list of tuple: The moves (vehicle name, distance).
+        """
+        return [self.spec.move_between(solution_path[i - 1], solution_path[i]) for i in range(1, len(solution_path))]
+
+
+if __name__ == "__main__":
+
+    rush_hour_game = RushHour()
+
+    solver = RushHourIDAStar(rush_hour_game)
+    start_time = time.time()
+    solution_path = solver.ida_star()
+    end_time = time.time()
+
+    if solution_path:
+        print("Solution sequence of moves:")
+        for move in solution_path:
+            print(move)
+        print(f"Solution found in {len(solution_path)} moves!")
+
+        elapsed_time = end_time - start_time
+        print(f"Time taken to solve the board: {elapsed_time:.2f} seconds")
+    else:
+        print("No solution found.")
@@ -0,0 +1,220 @@
+class HeuristicComponents:
+    """
+    In this class we store the parts the A* heuristics are built from for
+    one state: the free cells of every row and column, the number of full
+    rows and columns, a bitmask and count of the vehicles that can take a
+    step, the cells and the blocked vertical vehicles in front of the red
+    car, and the vehicles RushHourAStar counts as blocking in its row.
+    """
+
+    __slots__ = ('row_free', 'col_free', 'full_lines', 'movable', 'mobile', 'direct', 'indirect', 'row_blockers')
+
+    def __init__(self, row_free, col_free, full_lines, movable, mobile, direct, indirect, row_blockers):
+        """
+        In this method we set the values of the components.
+        """
+        self.row_free = row_free
+        self.col_free = col_free
+        self.full_lines = full_lines
+        self.movable = movable
+        self.mobile = mobile
+        self.direct = direct
+        self.indirect = indirect
+        self.row_blockers = row_blockers
+
+
+class IncrementalHeuristics:
+    """
+    In this class we compute the heuristic components of a state from the
+    components of its parent and the move between them. Only the lines
+    the moved vehicle left and entered, the vehicles next to the cells it
+    changed and, when the move touches it, the lane in front of the red
+    car are looked at again, instead of the whole board.
+    """
+
+    def __init__(self, spec):
+        """
+        In this method we keep the static vehicle specs of the board.
+        Boards without a horizontal red car are not supported, the
+        heuristics are infinite on them anyway.
+        """
+        self.spec = spec
+        self.board_size = spec.board_size
+
+        red_index = spec.red_index
+        if red_index is None or spec.vehicles[red_index].orientation != 'H':
+            raise ValueError("Incremental heuristics need a horizontal red car")
+        self.red_index = red_index
+        self.red_row = spec.vehicles[red_index].lane
+        self.red_length = spec.vehicles[red_index].length
+
+
+    def initial(self, game):
+        """
+        In this method we compute all components of a rush hour game from
+        scratch, for the initial state or a state without a parent.
+        """
+        board = game.board
+        size = self.board_size
+
+        row_free = tuple(row.count('.') for row in board)
+        col_free = tuple(sum(board[row][col] == '.' for row in range(size)) for col in range(size))
+
+        movable = 0
+        mobile = 0
+        for i, vehicle in enumerate(game.vehicles.values()):
+            if self.can_step(board, vehicle):
+                movable |= 1 << i
+                mobile += 1
+
+        direct, indirect = self.red_lane(game)
+
+        return HeuristicComponents(row_free, col_free, row_free.count(0) + col_free.count(0), movable, mobile, direct, indirect, self.row_blockers(game))
+
+
+    def update(self, parent, game, index, distance):
+        """
+        In this method we compute the components of a rush hour game in
+        which the vehicle with the given index slid the given distance,
+        from the components of the game before the move.
+        """
+        board = game.board
+        size = self.board_size
+        spec = self.spec.vehicles[index]
+        vehicle = game.vehicles[spec.name]
+
+        # the cells the vehicle left and the cells it entered, as offsets in its lane
+        new_offset = vehicle.col if spec.orientation == 'H' else vehicle.row
+        old_offset = new_offset - distance
+        old_cells = set(range(old_offset, old_offset + spec.length))
+        new_cells = set(range(new_offset, new_offset + spec.length))
+        left = old_cells - new_cells
+        entered = new_cells - old_cells
+
+        # the lane keeps its number of free cells, only the crossing lines change
+        row_free, col_free = parent.row_free, parent.col_free
+        crossing = list(col_free if spec.orientation == 'H' else row_free)
+        full_lines = parent.full_lines
+        for offset in left:
+            full_lines -= crossing[offset] == 0
+            crossing[offset] += 1
+        for offset in entered:
+            crossing[offset] -= 1
+            full_lines += crossing[offset] == 0
+        if spec.orientation == 'H':
+            col_free = tuple(crossing)
+            changed = [(spec.lane, offset) for offset in left | entered]
+        else:
+            row_free = tuple(crossing)
+            changed = [(offset, spec.lane) for offset in left | entered]
+
+        # only the moved vehicle and the vehicles that step into a changed cell can change mobility
+        affected = {spec.name}
+        for row, col in changed:
+            for neighbour_row, neighbour_col, orientation in ((row, col - 1, 'H'), (row, col + 1, 'H'), (row - 1, col, 'V'), (row + 1, col, 'V')):
+                if 0 <= neighbour_row < size and 0 <= neighbour_col < size:
+                    name = board[neighbour_row][neighbour_col]
+                    if name != '.' and game.vehicles[name].orientation == orientation:
+                        affected.add(name)
+
+        movable = parent.movable
+        mobile = parent.mobile
+        for name in affected:
+            bit = 1 << self.spec.index[name]
+            if self.can_step(board, game.vehicles[name]):
+                if not movable & bit:
+                    movable |= bit
+                    mobile += 1
+            elif movable & bit:
+                movable &= ~bit
+                mobile -= 1
+
+        # the lane in front of the red car only changes when the red car moved, or a
+        # changed cell is in that lane or in the column of a vertical vehicle in it
+        red_car = game.vehicles['X']
+        nose = red_car.col + red_car.length
+        direct, indirect = parent.direct, parent.indirect
+        if index == self.red_index or any(
+            col >= nose and (row == self.red_row or self.is_vertical(game, board[self.red_row][col]))
+            for row, col in changed
+        ):
+            direct, indirect = self.red_lane(game)
+
+        # the row blockers only change for the moved vehicle, unless it is the red car
+        if index == self.red_index:
+            row_blockers = self.row_blockers(game)
+        else:
+            def is_row_blocker(offset):
+                row, col = (spec.lane, offset) if spec.orientation == 'H' else (offset, spec.lane)
+                return row == red_car.row and col > red_car.col + spec.length
+            row_blockers = parent.row_blockers + is_row_blocker(new_offset) - is_row_blocker(old_offset)
+
+        return HeuristicComponents(row_free, col_free, full_lines, movable, mobile, direct, indirect, row_blockers)
+
+
+    def is_vertical(self, game, name):
+        """
+        In this method we check if a cell holds a vertical vehicle.
+        """
+        return name != '.' and game.vehicles[name].orientation == 'V'
+
+
+    def can_step(self, board, vehicle):
+        """
+        In this method we check if a vehicle can take one step forward or
+        backward, like car_mobility_heuristic does with is_move_valid.
+        """
+        size = self.board_size
+        if vehicle.orientation == 'H':
+            end = vehicle.col + vehicle.length
+            return (end < size and board[vehicle.row][end] == '.') or (vehicle.col > 0 and board[vehicle.row][vehicle.col - 1] == '.')
+
+        end = vehicle.row + vehicle.length
+        return (end < size and board[end][vehicle.col] == '.') or (vehicle.row > 0 and board[vehicle.row - 1][vehicle.col] == '.')
+
+
+    def red_lane(self, game):
+        """
+        In this method we count the occupied cells in front of the red car
+        and the vertical vehicles there that are blocked, like the direct
+        and indirect blocking heuristics do.
+        """
+        board = game.board
+        red_car = game.vehicles['X']
+        lane = board[red_car.row]
+
+        direct = 0
+        indirect = 0
+        for col in range(red_car.col + red_car.length, self.board_size):
+            name = lane[col]
+            if name != '.':
+                direct += 1
+                vehicle = game.vehicles[name]
+                if vehicle.orientation == 'V' and self.is_blocked(board, vehicle):
+                    indirect += 1
+
+        return direct, indirect
+
+
+    def is_blocked(self, board, vehicle):
+        """
+        In this method we check if a vertical vehicle is blocked the way
+        is_vehicle_blocked checks it: it cannot step up and cannot slide
+        down over its whole length.
+        """
+        if vehicle.row > 0 and board[vehicle.row - 1][vehicle.col] == '.':
+            return False
+
+        end = vehicle.row + vehicle.length
+        if end + vehicle.length > self.board_size:
+            return True
+        return any(board[row][vehicle.col] != '.' for row in range(end, end + vehicle.length))
+
+
+    def row_blockers(self, game):
+        """
+        In this method we count the vehicles RushHourAStar.heuristics counts
+        as blocking in the row of the red car.
+        """
+        red_car = game.vehicles['X']
+        return sum(1 for vehicle in game.vehicles.values() if vehicle.row == red_car.row and vehicle.col > red_car.col + vehicle.length)
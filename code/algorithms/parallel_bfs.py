@@ -0,0 +1,259 @@
+import multiprocessing
+import time
+import zlib
+
+from code.game.bitboard import BitBoard
+from code.game.rush_hour import RushHour
+from code.game.state import BoardSpec, State
+
+
+# Number of expansions between two checks of the stop event
+STOP_CHECK_INTERVAL = 1024
+
+
+def owner_of(state, workers):
+    """
+    In this function we return the worker that owns a compact state. The
+    crc32 is the same in every process, unlike the built-in hash.
+    """
+    return zlib.crc32(state) % workers
+
+
+def run_worker(worker_id, workers, game, min_slides, connection, stop_event):
+    """
+    In this function one worker process answers the commands of the
+    coordinator. The worker owns the states whose owner_of is worker_id:
+    it stores their parents, which is also its visited set, and keeps the
+    part of the current layer that it owns. States travel between the
+    processes as packed bytes, every state one byte per vehicle.
+    """
+    spec = BoardSpec(game)
+    bitboard = BitBoard(game)
+    width = len(spec.vehicles)
+    legal_moves = bitboard.legal_slides if min_slides else bitboard.legal_moves
+
+    parents = {}
+    layer = []
+
+    while True:
+        command, argument = connection.recv()
+
+        # take ownership of the initial state
+        if command == 'start':
+            parents[State(argument)] = None
+            layer = [State(argument)]
+            connection.send(None)
+
+        # expand the owned part of the layer, the new states are packed as
+        # (state, parent) pairs per owner, or a goal is returned at once
+        elif command == 'expand':
+            outgoing = [bytearray() for _ in range(workers)]
+            result = ('states', outgoing)
+
+            for count, current_state in enumerate(layer):
+                if count % STOP_CHECK_INTERVAL == 0 and stop_event.is_set():
+                    result = ('stopped', None)
+                    break
+
+                for i, distance in legal_moves(current_state):
+                    next_state = current_state.move(i, distance)
+
+                    # every goal in this layer is a shortest solution
+                    if spec.is_win(next_state):
+                        stop_event.set()
+                        result = ('goal', (bytes(next_state), bytes(current_state)))
+                        break
+
+                    packed = outgoing[owner_of(next_state, workers)]
+                    packed += next_state
+                    packed += current_state
+
+                if result[0] == 'goal':
+                    break
+
+            if result[0] == 'states':
+                result = ('states', [bytes(packed) for packed in outgoing])
+            connection.send(result)
+
+        # keep the new states that were not visited yet as the next layer
+        elif command == 'receive':
+            layer = []
+            for start in range(0, len(argument), 2 * width):
+                next_state = State(argument[start:start + width])
+                if next_state not in parents:
+                    parents[next_state] = State(argument[start + width:start + 2 * width])
+                    layer.append(next_state)
+            connection.send(len(layer))
+
+        # look up the parent of an owned state for the solution path
+        elif command == 'parent':
+            parent = parents.get(State(argument))
+            connection.send(None if parent is None else bytes(parent))
+
+        elif command == 'stop':
+            connection.close()
+            return
+
+
+class RushHourParallelBFS:
+    """
+    In this class we perform the breadth first search with several worker
+    processes. The search goes one layer at a time: every worker expands
+    its part of the layer, the new states are sent to the worker that owns
+    them by their hash, and that worker removes the duplicates, so no
+    worker needs the whole visited set. As soon as one worker finds a goal
+    all workers stop, and because the search goes layer by layer the
+    solution is as short as the one of the serial breadth first search.
+    """
+
+    def __init__(self, initial_state, workers=4, min_slides=False):
+        """
+        In this method we define some initial starting variables.
+        """
+
+        # we set the initial state and its compact version
+        self.initial_state = initial_state
+        self.spec = BoardSpec(initial_state)
+
+        # the number of worker processes
+        self.workers = workers
+
+        # count a slide of any distance as one move if asked for
+        self.min_slides = min_slides
+
+        # create a counter for the states visited
+        self.states_visited = 0
+
+
+    def bfs(self):
+        """
+        In this method we start the workers, run the search layer by layer
+        and return the moves of the solution, in the same format as
+        RushHourBFS.calculate_moves, or None if there is no solution.
+        """
+        print(f"Starting parallel BFS with {self.workers} workers...")
+        print("Initial Board:")
+        self.initial_state.display_board()
+
+        initial_state = self.spec.encode(self.initial_state)
+        if self.spec.is_win(initial_state):
+            return []
+
+        stop_event = multiprocessing.Event()
+        connections = []
+        processes = []
+
+        for worker_id in range(self.workers):
+            connection, worker_connection = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=run_worker,
+                args=(worker_id, self.workers, self.initial_state, self.min_slides, worker_connection, stop_event),
+                daemon=True)
+            process.start()
+            connections.append(connection)
+            processes.append(process)
+
+        try:
+            owner = connections[owner_of(initial_state, self.workers)]
+            owner.send(('start', bytes(initial_state)))
+            owner.recv()
+
+            goal = self.search(connections)
+            if goal is None:
+                print("No solution found.")
+                return None
+
+            solution_path = self.backtrack_path(connections, goal)
+
+        finally:
+            for connection in connections:
+                connection.send(('stop', None))
+            for process in processes:
+                process.join()
+
+        print("Winning path found!")
+        print(f"Number of states visited: {self.states_visited}")
+        self.spec.decode(solution_path[-1]).display_board()
+
+        return self.calculate_moves(solution_path)
+
+
+    def search(self, connections):
+        """
+        In this method we let the workers expand layers until one of them
+        finds a goal. Returns the goal state and its parent as packed
+        bytes, or None if every reachable state has been visited.
+        """
+        while True:
+            for connection in connections:
+                connection.send(('expand', None))
+            results = [connection.recv() for connection in connections]
+
+            # the first worker that found a goal wins, the others stopped
+            for kind, value in results:
+                if kind == 'goal':
+                    return value
+
+            # send every worker the new states it owns
+            for worker_id, connection in enumerate(connections):
+                connection.send(('receive', b''.join(value[worker_id] for _, value in results)))
+            new_states = sum(connection.recv() for connection in connections)
+
+            self.states_visited += new_states
+            if new_states == 0:
+                return None
+
+
+    def backtrack_path(self, connections, goal):
+        """
+        In this method we follow the parents from the goal back to the
+        initial state, asking the worker that owns each state.
+        """
+        goal_state, parent = goal
+        path = [State(goal_state)]
+
+        while parent is not None:
+            path.append(State(parent))
+            connection = connections[owner_of(parent, self.workers)]
+            connection.send(('parent', parent))
+            parent = connection.recv()
+
+        return path[::-1]
+
+
+    def calculate_moves(self, solution_path):
+        """
+        In this method we will calculate the order of the moves done
+        to get from our initial state to the solution state.
+        """
+        moves = []
+        for i in range(1, len(solution_path)):
+            move = self.spec.move_between(solution_path[i - 1], solution_path[i])
+            if move:
+                moves.append(move)
+        return moves
+
+
+if __name__ == "__main__":
+
+    # create an instance of the rush hour game
+    rush_hour_game = RushHour()
+
+    solver = RushHourParallelBFS(rush_hour_game)
+
+    # find the solution and time it
+    start_time = time.time()
+    solution_path = solver.bfs()
+    end_time = time.time()
+
+    if solution_path:
+        print("Solution sequence of moves:")
+        for move in solution_path:
+            print(move)
+        print(f"Solution found in {len(solution_path)} moves!")
+
+        elapsed_time = end_time - start_time
+        print(f"Time taken to solve the board: {elapsed_time:.2f} seconds")
+
+    else:
+        print("No solution found.")
@@ -0,0 +1,285 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+from collections import deque
+
+from code.game.bitboard import BitBoard
+from code.game.compiler import board_csv
+
+
+# Directory where the pattern databases are stored
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'pattern_databases')
+
+# Every file starts with this, followed by the length of the json header
+MAGIC = b'RHPDB1'
+
+# Distance stored for abstract states from which the exit cannot be reached
+UNREACHABLE = 255
+
+
+class PatternDatabase:
+    """
+    In this class we keep the exact number of moves to the exit for an
+    abstraction of a board: only the red car and a chosen subset of the
+    other vehicles are on it. The other vehicles are left out, so they
+    never block, which makes every distance a lower bound for the real
+    board. Only the moves of the counted vehicles cost a move, the others
+    move for free, so databases whose counted vehicles do not overlap
+    can be added up.
+
+    The table has one byte for every combination of offsets of the
+    pattern vehicles. It is computed once by a backward breadth first
+    search from all abstract goal states, written to a binary file and
+    memory-mapped, so a lookup only indexes into the file.
+    """
+
+    def __init__(self, game, pattern, counted=None, min_slides=False, cache_dir=CACHE_DIR):
+        """
+        In this method we select the pattern vehicles, the red car always
+        first, and load the table from the cache or build it first.
+        """
+        self.bitboard = BitBoard(game)
+        red_name = self.bitboard.names[self.bitboard.red_index]
+
+        self.pattern = [red_name] + [name for name in pattern if name != red_name]
+        self.counted = set(self.pattern if counted is None else counted)
+        self.min_slides = min_slides
+
+        # Vehicle indices of the pattern and the radix of every position,
+        # the index of an abstract state is a mixed radix number
+        self.indices = [self.bitboard.index[name] for name in self.pattern]
+        self.radices = [self.bitboard.max_offsets[i] + 1 for i in self.indices]
+        self.strides = []
+        stride = 1
+        for radix in reversed(self.radices):
+            self.strides.insert(0, stride)
+            stride *= radix
+        self.size = stride
+
+        self.table = self.load_table(game, cache_dir)
+
+
+    def load_table(self, game, cache_dir):
+        """
+        In this method we memory-map the table file for this board and
+        pattern, and build and store the file first if it is not there.
+        Without a cache directory the table is only kept in memory.
+        """
+        metadata = {
+            'board': hashlib.sha256(board_csv(game).encode()).hexdigest(),
+            'pattern': self.pattern,
+            'counted': sorted(self.counted),
+            'min_slides': self.min_slides,
+            'radices': self.radices,
+        }
+
+        if cache_dir is None:
+            return self.build_table()
+
+        key = hashlib.sha256(json.dumps(metadata, sort_keys=True).encode()).hexdigest()
+        path = os.path.join(cache_dir, f"pdb_{key}.bin")
+
+        if not os.path.exists(path):
+            table = self.build_table()
+            header = json.dumps(metadata, sort_keys=True).encode()
+
+            # Write to a temporary file first, so a crash never leaves half a file
+            os.makedirs(cache_dir, exist_ok=True)
+            temporary_path = f"{path}.{os.getpid()}.tmp"
+            with open(temporary_path, 'wb') as file:
+                file.write(MAGIC)
+                file.write(struct.pack('<I', len(header)))
+                file.write(header)
+                file.write(table)
+            os.replace(temporary_path, path)
+
+        with open(path, 'rb') as file:
+            self.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self.mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a pattern database")
+
+        header_length, = struct.unpack_from('<I', self.mmap, len(MAGIC))
+        start = len(MAGIC) + 4 + header_length
+        return memoryview(self.mmap)[start:start + self.size]
+
+
+    def build_table(self):
+        """
+        In this method we compute the distance of every abstract state by a
+        breadth first search backward from all abstract goal states. Moves
+        can always be undone, so backward moves are the normal moves. Free
+        moves of uncounted vehicles are put in front of the queue.
+        """
+        table = bytearray([UNREACHABLE]) * self.size
+        queue = deque()
+
+        masks = [self.bitboard.masks[i] for i in self.indices]
+        costs = [1 if name in self.counted else 0 for name in self.pattern]
+
+        # All abstract goal states: the red car at the exit and the other
+        # pattern vehicles anywhere they do not overlap
+        red_offset = self.radices[0] - 1
+        goals = [([red_offset], masks[0][red_offset])]
+        for position in range(1, len(self.pattern)):
+            goals = [
+                (offsets + [offset], occupied | masks[position][offset])
+                for offsets, occupied in goals
+                for offset in range(self.radices[position])
+                if not occupied & masks[position][offset]
+            ]
+
+        for offsets, _ in goals:
+            table[self.index_of(offsets)] = 0
+            queue.append((0, offsets))
+
+        while queue:
+            distance, offsets = queue.popleft()
+            if distance > table[self.index_of(offsets)]:
+                continue
+
+            occupied = 0
+            for position, offset in enumerate(offsets):
+                occupied |= masks[position][offset]
+
+            for position, offset in enumerate(offsets):
+                cost = costs[position]
+                free = occupied & ~masks[position][offset]
+
+                # Slide forward and backward until the first occupied cell
+                for step in (1, -1):
+                    next_offset = offset + step
+                    while 0 <= next_offset < self.radices[position] and not free & masks[position][next_offset]:
+                        next_offsets = offsets[:]
+                        next_offsets[position] = next_offset
+
+                        next_distance = min(distance + cost, UNREACHABLE - 1)
+
+                        index = self.index_of(next_offsets)
+                        if next_distance < table[index]:
+                            table[index] = next_distance
+                            if next_distance == distance:
+                                queue.appendleft((next_distance, next_offsets))
+                            else:
+                                queue.append((next_distance, next_offsets))
+
+                        # With unit moves the longer slides are reached step by step
+                        if not self.min_slides:
+                            break
+                        next_offset += step
+
+        return table
+
+
+    def index_of(self, offsets):
+        """
+        In this method we return the table index of the pattern offsets.
+        """
+        index = 0
+        for offset, stride in zip(offsets, self.strides):
+            index += offset * stride
+        return index
+
+
+    def lookup(self, game):
+        """
+        In this method we return the distance of a rush hour game in the
+        abstraction, UNREACHABLE if the exit cannot be reached at all.
+        """
+        index = 0
+        for name, stride in zip(self.pattern, self.strides):
+            vehicle = game.vehicles[name]
+            index += (vehicle.col if vehicle.orientation == 'H' else vehicle.row) * stride
+        return self.table[index]
+
+
+class PatternDatabaseHeuristic:
+    """
+    In this class we combine several pattern databases into one heuristic,
+    either by taking the largest of their distances or by adding them up.
+    To add them up the patterns may only share the red car, whose moves
+    are then only counted in the first pattern.
+    """
+
+    def __init__(self, game, patterns=None, combination='max', min_slides=False, max_entries=2 ** 20, cache_dir=CACHE_DIR):
+        """
+        In this method we build or load the pattern databases. Without
+        patterns they are chosen by default_patterns.
+        """
+        if combination not in ('max', 'add'):
+            raise ValueError(f"Unknown pattern combination: {combination}")
+        self.combination = combination
+
+        if patterns is None:
+            patterns = default_patterns(game, max_entries, 2 if combination == 'add' else 1)
+
+        self.databases = []
+        counted_so_far = set()
+        for pattern in patterns:
+            counted = None
+            if combination == 'add':
+                counted = set(pattern) - {'X'} if self.databases else set(pattern) | {'X'}
+                if counted & counted_so_far:
+                    raise ValueError("Patterns that are added up may only share the red car")
+                counted_so_far |= counted
+
+            self.databases.append(PatternDatabase(game, pattern, counted, min_slides, cache_dir))
+
+
+    def __call__(self, game):
+        """
+        In this method we return the combined distance of a rush hour game.
+        """
+        distances = [database.lookup(game) for database in self.databases]
+
+        # A pattern that cannot reach the exit means the board cannot either
+        if UNREACHABLE in distances:
+            return UNREACHABLE
+
+        if self.combination == 'add':
+            return sum(distances)
+        return max(distances)
+
+
+def default_patterns(game, max_entries, number_of_patterns=1):
+    """
+    In this function we choose patterns for a board: the vehicles that
+    block the lane of the red car in the initial state go first, then the
+    other vehicles from close to far from that lane. Vehicles are dealt
+    over the patterns in turn while every table stays below max_entries.
+    """
+    red_car = game.vehicles['X']
+
+    def distance_to_red_lane(vehicle):
+        if vehicle.orientation == 'V':
+            blocks = vehicle.row <= red_car.row < vehicle.row + vehicle.length and vehicle.col >= red_car.col + red_car.length
+            return (not blocks, abs(vehicle.col - (red_car.col + red_car.length)))
+        return (True, abs(vehicle.row - red_car.row) + game.board_size)
+
+    candidates = sorted((vehicle for vehicle in game.vehicles.values() if vehicle.name != 'X'), key=distance_to_red_lane)
+
+    patterns = [[] for _ in range(number_of_patterns)]
+    sizes = [game.board_size - red_car.length + 1] * number_of_patterns
+    full = [False] * number_of_patterns
+
+    turn = 0
+    for vehicle in candidates:
+        if all(full):
+            break
+
+        # Give the vehicle to the next pattern that still has room
+        while full[turn]:
+            turn = (turn + 1) % number_of_patterns
+
+        radix = game.board_size - vehicle.length + 1
+        if sizes[turn] * radix > max_entries:
+            full[turn] = True
+            continue
+
+        patterns[turn].append(vehicle.name)
+        sizes[turn] *= radix
+        turn = (turn + 1) % number_of_patterns
+
+    return patterns
@@ -0,0 +1,198 @@
+import contextlib
+import importlib
+import multiprocessing
+import os
+import queue
+import time
+
+from code.algorithms.budget import PartialResult
+from code.algorithms.shortcut import RushHourShortcutter
+from code.game.rush_hour import RushHour
+from code.game.state import BoardSpec
+
+
+# The solvers that race by default: name, module, class, the method that
+# solves and the settings of the class
+DEFAULT_SOLVERS = {
+    "Breadth-First Search": ('code.algorithms.bfs', 'RushHourBFS', 'bfs', {'use_bitboard': True}),
+    "Depth-First Search": ('code.algorithms.dfs', 'RushHourDFS', 'depth_first_search', {'use_bitboard': True}),
+    "A* Algorithm": ('code.algorithms.astar', 'RushHourAStar', 'a_star', {'use_bitboard': True}),
+    "A* Algorithm with customizable heuristics": ('code.algorithms.astar2', 'RushHourAStar2', 'astar', {
+        'use_distance_heuristic': True, 'use_direct_blocking_heuristic': True, 'use_indirect_blocking_heuristic': True,
+        'use_car_mobility_heuristic': True, 'use_deadlock_penalty': True, 'distance_weight': 6,
+        'direct_blocking_weight': 3, 'indirect_blocking_weight': 2, 'car_mobility_weight': 4, 'use_bitboard': True}),
+}
+
+# Seconds between two checks if the workers are still alive
+POLL_INTERVAL = 0.2
+
+
+def solution_moves(game, solution):
+    """
+    In this function we turn what a solver returned into a list of moves
+    (vehicle name, distance). Some solvers already return moves, others
+    return the rush hour games on the way: those are turned into a path,
+    which also works for the visiting order of the depth first search.
+    """
+    # a solver that ran out of its budget has no solution
+    if solution is None or isinstance(solution, PartialResult):
+        return None
+
+    solution = list(solution)
+    if not solution:
+        spec = BoardSpec(game)
+        return [] if spec.is_win(spec.encode(game)) else None
+
+    if isinstance(solution[0], tuple):
+        return solution
+
+    shortcutter = RushHourShortcutter(game)
+    states = [shortcutter.spec.encode(state) for state in solution]
+    return shortcutter.calculate_moves(shortcutter.recover_path(states))
+
+
+def run_solver(name, module_name, class_name, method_name, settings, game, results):
+    """
+    In this function one worker process runs one solver on the game,
+    without its printing, and puts its name, moves and the seconds it
+    took on the results queue. If the solver fails the error message is
+    sent instead of the moves.
+    """
+    start_time = time.time()
+
+    try:
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            Solver = getattr(importlib.import_module(module_name), class_name)
+            solution = getattr(Solver(game, **settings), method_name)()
+        results.put((name, solution_moves(game, solution), time.time() - start_time, None))
+
+    except Exception as error:
+        results.put((name, None, time.time() - start_time, f"{type(error).__name__}: {error}"))
+
+
+class RushHourPortfolio:
+    """
+    In this class we let several solvers race on the same board, every
+    solver in its own process. Which solver is fastest depends a lot on
+    the board, so instead of choosing we run them all. By default the
+    first solution wins and the other solvers are stopped. With
+    wait_for_best the solvers get until the deadline, and the shortest
+    solution found by then wins.
+    """
+
+    def __init__(self, initial_state, solvers=None, deadline=None, wait_for_best=False):
+        """
+        In this method we define some initial starting variables. The
+        solvers are a dictionary like DEFAULT_SOLVERS, and the deadline is
+        the number of seconds after which all solvers are stopped.
+        """
+        self.initial_state = initial_state
+        self.solvers = solvers if solvers is not None else DEFAULT_SOLVERS
+        self.deadline = deadline
+        self.wait_for_best = wait_for_best
+
+        # the name of the solver that won, and per solver what happened
+        self.winner = None
+        self.results = {}
+
+
+    def solve(self):
+        """
+        In this method we start all solvers, wait for the first solution or
+        the best solution by the deadline, stop the solvers that are still
+        running and return the moves of the winner, or None if no solver
+        found a solution in time.
+        """
+        print(f"Starting a portfolio of {len(self.solvers)} solvers...")
+        print("Initial Board:")
+        self.initial_state.display_board()
+
+        start_time = time.time()
+        results = multiprocessing.Queue()
+        processes = {}
+
+        for name, (module_name, class_name, method_name, settings) in self.solvers.items():
+            process = multiprocessing.Process(
+                target=run_solver,
+                args=(name, module_name, class_name, method_name, settings, self.initial_state, results),
+                daemon=True)
+            process.start()
+            processes[name] = process
+            self.results[name] = 'running'
+
+        best_moves = None
+
+        try:
+            while 'running' in self.results.values():
+                if self.deadline is not None and time.time() - start_time >= self.deadline:
+                    break
+
+                try:
+                    name, moves, seconds, error = results.get(timeout=POLL_INTERVAL)
+
+                # a solver that was killed, for example for running out of memory, never
+                # answers, the others always put a result before they exit
+                except queue.Empty:
+                    for name, process in processes.items():
+                        if self.results[name] == 'running' and not process.is_alive() and process.exitcode != 0:
+                            self.results[name] = f"stopped with exit code {process.exitcode}"
+                    continue
+
+                if error is not None:
+                    self.results[name] = f"failed: {error}"
+                elif moves is None:
+                    self.results[name] = f"no solution after {seconds:.2f} seconds"
+                else:
+                    self.results[name] = f"{len(moves)} moves in {seconds:.2f} seconds"
+
+                    if best_moves is None or len(moves) < len(best_moves):
+                        best_moves = moves
+                        self.winner = name
+
+                    # the first solution wins unless we wait for the best one
+                    if not self.wait_for_best:
+                        break
+
+        finally:
+            for name, process in processes.items():
+                if process.is_alive():
+                    process.terminate()
+                if self.results[name] == 'running':
+                    self.results[name] = 'stopped'
+            for process in processes.values():
+                process.join()
+
+        for name, result in self.results.items():
+            print(f"{name}: {result}")
+
+        if self.winner is None:
+            print("No solution found.")
+            return None
+
+        print(f"Winner: {self.winner}")
+        return best_moves
+
+
+if __name__ == "__main__":
+
+    # create an instance of the rush hour game
+    rush_hour_game = RushHour()
+
+    solver = RushHourPortfolio(rush_hour_game, deadline=60)
+
+    # find the solution and time it
+    start_time = time.time()
+    solution_path = solver.solve()
+    end_time = time.time()
+
+    if solution_path is not None:
+        print("Solution sequence of moves:")
+        for move in solution_path:
+            print(move)
+        print(f"Solution found in {len(solution_path)} moves!")
+
+        elapsed_time = end_time - start_time
+        print(f"Time taken to solve the board: {elapsed_time:.2f} seconds")
+
+    else:
+        print("No solution found.")
@@ -1,7 +1,8 @@
 import random
 import time
+from code.algorithms.budget import blocking_heuristic
 from code.game.rush_hour import RushHour
-import matplotlib.pyplot as plt
+from code.game.state import BoardSpec
 
 class RushHourSolver:
     """
@@ -9,7 +10,7 @@ class RushHourSolver:
     by applying random moves.
     """
 
-    def __init__(self, game, visualizer=None):
+    def __init__(self, game, visualizer=None, budget=None, verbose=True, seed=None):
         """
         In this method we define some starting/intial variables.
         """
@@ -18,6 +19,24 @@ class RushHourSolver:
         self.game = game
         self.visualizer = visualizer
 
+        # the moves (vehicle name, distance) of the last solve, so the
+        # solution can be made shorter afterwards
+        self.solution_moves = []
+
+        # the limits of every solve, a SearchBudget, or None to run until done,
+        # and the board spec to remember the best state in compact form
+        self.budget = budget
+        self.spec = BoardSpec(game)
+
+        # print every move and board only if verbose, and draw the random
+        # choices from a generator of our own when a seed is given
+        self.verbose = verbose
+        self.random = random.Random(seed) if seed is not None else random
+
+        # the number of iterations of the last solve, moves that were not
+        # possible included
+        self.iterations = 0
+
         
     def get_possible_moves(self, vehicle):
         """
@@ -79,15 +98,25 @@ class RushHourSolver:
         
         # count the total moves made
         moves_counter = 0
+        self.solution_moves = []
 
         # create the starting time
         start_time = time.time()
+
+        budget = self.budget
+        if budget is not None:
+            budget.start()
         
         # we loop through our set maximum iterations
         for iteration in range(max_iterations):
+            self.iterations = iteration + 1
+
+            # stop with the best state so far if the budget has run out
+            if budget is not None and budget.expand():
+                return budget.partial_result(self.spec)
 
             # choose a random vehicle from the game
-            vehicle_name = random.choice(list(self.game.vehicles.keys()))
+            vehicle_name = self.random.choice(list(self.game.vehicles.keys()))
             vehicle = self.game.vehicles[vehicle_name]
 
             # check if the vehicle is allowed to move
@@ -98,13 +127,19 @@ class RushHourSolver:
                 continue
 
             # choose a random move from the possible moves
-            new_row, new_col = random.choice(possible_moves)
+            new_row, new_col = self.random.choice(possible_moves)
 
             # calculate the distance for the move
             distance = new_col - vehicle.col if vehicle.orientation == 'H' else new_row - vehicle.row
 
             # move the vehicle to the new place on the board
             self.game.move_vehicle(vehicle_name, distance)
+            self.solution_moves.append((vehicle_name, distance))
+
+            # remember the state if it is the best one so far
+            if budget is not None:
+                state = self.spec.encode(self.game)
+                budget.consider(state, blocking_heuristic(self.spec, state))
 
             # visualizer
             if self.visualizer:
@@ -114,40 +149,37 @@ class RushHourSolver:
             moves_counter += 1
 
             # print the current/new state of the board
-            print(f"Iteration: {iteration + 1}, Move: {moves_counter}\nVehicle {vehicle_name} by {distance} units")
-            self.game.display_board()
+            if self.verbose:
+                print(f"Iteration: {iteration + 1}, Move: {moves_counter}\nVehicle {vehicle_name} by {distance} units")
+                self.game.display_board()
 
             # check for win condition
             if self.game.check_win():
-                print(f"Puzzle solved in {moves_counter} moves! Time needed: {time.time() - start_time}")
-                self.game.display_board()
+                if self.verbose:
+                    print(f"Puzzle solved in {moves_counter} moves! Time needed: {time.time() - start_time}")
+                    self.game.display_board()
                 return moves_counter
 
         return None
         print("Failed to solve the puzzle within the maximum number of iterations.")
 
         
-    def perform_experiments(self, num_experiments = 10000, max_iterations = 100000):
+    def perform_experiments(self, num_experiments = 10000, max_iterations = 100000, workers = None, seed = 0):
         """
         In this method we will create a way to let the algorithm run num_experiments
-        amount of times. And set a limit at max_iterations amount of moves.
+        amount of times. And set a limit at max_iterations amount of moves. The runs
+        are spread over worker processes without printing, see random_experiments,
+        and the seed makes them reproducible. Returns the moves of the solved runs.
         """
 
-        # create an empty list to store the results
-        results = []
-
-        # loop through our number of experiments/number of games
-        for game in range(num_experiments):
-
-            # reset game for each experiment
-            self.game.reset()
+        # the experiments module uses this class, so it is imported here
+        from code.algorithms.random_experiments import RushHourRandomExperiments
 
-            # save the results
-            result = self.solve_randomly(max_iterations)
-            if result is not None:
-                results.append(result)
+        # every run starts from the initial board
+        self.game.reset()
 
-        return results
+        experiments = RushHourRandomExperiments(self.game, num_experiments, max_iterations, workers, seed)
+        return [result.moves for result in experiments.run() if result.moves is not None]
 
     
 if __name__ == "__main__":
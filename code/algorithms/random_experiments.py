@@ -0,0 +1,179 @@
+import hashlib
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+
+from code.algorithms.random_algorithm import RushHourSolver
+from code.game.state import BoardSpec
+
+
+# Number of runs a worker gets at once
+CHUNK_SIZE = 16
+
+
+def run_seed(master_seed, run):
+    """
+    In this function we return the seed of one run. It only depends on
+    the master seed and the number of the run, not on the worker that
+    does the run, so the results are the same for any number of workers.
+    """
+    digest = hashlib.sha256(f"{master_seed}:{run}".encode()).digest()
+    return int.from_bytes(digest[:8], 'big')
+
+
+class ExperimentResult:
+    """
+    In this class we store the result of one random run: its number, the
+    moves it needed or None if it did not solve the board, the seconds
+    it took and the number of iterations.
+    """
+
+    __slots__ = ('run', 'moves', 'seconds', 'iterations')
+
+    def __init__(self, run, moves, seconds, iterations):
+        """
+        In this method we set the values of the result.
+        """
+        self.run = run
+        self.moves = moves
+        self.seconds = seconds
+        self.iterations = iterations
+
+
+    def __repr__(self):
+        return f"ExperimentResult(run={self.run}, moves={self.moves}, seconds={self.seconds:.4f}, iterations={self.iterations})"
+
+
+# The board of a worker process, set once by init_worker
+worker_board = None
+
+
+def init_worker(game):
+    """
+    In this function we give a worker process the board, as the static
+    vehicle specs and the compact initial state, so every run can start
+    from a fresh copy.
+    """
+    global worker_board
+    spec = BoardSpec(game)
+    worker_board = (spec, spec.encode(game))
+
+
+def run_chunk(chunk):
+    """
+    In this function a worker does a chunk of runs without any printing,
+    every run with its own random generator, and returns their results.
+    """
+    runs, master_seed, max_iterations = chunk
+    spec, initial_state = worker_board
+
+    results = []
+    for run in runs:
+        solver = RushHourSolver(spec.decode(initial_state), verbose=False, seed=run_seed(master_seed, run))
+
+        start_time = time.perf_counter()
+        moves = solver.solve_randomly(max_iterations)
+        results.append(ExperimentResult(run, moves, time.perf_counter() - start_time, solver.iterations))
+
+    return results
+
+
+class RushHourRandomExperiments:
+    """
+    In this class we do many runs of the random algorithm on one board,
+    spread over a pool of worker processes. The runs do not print, which
+    took most of the time before, and every run draws from its own seed
+    that follows from the master seed, so the moves and iterations of
+    every run are the same for a given master seed whatever the number of
+    workers. The results stream back in the order of the runs.
+    """
+
+    def __init__(self, game, num_experiments=10000, max_iterations=100000, workers=None, master_seed=0, chunk_size=CHUNK_SIZE):
+        """
+        In this method we define some initial starting variables. Without
+        a number of workers one worker per core is used.
+        """
+        self.game = game
+        self.num_experiments = num_experiments
+        self.max_iterations = max_iterations
+        self.workers = workers if workers is not None else os.cpu_count() or 1
+        self.master_seed = master_seed
+        self.chunk_size = chunk_size
+
+
+    def iter_results(self):
+        """
+        In this method we yield the result of every run in the order of
+        the runs, as soon as the chunk it is in is done.
+        """
+        chunks = [
+            (range(start, min(start + self.chunk_size, self.num_experiments)), self.master_seed, self.max_iterations)
+            for start in range(0, self.num_experiments, self.chunk_size)
+        ]
+
+        # one worker runs in this process, without the cost of a pool
+        if self.workers == 1:
+            init_worker(self.game)
+            for chunk in chunks:
+                yield from run_chunk(chunk)
+            return
+
+        with multiprocessing.Pool(self.workers, initializer=init_worker, initargs=(self.game,)) as pool:
+            for results in pool.imap(run_chunk, chunks):
+                yield from results
+
+
+    def run(self):
+        """
+        In this method we do all runs and return their results.
+        """
+        return list(self.iter_results())
+
+
+def summarize(results):
+    """
+    In this function we aggregate the results of the runs: how many runs
+    solved the board, and the mean, median, minimum and maximum number of
+    moves of those runs, and the mean seconds and iterations of all runs.
+    """
+    moves = [result.moves for result in results if result.moves is not None]
+
+    summary = {
+        'runs': len(results),
+        'solved': len(moves),
+        'mean seconds': statistics.mean(result.seconds for result in results) if results else None,
+        'mean iterations': statistics.mean(result.iterations for result in results) if results else None,
+    }
+
+    if moves:
+        summary.update({
+            'mean moves': statistics.mean(moves),
+            'median moves': statistics.median(moves),
+            'min moves': min(moves),
+            'max moves': max(moves),
+        })
+
+    return summary
+
+
+if __name__ == "__main__":
+
+    # python -m code.algorithms.random_experiments [gameboard csv file] [number of runs] [master seed]
+    from code.game.loader import load_board
+    from code.game.rush_hour import RushHour
+
+    rush_hour_game = load_board(sys.argv[1]) if len(sys.argv) > 1 else RushHour()
+    num_experiments = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    master_seed = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+
+    experiments = RushHourRandomExperiments(rush_hour_game, num_experiments, master_seed=master_seed)
+
+    start_time = time.time()
+    results = experiments.run()
+    elapsed_time = time.time() - start_time
+
+    for name, value in summarize(results).items():
+        print(f"{name}: {value}")
+    print(f"Time taken for {num_experiments} runs with {experiments.workers} workers: {elapsed_time:.2f} seconds")
@@ -0,0 +1,212 @@
+import sys
+import time
+
+import numpy as np
+
+from code.game.state import BoardSpec
+
+
+# Number of random walks that are advanced together
+BATCH_SIZE = 4096
+
+
+class RushHourRandomPlayouts:
+    """
+    In this class we do many random walks of the random algorithm on one
+    board at once with NumPy. The lane offsets of the vehicles of all
+    walks are one array, and every lane (the rows and then the columns)
+    of every walk is a bitmask of its occupied cells. Every iteration each
+    walk picks a random vehicle and slides it to a random position it can
+    reach, just like solve_randomly, but for all walks in a few array
+    operations. Walks that reach the goal or the maximum iterations are
+    retired and new walks take their place.
+
+    The walks draw from one NumPy generator, so the results are the same
+    for a given seed and batch size, but not the same as those of the
+    RushHourSolver runs with that seed. They do follow the same
+    distribution.
+    """
+
+    def __init__(self, game, num_walks=10000, max_iterations=100000, batch_size=BATCH_SIZE, seed=0):
+        """
+        In this method we define some initial starting variables and read
+        the static vehicle specs and the initial board into arrays.
+        """
+        self.num_walks = num_walks
+        self.max_iterations = max_iterations
+        self.batch_size = batch_size
+        self.seed = seed
+
+        spec = BoardSpec(game)
+        size = spec.board_size
+        self.board_size = size
+
+        # per vehicle its length and the number of its lane, the row for
+        # horizontal vehicles and board_size plus the column for vertical ones
+        self.lengths = np.array([vehicle.length for vehicle in spec.vehicles], dtype=np.int64)
+        self.lanes = np.array([
+            vehicle.lane if vehicle.orientation == 'H' else size + vehicle.lane
+            for vehicle in spec.vehicles
+        ], dtype=np.int64)
+
+        # the red car is home when its offset is this, without a red car
+        # no walk is ever solved
+        self.red_index = spec.red_index
+        self.red_goal = size - spec.vehicles[spec.red_index].length if spec.red_index is not None else None
+
+        # the initial offsets and the bitmask of the occupied cells of every lane
+        state = spec.encode(game)
+        self.initial_offsets = np.array(list(state), dtype=np.int64)
+        self.initial_lanes = np.zeros(2 * size, dtype=np.int64)
+        for vehicle, offset in zip(spec.vehicles, state):
+            for cell in range(offset, offset + vehicle.length):
+                if vehicle.orientation == 'H':
+                    self.initial_lanes[vehicle.lane] |= 1 << cell
+                    self.initial_lanes[size + cell] |= 1 << vehicle.lane
+                else:
+                    self.initial_lanes[size + vehicle.lane] |= 1 << cell
+                    self.initial_lanes[cell] |= 1 << vehicle.lane
+
+        # lowest[mask, cell] is the first position after the last occupied
+        # cell before the cell, highest[mask, cell] the first occupied cell
+        # from the cell on, or the board size
+        occupied = (np.arange(1 << size)[:, None] >> np.arange(size)) & 1 == 1
+        self.lowest = np.zeros((1 << size, size + 1), dtype=np.int64)
+        self.highest = np.full((1 << size, size + 1), size, dtype=np.int64)
+        for cell in range(1, size + 1):
+            self.lowest[:, cell] = np.where(occupied[:, cell - 1], cell, self.lowest[:, cell - 1])
+        for cell in range(size - 1, -1, -1):
+            self.highest[:, cell] = np.where(occupied[:, cell], cell, self.highest[:, cell + 1])
+
+
+    def step(self, rng, offsets, lanes):
+        """
+        In this method we do one iteration for all walks: pick a vehicle
+        per walk and slide it to a random free position in its lane. It
+        changes the offsets and lanes in place and returns a mask of the
+        walks that did move.
+        """
+        size = self.board_size
+        walks = np.arange(len(offsets))
+
+        # a random vehicle per walk, with its offset and its lane
+        vehicles = rng.integers(0, len(self.lengths), len(offsets))
+        offset = offsets[walks, vehicles]
+        length = self.lengths[vehicles]
+        lane = self.lanes[vehicles]
+        line = lanes[walks, lane]
+
+        # the closest occupied cell before and after the vehicle bound the
+        # positions it can reach
+        lowest = self.lowest[line, offset]
+        highest = self.highest[line, offset + length] - length
+
+        # a uniform choice of the other reachable positions, if there are any
+        choices = highest - lowest
+        moving = choices > 0
+        target = lowest + (rng.random(len(offsets)) * choices).astype(np.int64)
+        target += target >= offset
+
+        walks, vehicles, offset, target = walks[moving], vehicles[moving], offset[moving], target[moving]
+        length, lane, line = length[moving], lane[moving], line[moving]
+
+        # clear the old cells and fill the new ones, in the lane of the
+        # vehicle and in the lanes that cross it
+        cells = (1 << length) - 1
+        lanes[walks, lane] = line ^ (cells << offset) ^ (cells << target)
+
+        crossing = np.where(lane < size, size, 0)
+        position = 1 << (lane % size)
+        for cell in range(self.lengths.max()):
+            inside = cell < length
+            lanes[walks[inside], (crossing + offset + cell)[inside]] ^= position[inside]
+            lanes[walks[inside], (crossing + target + cell)[inside]] ^= position[inside]
+
+        offsets[walks, vehicles] = target
+        return moving
+
+
+    def iter_batches(self):
+        """
+        In this method we run all walks and yield the run numbers, moves
+        and iterations of the walks that retired every iteration, the moves
+        being -1 for walks that did not solve the board.
+        """
+        rng = np.random.default_rng(self.seed)
+        started = 0
+
+        runs = np.empty(0, dtype=np.int64)
+        offsets = np.empty((0, len(self.lengths)), dtype=np.int64)
+        lanes = np.empty((0,) + self.initial_lanes.shape, dtype=np.int64)
+        moves = np.empty(0, dtype=np.int64)
+        iterations = np.empty(0, dtype=np.int64)
+
+        while started < self.num_walks or len(runs):
+
+            # fill the batch with new walks once a quarter of it retired
+            if started < self.num_walks and len(runs) <= self.batch_size * 3 // 4:
+                new = min(self.batch_size - len(runs), self.num_walks - started)
+                runs = np.concatenate((runs, np.arange(started, started + new)))
+                offsets = np.concatenate((offsets, np.broadcast_to(self.initial_offsets, (new,) + self.initial_offsets.shape)))
+                lanes = np.concatenate((lanes, np.broadcast_to(self.initial_lanes, (new,) + self.initial_lanes.shape)))
+                moves = np.concatenate((moves, np.zeros(new, dtype=np.int64)))
+                iterations = np.concatenate((iterations, np.zeros(new, dtype=np.int64)))
+                started += new
+
+            moving = self.step(rng, offsets, lanes)
+            moves += moving
+            iterations += 1
+
+            # like solve_randomly, a walk only wins right after a move
+            if self.red_index is not None:
+                solved = moving & (offsets[:, self.red_index] == self.red_goal)
+            else:
+                solved = np.zeros(len(runs), dtype=bool)
+            retired = solved | (iterations >= self.max_iterations)
+
+            if retired.any():
+                yield runs[retired], np.where(solved[retired], moves[retired], -1), iterations[retired]
+
+                active = ~retired
+                runs, offsets, lanes = runs[active], offsets[active], lanes[active]
+                moves, iterations = moves[active], iterations[active]
+
+
+    def run(self):
+        """
+        In this method we run all walks and return two arrays in the order
+        of the runs: the moves of every walk, -1 if it did not solve the
+        board, and the iterations of every walk.
+        """
+        moves = np.empty(self.num_walks, dtype=np.int64)
+        iterations = np.empty(self.num_walks, dtype=np.int64)
+
+        for runs, run_moves, run_iterations in self.iter_batches():
+            moves[runs] = run_moves
+            iterations[runs] = run_iterations
+
+        return moves, iterations
+
+
+if __name__ == "__main__":
+
+    # python -m code.algorithms.random_playouts [gameboard csv file] [number of walks] [seed]
+    from code.game.loader import load_board
+    from code.game.rush_hour import RushHour
+
+    rush_hour_game = load_board(sys.argv[1]) if len(sys.argv) > 1 else RushHour()
+    num_walks = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+
+    playouts = RushHourRandomPlayouts(rush_hour_game, num_walks, seed=seed)
+
+    start_time = time.time()
+    moves, iterations = playouts.run()
+    elapsed_time = time.time() - start_time
+
+    solved = moves[moves >= 0]
+    print(f"solved: {len(solved)} of {num_walks}")
+    if len(solved):
+        print(f"mean moves: {solved.mean():.1f}, median moves: {np.median(solved):.0f}, min moves: {solved.min()}, max moves: {solved.max()}")
+    print(f"mean iterations: {iterations.mean():.1f}")
+    print(f"Time taken for {num_walks} walks: {elapsed_time:.2f} seconds")
@@ -0,0 +1,289 @@
+import time
+
+from code.algorithms.dfs import RushHourDFS
+from code.game.bitboard import BitBoard
+from code.game.rush_hour import RushHour
+from code.game.state import BoardSpec
+
+
+class RushHourShortcutter:
+    """
+    In this class we make the solutions of the fast but wasteful solvers,
+    like the depth first search and the random algorithm, shorter after
+    they are found. The solution is replayed and every state on it is
+    indexed, loops are cut out wherever a state comes back, and then a
+    small breadth first search from every state on the path looks for a
+    shorter way to a state further along. This is repeated until nothing
+    changes anymore. The result is not always the shortest solution, but
+    it is found without an optimal search over the whole board.
+    """
+
+    def __init__(self, initial_state, window=8, max_local_states=20000, min_slides=False):
+        """
+        In this method we define some initial starting variables.
+        """
+
+        # we set the initial state and its compact version
+        self.initial_state = initial_state
+        self.spec = BoardSpec(initial_state)
+        self.bitboard = BitBoard(initial_state)
+
+        # the game may be changed by the solver, so we keep the start as it was
+        self.start = self.spec.encode(initial_state)
+
+        # the local search looks at most window moves ahead and stops
+        # after max_local_states states
+        self.window = window
+        self.max_local_states = max_local_states
+
+        # count a slide of any distance as one move if asked for
+        self.min_slides = min_slides
+
+
+    def optimize(self, moves):
+        """
+        In this method we take the moves (vehicle name, distance) of a
+        solution and return a solution with at most as many slides.
+        Outside minimum slides mode the path is shortened in steps, but
+        consecutive moves of the same vehicle are always merged into one
+        slide, so the result counts moves the way the solvers that give
+        slides do.
+        """
+        states = self.replay(moves)
+        states = self.optimize_path(states)
+        shortened = self.merge_moves(self.calculate_moves(states))
+
+        # fewer steps can still take more slides than the solution had
+        original = self.merge_moves(moves)
+        return shortened if len(shortened) <= len(original) else original
+
+
+    def optimize_path_of_games(self, solution_path):
+        """
+        In this method we take the rush hour games that a solver visited,
+        like the solution path of RushHourDFS, and return the moves of a
+        shorter solution. Two games next to each other do not have to be
+        one move apart, the path is recovered from the order first.
+        """
+        states = [self.spec.encode(game) for game in solution_path]
+        return self.calculate_moves(self.optimize_path(self.recover_path(states)))
+
+
+    def optimize_path(self, states):
+        """
+        In this method we cut out the loops and take the shortcuts on a
+        path of compact states until it does not get any shorter.
+        """
+        states = self.remove_loops(states)
+
+        while True:
+            shorter_states = self.remove_loops(self.take_shortcuts(states))
+            if len(shorter_states) >= len(states):
+                return states
+            states = shorter_states
+
+
+    def replay(self, moves):
+        """
+        In this method we play the moves from the initial state and
+        return every compact state on the way. Outside minimum slides mode
+        a slide over more cells counts as that many single steps, so it is
+        split into steps of one.
+        """
+        state = self.start
+        states = [state]
+
+        for vehicle_name, distance in moves:
+            i = self.spec.index[vehicle_name]
+
+            if self.min_slides:
+                state = state.move(i, distance)
+                states.append(state)
+                continue
+
+            step = 1 if distance > 0 else -1
+            for _ in range(abs(distance)):
+                state = state.move(i, step)
+                states.append(state)
+
+        return states
+
+
+    def recover_path(self, states):
+        """
+        In this method we find a path through a list of visited states in
+        which every state was reached from a state before it. We walk back
+        from the last state and always step to the neighbour that was
+        visited first, so we end on the first state without loops.
+        """
+        first_index = {}
+        for index, state in enumerate(states):
+            first_index.setdefault(state, index)
+
+        path = [states[-1]]
+        index = first_index[states[-1]]
+
+        while index > 0:
+            earlier = [(first_index[neighbour], neighbour) for neighbour in self.neighbours(path[-1]) if first_index.get(neighbour, index) < index]
+            if not earlier:
+                raise ValueError("the visited states do not form a path from the first state")
+
+            index, state = min(earlier)
+            path.append(state)
+
+        return path[::-1]
+
+
+    def remove_loops(self, states):
+        """
+        In this method we cut out the part between two visits of the same
+        state, jumping from every state straight to its last visit.
+        """
+        last_index = {state: index for index, state in enumerate(states)}
+
+        path = []
+        index = 0
+        while index < len(states):
+            path.append(states[index])
+            index = last_index[states[index]] + 1
+
+        return path
+
+
+    def take_shortcuts(self, states):
+        """
+        In this method we walk over the path and from every state search
+        up to window moves around it. If a state further along the path is
+        reached in fewer moves than the path takes, that part of the path
+        is replaced by the shorter way.
+        """
+        index_of = {state: index for index, state in enumerate(states)}
+
+        path = []
+        index = 0
+        while index < len(states):
+            path.append(states[index])
+
+            shortcut = self.find_shortcut(states[index], index, index_of)
+            if shortcut is None:
+                index += 1
+                continue
+
+            # the shortcut holds the states after the current one up to the target
+            path.extend(shortcut[:-1])
+            index = index_of[shortcut[-1]]
+
+        return path
+
+
+    def find_shortcut(self, start, start_index, index_of):
+        """
+        In this method we do a breadth first search of at most window
+        moves from a state on the path. Returns the states of the way that
+        saves the most moves, without the start state, or None if the path
+        is already the shortest way around.
+        """
+        parents = {start: None}
+        layer = [start]
+        best_saving = 0
+        best_target = None
+
+        for depth in range(1, self.window + 1):
+            next_layer = []
+
+            for state in layer:
+                for next_state in self.neighbours(state):
+                    if next_state in parents:
+                        continue
+                    parents[next_state] = state
+                    next_layer.append(next_state)
+
+                    # a state later on the path that we reach in fewer moves
+                    saving = index_of.get(next_state, -1) - start_index - depth
+                    if saving > best_saving:
+                        best_saving = saving
+                        best_target = next_state
+
+            if len(parents) >= self.max_local_states:
+                break
+            layer = next_layer
+
+        if best_target is None:
+            return None
+
+        # walk back from the target to the start
+        shortcut = []
+        state = best_target
+        while state != start:
+            shortcut.append(state)
+            state = parents[state]
+
+        return shortcut[::-1]
+
+
+    def merge_moves(self, moves):
+        """
+        In this method we merge consecutive moves of the same vehicle into
+        one move, and drop the moves that add up to nothing.
+        """
+        merged = []
+        for vehicle_name, distance in moves:
+            if merged and merged[-1][0] == vehicle_name:
+                distance += merged.pop()[1]
+            if distance != 0:
+                merged.append((vehicle_name, distance))
+        return merged
+
+
+    def neighbours(self, state):
+        """
+        In this method we return all compact states one move away.
+        """
+        if self.min_slides:
+            moves = self.bitboard.legal_slides(state)
+        else:
+            moves = self.bitboard.legal_moves(state)
+        return [state.move(i, distance) for i, distance in moves]
+
+
+    def calculate_moves(self, solution_path):
+        """
+        In this method we will calculate the order of the moves done
+        to get from our initial state to the solution state.
+        """
+        moves = []
+        for i in range(1, len(solution_path)):
+            move = self.spec.move_between(solution_path[i - 1], solution_path[i])
+            if move:
+                moves.append(move)
+        return moves
+
+
+if __name__ == "__main__":
+
+    # create an instance of the rush hour game
+    rush_hour_game = RushHour()
+
+    # find a solution with the depth first search
+    solver = RushHourDFS(rush_hour_game)
+    solution_path = solver.depth_first_search()
+
+    if solution_path:
+        print(f"Depth first search solution: {len(solution_path) - 1} states")
+
+        # make the solution shorter and time it
+        start_time = time.time()
+        shortcutter = RushHourShortcutter(rush_hour_game)
+        moves = shortcutter.optimize_path_of_games(solution_path)
+        end_time = time.time()
+
+        print("Solution sequence of moves:")
+        for move in moves:
+            print(move)
+        print(f"Solution shortened to {len(moves)} moves!")
+
+        elapsed_time = end_time - start_time
+        print(f"Time taken to shorten the solution: {elapsed_time:.2f} seconds")
+
+    else:
+        print("No solution found.")
@@ -0,0 +1,75 @@
+import time
+from collections import deque
+
+from code.algorithms.bfs import RushHourBFS
+from code.game.loader import load_boards
+
+
+def expansions_per_second(game, generate_next_states, max_expansions):
+    """
+    In this function we expand states breadth first from the given game
+    with the given successor function and return the number of
+    expansions per second.
+    """
+    queue = deque([game])
+    visited = {game.get_state_hashable()}
+    expansions = 0
+
+    start_time = time.perf_counter()
+    while queue and expansions < max_expansions:
+        current_state = queue.popleft()
+        expansions += 1
+
+        for next_state in generate_next_states(current_state):
+            state_hash = next_state.get_state_hashable()
+            if state_hash not in visited:
+                visited.add(state_hash)
+                queue.append(next_state)
+
+    return expansions / (time.perf_counter() - start_time)
+
+
+def offsets_per_second(bitboard, offsets, max_expansions, slides=False):
+    """
+    In this function we expand states breadth first using only the
+    offset tuples of the bitboard, without building RushHour objects.
+    """
+    legal_moves = bitboard.legal_slides if slides else bitboard.legal_moves
+    queue = deque([offsets])
+    visited = {offsets}
+    expansions = 0
+
+    start_time = time.perf_counter()
+    while queue and expansions < max_expansions:
+        current = queue.popleft()
+        expansions += 1
+
+        for i, distance in legal_moves(current):
+            next_offsets = bitboard.apply_move(current, i, distance)
+            if next_offsets not in visited:
+                visited.add(next_offsets)
+                queue.append(next_offsets)
+
+    return expansions / (time.perf_counter() - start_time)
+
+
+def run_benchmark(max_expansions=2000):
+    """
+    In this function we compare the list based board with the bitboard
+    engine on every gameboard and print the expansions per second.
+    """
+    print(f"{'board':<22}{'list':>12}{'bitboard':>12}{'offsets':>12}")
+
+    for file_name, game in load_boards().items():
+        list_solver = RushHourBFS(game)
+        bitboard_solver = RushHourBFS(game, use_bitboard=True)
+
+        list_rate = expansions_per_second(game, list_solver.generate_next_states, max_expansions)
+        bitboard_rate = expansions_per_second(game, bitboard_solver.generate_next_states, max_expansions)
+        offsets_rate = offsets_per_second(bitboard_solver.bitboard, bitboard_solver.bitboard.get_offsets(game), max_expansions)
+
+        print(f"{file_name:<22}{list_rate:>12.0f}{bitboard_rate:>12.0f}{offsets_rate:>12.0f}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
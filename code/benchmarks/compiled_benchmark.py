@@ -0,0 +1,44 @@
+import tempfile
+import time
+
+from code.benchmarks.bitboard_benchmark import offsets_per_second
+from code.game.bitboard import BitBoard
+from code.game.compiler import CompiledBoard
+from code.game.loader import load_boards
+
+
+def run_benchmark(max_expansions=5000):
+    """
+    In this function we compare the generic bitboard move generation with
+    the move generator compiled for each gameboard, for unit moves and for
+    slides, and print the cold and cached compile times.
+    """
+    print(f"{'board':<22}{'cold ms':>9}{'cached ms':>11}{'generic':>10}{'compiled':>10}{'generic sl':>12}{'compiled sl':>13}")
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for file_name, game in load_boards().items():
+
+            # The first compile writes the cache, the second one reads it
+            start_time = time.perf_counter()
+            CompiledBoard(game, cache_dir)
+            cold_time = (time.perf_counter() - start_time) * 1000
+
+            start_time = time.perf_counter()
+            compiled = CompiledBoard(game, cache_dir)
+            cached_time = (time.perf_counter() - start_time) * 1000
+
+            generic = BitBoard(game)
+            offsets = generic.get_offsets(game)
+
+            rates = [
+                offsets_per_second(generic, offsets, max_expansions),
+                offsets_per_second(compiled, offsets, max_expansions),
+                offsets_per_second(generic, offsets, max_expansions, slides=True),
+                offsets_per_second(compiled, offsets, max_expansions, slides=True),
+            ]
+
+            print(f"{file_name:<22}{cold_time:>9.1f}{cached_time:>11.1f}{rates[0]:>10.0f}{rates[1]:>10.0f}{rates[2]:>12.0f}{rates[3]:>13.0f}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,68 @@
+import os
+import subprocess
+import sys
+
+
+# The directory with main.py, imports are resolved from there
+PROJECT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+
+# The entry points we measure
+MODULES = [
+    'main',
+    'code.game.loader',
+    'code.algorithms.bfs',
+    'code.algorithms.dfs',
+    'code.algorithms.astar',
+    'code.algorithms.astar2',
+    'code.algorithms.random_algorithm',
+]
+
+# Dependencies that should only be imported by the code that needs them
+HEAVY_MODULES = ['pandas', 'numpy', 'matplotlib', 'seaborn', 'cProfile']
+
+
+def import_time(module, runs=5):
+    """
+    In this function we import a module in a fresh interpreter with
+    python -X importtime and return the fastest cumulative import time
+    in milliseconds, and the heavy modules it pulled in.
+    """
+    best_time = None
+    heavy = set()
+
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+            cwd=PROJECT_DIR, capture_output=True, text=True, check=True,
+        )
+
+        # Lines look like: "import time:  self [us] | cumulative | imported package"
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or 'cumulative' in line:
+                continue
+            _, cumulative, name = line[len('import time:'):].split('|')
+            name = name.strip()
+
+            if name == module:
+                microseconds = int(cumulative)
+                if best_time is None or microseconds < best_time:
+                    best_time = microseconds
+            if name.split('.')[0] in HEAVY_MODULES:
+                heavy.add(name.split('.')[0])
+
+    return best_time / 1000, sorted(heavy)
+
+
+def run_benchmark():
+    """
+    In this function we print the import time of every entry point.
+    """
+    print(f"{'module':<36}{'ms':>8}  heavy imports")
+
+    for module in MODULES:
+        milliseconds, heavy = import_time(module)
+        print(f"{module:<36}{milliseconds:>8.1f}  {', '.join(heavy) or '-'}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
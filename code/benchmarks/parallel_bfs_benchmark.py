@@ -0,0 +1,59 @@
+import contextlib
+import io
+import os
+import sys
+import time
+
+from code.algorithms.bfs import RushHourBFS
+from code.algorithms.parallel_bfs import RushHourParallelBFS
+from code.game.loader import load_board, load_boards
+
+
+# The numbers of workers that are compared
+WORKER_COUNTS = (1, 2, 4, 8, 16)
+
+
+def timed_solve(solver):
+    """
+    In this function we run the bfs of a solver without its printing and
+    return the moves and the seconds it took.
+    """
+    start_time = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        moves = solver.bfs()
+    return moves, time.perf_counter() - start_time
+
+
+def run_benchmark(games, worker_counts=WORKER_COUNTS):
+    """
+    In this function we solve every game with the serial bitboard BFS and
+    with the parallel BFS for every number of workers, and print the time,
+    the speedup over one worker and if the solution length is the same.
+    """
+    print(f"{os.cpu_count()} cores available")
+    print(f"{'board':<22}{'workers':>8}{'seconds':>10}{'speedup':>9}{'moves':>7}{'same':>6}")
+
+    for file_name, game in games.items():
+        serial_moves, serial_time = timed_solve(RushHourBFS(game, use_bitboard=True))
+        print(f"{file_name:<22}{'serial':>8}{serial_time:>10.2f}{'':>9}{len(serial_moves):>7}")
+
+        single_time = None
+        for workers in worker_counts:
+            moves, elapsed_time = timed_solve(RushHourParallelBFS(game, workers=workers))
+            if single_time is None:
+                single_time = elapsed_time
+
+            same = 'yes' if len(moves) == len(serial_moves) else 'NO'
+            print(f"{file_name:<22}{workers:>8}{elapsed_time:>10.2f}{single_time / elapsed_time:>9.2f}{len(moves):>7}{same:>6}")
+
+
+if __name__ == "__main__":
+
+    # python -m code.benchmarks.parallel_bfs_benchmark [gameboard csv files]
+    # runs on the given boards, or on the 6x6 boards
+    if len(sys.argv) > 1:
+        games = {os.path.basename(path): load_board(path) for path in sys.argv[1:]}
+    else:
+        games = {name: game for name, game in load_boards().items() if '6x6' in name}
+
+    run_benchmark(games)
@@ -0,0 +1,48 @@
+import sys
+
+from code.algorithms.bfs import clone_rush_hour_state
+from code.game.loader import load_boards
+from code.game.state import BoardSpec
+
+
+def deep_size(obj, seen=None):
+    """
+    In this function we sum the size of an object and of everything it
+    refers to. Strings and integers are skipped, since the vehicle names
+    and small numbers are shared by all states anyway.
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen or isinstance(obj, (str, int)):
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_size(key, seen) + deep_size(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set)):
+        size += sum(deep_size(item, seen) for item in obj)
+    if hasattr(obj, '__dict__'):
+        size += deep_size(obj.__dict__, seen)
+
+    return size
+
+
+def run_benchmark():
+    """
+    In this function we compare the memory of one cloned RushHour state
+    with one compact state on every gameboard.
+    """
+    print(f"{'board':<22}{'RushHour':>12}{'State':>12}{'ratio':>10}")
+
+    for file_name, game in load_boards().items():
+        spec = BoardSpec(game)
+
+        clone_size = deep_size(clone_rush_hour_state(game))
+        state_size = deep_size(spec.encode(game))
+
+        print(f"{file_name:<22}{clone_size:>12}{state_size:>12}{clone_size / state_size:>10.1f}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
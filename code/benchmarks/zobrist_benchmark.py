@@ -0,0 +1,83 @@
+import sys
+import time
+from collections import deque
+
+from code.algorithms.bfs import RushHourBFS
+from code.game.loader import load_boards
+from code.game.state import BoardSpec
+from code.game.zobrist import ZobristDict
+
+
+def collect_states(game, max_states):
+    """
+    In this function we collect the first states of a breadth first
+    exploration, so both hashing methods see exactly the same states.
+    """
+    solver = RushHourBFS(game)
+    spec = solver.spec
+
+    queue = deque([game])
+    seen = {spec.encode(game)}
+    states = [game]
+
+    while queue and len(states) < max_states:
+        for next_state in solver.generate_next_states(queue.popleft()):
+            compact_state = spec.encode(next_state)
+            if compact_state not in seen:
+                seen.add(compact_state)
+                queue.append(next_state)
+                states.append(next_state)
+
+    return states[:max_states]
+
+
+def run_benchmark(max_states=5000):
+    """
+    In this function we fill a visited set with the same states keyed on
+    the hashable strings, on the compact states the breadth first search
+    and A* solvers use, and on the zobrist hashes the depth first search
+    uses, and print the time and memory of all three on every gameboard.
+    """
+    print(f"{'board':<22}{'string s':>10}{'state s':>9}{'zobrist s':>11}{'speedup':>9}{'string kB':>11}{'state kB':>10}{'zobrist kB':>12}")
+
+    for file_name, game in load_boards().items():
+        spec = BoardSpec(game)
+        states = collect_states(game, max_states)
+
+        # Drop cached strings so every state builds its own key
+        for state in states:
+            state.__dict__.pop('_cached_state', None)
+
+        start_time = time.perf_counter()
+        string_visited = set()
+        for state in states:
+            string_visited.add(state.get_state_hashable())
+        string_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        state_visited = set()
+        for state in states:
+            state_visited.add(spec.encode(state))
+        state_time = time.perf_counter() - start_time
+
+        # The zobrist hash is already up to date, only the exact key is built
+        start_time = time.perf_counter()
+        zobrist_visited = ZobristDict(spec)
+        for state in states:
+            zobrist_visited.set_hashed(state.zobrist_hash, spec.encode(state), None)
+        zobrist_time = time.perf_counter() - start_time
+
+        # The keys are unique per state here, so they are counted as well
+        string_size = (sys.getsizeof(string_visited) + sum(sys.getsizeof(key) for key in string_visited)) / 1024
+        state_size = (sys.getsizeof(state_visited) + sum(sys.getsizeof(key) for key in state_visited)) / 1024
+        zobrist_size = (sys.getsizeof(zobrist_visited.entries) + sys.getsizeof(zobrist_visited.collisions) + sum(
+            sys.getsizeof(key) + sys.getsizeof(entry) + sys.getsizeof(entry[0])
+            for key, entry in zobrist_visited.entries.items()
+        )) / 1024
+
+        print(f"{file_name:<22}{string_time:>10.3f}{state_time:>9.3f}{zobrist_time:>11.3f}{string_time / zobrist_time:>9.1f}"
+              f"{string_size:>11.0f}{state_size:>10.0f}{zobrist_size:>12.0f}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,236 @@
+from code.game.rush_hour import RushHour, Vehicle
+from code.game.zobrist import zobrist_key
+
+
+class BitBoard:
+    """
+    In this class we store the occupancy of a rush hour board as one big
+    integer, where the cell on (row, col) is bit row * board_size + col.
+    The static data of every vehicle (orientation, length and lane) is
+    precomputed once, so legal slides and the win test only need a few
+    bit operations instead of walking the board cell by cell.
+    """
+
+    def __init__(self, game):
+        """
+        In this method we precompute the bitmasks for every vehicle on
+        every offset in its lane for the given rush hour game.
+        """
+        # Board size and the names of the vehicles in dictionary order
+        self.board_size = game.board_size
+        self.names = tuple(game.vehicles.keys())
+        self.index = {name: i for i, name in enumerate(self.names)}
+
+        # Static vehicle data per vehicle index
+        self.orientations = []
+        self.lengths = []
+        self.lanes = []
+        self.max_offsets = []
+
+        # masks[i][offset] are the cells vehicle i covers on that offset,
+        # ahead[i][offset] and behind[i][offset] the cell it slides into
+        self.masks = []
+        self.ahead = []
+        self.behind = []
+
+        for vehicle in game.vehicles.values():
+            # The lane is the fixed row or column, the offset is the moving one
+            lane = vehicle.row if vehicle.orientation == 'H' else vehicle.col
+            max_offset = self.board_size - vehicle.length
+
+            self.orientations.append(vehicle.orientation)
+            self.lengths.append(vehicle.length)
+            self.lanes.append(lane)
+            self.max_offsets.append(max_offset)
+
+            masks = []
+            ahead = []
+            behind = []
+            for offset in range(max_offset + 1):
+                mask = 0
+                for i in range(vehicle.length):
+                    mask |= self.cell_bit(vehicle.orientation, lane, offset + i)
+                masks.append(mask)
+
+                # Cells outside the board get a zero mask, the offset bounds guard them
+                ahead.append(self.cell_bit(vehicle.orientation, lane, offset + vehicle.length) if offset < max_offset else 0)
+                behind.append(self.cell_bit(vehicle.orientation, lane, offset - 1) if offset > 0 else 0)
+
+            self.masks.append(masks)
+            self.ahead.append(ahead)
+            self.behind.append(behind)
+
+        # The red car wins when it reaches the last offset in its lane
+        self.red_index = self.index.get('X')
+
+
+    def cell_bit(self, orientation, lane, offset):
+        """
+        In this method we return the bit for a cell in a lane.
+        """
+        if orientation == 'H':
+            return 1 << (lane * self.board_size + offset)
+        return 1 << (offset * self.board_size + lane)
+
+
+    def get_offsets(self, game):
+        """
+        In this method we read the offset of every vehicle from a
+        rush hour game as a tuple in vehicle index order.
+        """
+        return tuple(
+            vehicle.col if vehicle.orientation == 'H' else vehicle.row
+            for vehicle in game.vehicles.values()
+        )
+
+
+    def occupancy(self, offsets):
+        """
+        In this method we OR the masks of all vehicles together into
+        the occupancy bitboard for the given offsets.
+        """
+        occupied = 0
+        for masks, offset in zip(self.masks, offsets):
+            occupied |= masks[offset]
+        return occupied
+
+
+    def legal_moves(self, offsets, occupied=None):
+        """
+        In this method we return all legal unit slides as a list of
+        (vehicle index, distance) tuples, in the same order the search
+        algorithms try them: every vehicle forward, then backward.
+        """
+        if occupied is None:
+            occupied = self.occupancy(offsets)
+
+        moves = []
+        for i, offset in enumerate(offsets):
+
+            # A slide is legal when the cell it moves into is free
+            if offset < self.max_offsets[i] and not occupied & self.ahead[i][offset]:
+                moves.append((i, 1))
+            if offset > 0 and not occupied & self.behind[i][offset]:
+                moves.append((i, -1))
+
+        return moves
+
+
+    def legal_slides(self, offsets, occupied=None):
+        """
+        In this method we return every reachable offset of every vehicle
+        as (vehicle index, distance) tuples, scanning each lane once
+        forward and once backward until the first occupied cell.
+        """
+        if occupied is None:
+            occupied = self.occupancy(offsets)
+
+        moves = []
+        for i, offset in enumerate(offsets):
+            ahead = self.ahead[i]
+            behind = self.behind[i]
+
+            # Keep sliding forward while the next cell is free
+            new_offset = offset
+            while new_offset < self.max_offsets[i] and not occupied & ahead[new_offset]:
+                new_offset += 1
+                moves.append((i, new_offset - offset))
+
+            # And the same backward
+            new_offset = offset
+            while new_offset > 0 and not occupied & behind[new_offset]:
+                new_offset -= 1
+                moves.append((i, new_offset - offset))
+
+        return moves
+
+
+    def apply_move(self, offsets, i, distance):
+        """
+        In this method we return the offsets after sliding vehicle i.
+        """
+        new_offsets = list(offsets)
+        new_offsets[i] += distance
+        return tuple(new_offsets)
+
+
+    def is_win(self, offsets):
+        """
+        In this method we check if the red car is at the exit.
+        """
+        return self.red_index is not None and offsets[self.red_index] == self.max_offsets[self.red_index]
+
+
+    def check_win(self, game):
+        """
+        In this method we check if a rush hour game is in a winning
+        state by looking only at the red car.
+        """
+        if self.red_index is None:
+            return False
+
+        red_car = game.vehicles['X']
+        return red_car.orientation == 'H' and red_car.col == self.max_offsets[self.red_index]
+
+
+    def generate_next_states(self, game, slides=False):
+        """
+        In this method we generate all next states of a rush hour game,
+        just like generate_next_states in the search algorithms, but the
+        legality of every slide is decided on the bitboard. With slides
+        every reachable offset is a next state, not only single steps.
+        """
+        offsets = self.get_offsets(game)
+        moves = self.legal_slides(offsets) if slides else self.legal_moves(offsets)
+
+        next_states = []
+        for i, distance in moves:
+            next_states.append(self.make_state(game, i, distance))
+
+        return next_states
+
+
+    def make_state(self, game, i, distance):
+        """
+        In this method we build the successor of a game where vehicle i
+        slid the given distance, writing only the cells of that vehicle.
+        """
+        board = [row[:] for row in game.board]
+
+        # Copy the vehicles, the moved one at its new position
+        vehicles = {}
+        moved_name = self.names[i]
+        for name, vehicle in game.vehicles.items():
+            if name == moved_name:
+                row, col = vehicle.row, vehicle.col
+                if vehicle.orientation == 'H':
+                    col += distance
+                else:
+                    row += distance
+                moved = Vehicle(name, vehicle.length, vehicle.orientation, row, col)
+                moved.old_row = vehicle.row
+                moved.old_col = vehicle.col
+                vehicles[name] = moved
+            else:
+                vehicles[name] = Vehicle(name, vehicle.length, vehicle.orientation, vehicle.row, vehicle.col)
+
+        # Free the old cells and occupy the new cells of the moved vehicle
+        length = self.lengths[i]
+        old = vehicles[moved_name]
+        if self.orientations[i] == 'H':
+            for col in range(old.old_col, old.old_col + length):
+                board[old.row][col] = '.'
+            for col in range(old.col, old.col + length):
+                board[old.row][col] = moved_name
+        else:
+            for row in range(old.old_row, old.old_row + length):
+                board[row][old.col] = '.'
+            for row in range(old.row, old.row + length):
+                board[row][old.col] = moved_name
+
+        new_state = RushHour(start_game=False, board_size=game.board_size, board=board)
+        new_state.vehicles = vehicles
+
+        # Update the zobrist hash of the parent for the moved vehicle only
+        new_state.zobrist_hash = game.zobrist_hash ^ zobrist_key(moved_name, old.old_row, old.old_col) ^ zobrist_key(moved_name, old.row, old.col)
+        return new_state
@@ -0,0 +1,142 @@
+import hashlib
+import os
+
+from code.game.bitboard import BitBoard
+
+
+# Bump this when the generated code changes, so old cache files are not used
+COMPILER_VERSION = 1
+
+# Directory where the generated move generators are cached
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'compiled_boards')
+
+
+class CompiledBoard(BitBoard):
+    """
+    In this class we replace the generic move generation of the bitboard
+    by Python code generated for one specific board. Every vehicle gets
+    its own unrolled lines with its lane tables and bounds baked in, so
+    there are no loops over vehicles and no orientation checks left.
+    """
+
+    def __init__(self, game, cache_dir=CACHE_DIR):
+        """
+        In this method we precompute the bitboard tables and load the
+        generated move generator from the cache, or generate it first.
+        """
+        super().__init__(game)
+
+        # The cells just outside the board all share this wall bit
+        self.wall = 1 << (self.board_size * self.board_size)
+
+        self.csv_hash = hashlib.sha256(board_csv(game).encode()).hexdigest()
+        self.source = self.load_source(cache_dir)
+
+        # Run the generated code and use its functions for this board
+        namespace = {}
+        exec(compile(self.source, f"<compiled board {self.csv_hash[:12]}>", 'exec'), namespace)
+        self.legal_moves = namespace['legal_moves']
+        self.legal_slides = namespace['legal_slides']
+
+
+    def load_source(self, cache_dir):
+        """
+        In this method we read the generated source from the cache, keyed
+        by the hash of the board csv, and generate and store it if it is
+        not there yet.
+        """
+        if cache_dir is None:
+            return self.generate_source()
+
+        path = os.path.join(cache_dir, f"board_v{COMPILER_VERSION}_{self.csv_hash}.py")
+        if os.path.exists(path):
+            with open(path) as file:
+                return file.read()
+
+        source = self.generate_source()
+
+        # Write to a temporary file first, so a crash never leaves half a file
+        os.makedirs(cache_dir, exist_ok=True)
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, 'w') as file:
+            file.write(source)
+        os.replace(temporary_path, path)
+
+        return source
+
+
+    def generate_source(self):
+        """
+        In this method we write the Python source of legal_moves and
+        legal_slides for this board. The ahead and behind tables get the
+        wall bit for cells outside the board, which is always set in the
+        occupancy, so the bounds checks disappear as well.
+        """
+        count = len(self.names)
+        offsets = ', '.join(f"o{i}" for i in range(count))
+
+        lines = [f"# Generated move generator for board {self.csv_hash}", f"WALL = {self.wall}"]
+
+        # The lane tables of every vehicle as constants
+        for i in range(count):
+            ahead = [cell or self.wall for cell in self.ahead[i]]
+            behind = [cell or self.wall for cell in self.behind[i]]
+            lines.append(f"M{i} = {tuple(self.masks[i])}")
+            lines.append(f"A{i} = {tuple(ahead)}")
+            lines.append(f"B{i} = {tuple(behind)}")
+
+        occupancy = ' | '.join(f"M{i}[o{i}]" for i in range(count))
+        header = [
+            "",
+            "",
+            "def {name}(state, occupied=None):",
+            f"    ({offsets},) = state",
+            "    if occupied is None:",
+            f"        occupied = {occupancy}",
+            "    occupied |= WALL",
+            "    moves = []",
+        ]
+
+        # Unit moves: one check per direction per vehicle
+        lines.extend(line.format(name='legal_moves') for line in header)
+        for i in range(count):
+            lines.append(f"    if not occupied & A{i}[o{i}]:")
+            lines.append(f"        moves.append(({i}, 1))")
+            lines.append(f"    if not occupied & B{i}[o{i}]:")
+            lines.append(f"        moves.append(({i}, -1))")
+        lines.append("    return moves")
+
+        # Slides: scan the lane until the first occupied cell
+        lines.extend(line.format(name='legal_slides') for line in header)
+        for i in range(count):
+            lines.append(f"    offset = o{i}")
+            lines.append(f"    while not occupied & A{i}[offset]:")
+            lines.append("        offset += 1")
+            lines.append(f"        moves.append(({i}, offset - o{i}))")
+            lines.append(f"    offset = o{i}")
+            lines.append(f"    while not occupied & B{i}[offset]:")
+            lines.append("        offset -= 1")
+            lines.append(f"        moves.append(({i}, offset - o{i}))")
+        lines.append("    return moves")
+
+        return '\n'.join(lines) + '\n'
+
+
+def board_csv(game):
+    """
+    In this function we write a rush hour game in the csv format of the
+    gameboards directory, with one based columns and rows.
+    """
+    lines = ["car,orientation,col,row,length"]
+    for vehicle in game.vehicles.values():
+        lines.append(f"{vehicle.name},{vehicle.orientation},{vehicle.col + 1},{vehicle.row + 1},{vehicle.length}")
+
+    # The board size is part of the file name, so we add it to the hash as well
+    return f"{game.board_size}x{game.board_size}\n" + '\n'.join(lines) + '\n'
+
+
+def compile_board(game, cache_dir=CACHE_DIR):
+    """
+    In this function we return the compiled move generator for a game.
+    """
+    return CompiledBoard(game, cache_dir)
@@ -0,0 +1,115 @@
+import io
+import os
+import re
+
+from code.game.rush_hour import RushHour
+
+
+# Directory with the gameboards that come with the case
+GAMEBOARDS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'gameboards')
+
+
+def parse_board_csv(lines):
+    """
+    In this function we read the vehicles from the lines of a gameboard
+    csv file one line at a time. Every vehicle is returned as a tuple
+    (name, orientation, col, row, length), with the one based col and row
+    of the file, in the same column order as the file.
+    """
+    vehicles = []
+
+    for line_number, line in enumerate(lines, 1):
+        line = line.strip()
+
+        # Skip empty lines and the header
+        if not line or line.startswith('car,'):
+            continue
+
+        fields = [field.strip() for field in line.split(',')]
+        if len(fields) != 5:
+            raise ValueError(f"Line {line_number} should have 5 fields: {line}")
+
+        name, orientation, col, row, length = fields
+        if orientation not in ('H', 'V'):
+            raise ValueError(f"Line {line_number} has an unknown orientation: {orientation}")
+
+        vehicles.append((name, orientation, int(col), int(row), int(length)))
+
+    return vehicles
+
+
+def board_size_from_name(file_name):
+    """
+    In this function we extract the board size from a gameboard file name
+    such as Rushhour6x6_1.csv.
+    """
+    match = re.search(r'(\d+)x\d+', os.path.basename(str(file_name)))
+    if match:
+        return int(match.group(1))
+    return None
+
+
+def build_game(vehicles, board_size):
+    """
+    In this function we build a rush hour game from vehicle tuples as
+    returned by parse_board_csv, without asking the user anything.
+    """
+    board = [['.' for _ in range(board_size)] for _ in range(board_size)]
+    game = RushHour(start_game=False, board_size=board_size, board=board)
+
+    # Keep the vehicles like start_game does, so reset still works
+    game.rush_hour_file = vehicles
+    game.read_all_vehicles()
+    game.initial_positions = {}
+    game.initial_hashable_state = game.get_state_hashable()
+
+    return game
+
+
+def load_board(source, board_size=None):
+    """
+    In this function we build a rush hour game from a path to a gameboard
+    csv file, an open file-like object or a list of vehicles, where every
+    vehicle is a (name, orientation, col, row, length) tuple or a dict
+    with those keys using the one based col and row of the csv files.
+    The board size is taken from the file name when it is not given.
+    """
+    # A list of vehicles that is already in memory
+    if isinstance(source, (list, tuple)):
+        vehicles = [
+            (vehicle['car'], vehicle['orientation'], int(vehicle['col']), int(vehicle['row']), int(vehicle['length']))
+            if isinstance(vehicle, dict) else tuple(vehicle)
+            for vehicle in source
+        ]
+
+    # A file-like object, read line by line
+    elif isinstance(source, io.IOBase) or hasattr(source, 'read'):
+        if board_size is None:
+            board_size = board_size_from_name(getattr(source, 'name', ''))
+        vehicles = parse_board_csv(source)
+
+    # A path to a gameboard file
+    else:
+        if board_size is None:
+            board_size = board_size_from_name(source)
+        with open(source) as file:
+            vehicles = parse_board_csv(file)
+
+    if board_size is None:
+        raise ValueError("Unable to determine board size, please pass board_size")
+
+    return build_game(vehicles, board_size)
+
+
+def load_boards(directory=GAMEBOARDS_DIR):
+    """
+    In this function we load every gameboard csv file in a directory and
+    return a dictionary from file name to rush hour game, sorted by name.
+    """
+    games = {}
+
+    for file_name in sorted(os.listdir(directory)):
+        if file_name.endswith('.csv'):
+            games[file_name] = load_board(os.path.join(directory, file_name))
+
+    return games
@@ -1,8 +1,6 @@
-import pandas as pd
 import os
-import copy
-import re
-import numpy as np
+
+from code.game.zobrist import zobrist_key
 
 
 class Vehicle:
@@ -53,6 +51,9 @@ class RushHour:
         """
         # Initilaize variables and call functions
         self.rush_hour_file = None
+
+        # 64-bit zobrist hash of the board, kept up to date by add_vehicle and move_vehicle
+        self.zobrist_hash = 0
         if board_size is not None and board is not None:
             self.board_size = board_size
             self.board = board
@@ -144,6 +145,7 @@ class RushHour:
 
         # Reset the vehicles dictionary to its initial state
         self.vehicles = {}
+        self.zobrist_hash = 0
 
         # Re-add all vehicles to the board
         self.read_all_vehicles()
@@ -156,7 +158,7 @@ class RushHour:
         and starting row. Furthermore we add the vehicle instance to the dictionary.
         """
         # Loops through the csv file and assigns the values to variables
-        for car in self.rush_hour_file.values:
+        for car in self.rush_hour_file:
             name = car[0]
             orientation = car[1]
 
@@ -177,6 +179,9 @@ class RushHour:
         # We add the vehicle to the dictionary
         self.vehicles[vehicle.name] = vehicle
 
+        # XOR the key of the vehicle position into the zobrist hash
+        self.zobrist_hash ^= zobrist_key(vehicle.name, vehicle.row, vehicle.col)
+
         # For horizontal oriented vehicles: loop over length and add to columns
         if vehicle.orientation == 'H':
             for i in range(vehicle.length):
@@ -282,6 +287,9 @@ class RushHour:
                 for i in range(vehicle.length):
                     self.board[vehicle.row][vehicle.col + i] = vehicle.name
 
+                # Swap the old position key for the new one in the zobrist hash
+                self.zobrist_hash ^= zobrist_key(vehicle.name, vehicle.row, vehicle.old_col) ^ zobrist_key(vehicle.name, vehicle.row, vehicle.col)
+
                 # Return True to indicate succesful move
                 return True
 
@@ -307,6 +315,9 @@ class RushHour:
                 # Place the vehicle at the new position
                 for i in range(vehicle.length):
                     self.board[vehicle.row + i][vehicle.col] = vehicle.name
+
+                # Swap the old position key for the new one in the zobrist hash
+                self.zobrist_hash ^= zobrist_key(vehicle.name, vehicle.old_row, vehicle.col) ^ zobrist_key(vehicle.name, vehicle.row, vehicle.col)
                 return True
 
             # Otherwise give an error
@@ -314,6 +325,104 @@ class RushHour:
                 return False
 
 
+    def iter_moves(self):
+        """
+        In this method we yield the legal one step moves as (vehicle name,
+        distance) tuples one at a time, every vehicle forward before
+        backward. The board may be changed between two moves, as long as
+        it is restored before the next move is asked for.
+        """
+        board_size = self.board_size
+
+        for name, vehicle in self.vehicles.items():
+            row, col, length = vehicle.row, vehicle.col, vehicle.length
+
+            # Only the cell the vehicle slides into has to be empty
+            if vehicle.orientation == 'H':
+                if col + length < board_size and self.board[row][col + length] == '.':
+                    yield (name, 1)
+                if col > 0 and self.board[row][col - 1] == '.':
+                    yield (name, -1)
+            else:
+                if row + length < board_size and self.board[row + length][col] == '.':
+                    yield (name, 1)
+                if row > 0 and self.board[row - 1][col] == '.':
+                    yield (name, -1)
+
+
+    def iter_slides(self):
+        """
+        In this method we yield every legal move of any distance as
+        (vehicle name, distance) tuples, scanning each lane once forward
+        and once backward until the first occupied cell.
+        """
+        board_size = self.board_size
+
+        for name, vehicle in self.vehicles.items():
+            row, col, length = vehicle.row, vehicle.col, vehicle.length
+
+            if vehicle.orientation == 'H':
+                distance = 1
+                while col + length - 1 + distance < board_size and self.board[row][col + length - 1 + distance] == '.':
+                    yield (name, distance)
+                    distance += 1
+                distance = 1
+                while col - distance >= 0 and self.board[row][col - distance] == '.':
+                    yield (name, -distance)
+                    distance += 1
+            else:
+                distance = 1
+                while row + length - 1 + distance < board_size and self.board[row + length - 1 + distance][col] == '.':
+                    yield (name, distance)
+                    distance += 1
+                distance = 1
+                while row - distance >= 0 and self.board[row - distance][col] == '.':
+                    yield (name, -distance)
+                    distance += 1
+
+
+    def make_move(self, vehicle_id, distance):
+        """
+        In this method we slide a vehicle in place without checking if
+        the move is valid, and return the move record that unmake_move
+        uses to undo it.
+        """
+        vehicle = self.vehicles[vehicle_id]
+
+        # Take the vehicle off the board and out of the zobrist hash
+        self.zobrist_hash ^= zobrist_key(vehicle.name, vehicle.row, vehicle.col)
+        if vehicle.orientation == 'H':
+            row = self.board[vehicle.row]
+            for i in range(vehicle.length):
+                row[vehicle.col + i] = '.'
+            vehicle.col += distance
+            for i in range(vehicle.length):
+                row[vehicle.col + i] = vehicle.name
+        else:
+            for i in range(vehicle.length):
+                self.board[vehicle.row + i][vehicle.col] = '.'
+            vehicle.row += distance
+            for i in range(vehicle.length):
+                self.board[vehicle.row + i][vehicle.col] = vehicle.name
+
+        # Put it back in the zobrist hash on its new position
+        self.zobrist_hash ^= zobrist_key(vehicle.name, vehicle.row, vehicle.col)
+
+        # The cached hashable string no longer matches the board
+        self.__dict__.pop('_cached_state', None)
+
+        return (vehicle_id, distance)
+
+
+    def unmake_move(self, move):
+        """
+        In this method we undo a move made with make_move by sliding the
+        vehicle back the same distance.
+        """
+        vehicle_id, distance = move
+        self.make_move(vehicle_id, -distance)
+
+
     def check_win(self):
         """
         In this method we check if the game has been finished
@@ -341,10 +450,11 @@ class RushHour:
         In this method we start the game by initializing the gameboards
         and asking user which board to play with.
         """
+        # The loader imports this module, so it is imported here
+        from code.game.loader import GAMEBOARDS_DIR, board_size_from_name, parse_board_csv
+
         # Initialize and set up the game
-        current_directory = os.path.dirname(os.path.abspath(__file__))
-        gameboards_dir = os.path.join(current_directory, '..', '..', 'gameboards')
-        gameboards = [file for file in os.listdir(gameboards_dir)]
+        gameboards = sorted(file for file in os.listdir(GAMEBOARDS_DIR) if file.endswith('.csv'))
 
         # Display the gameboards files with numbers
         for number, file in enumerate(gameboards, 1):
@@ -357,15 +467,14 @@ class RushHour:
             choice = int(input("Enter the number of the gameboard you want to play:"))
 
             # Check whether integer is correct and use integer to read the file
-            if 1 <= choice <= 7:
-                file_chosen = os.path.join(current_directory, '..', '..', 'gameboards', gameboards[choice-1])
-                self.rush_hour_file = pd.read_csv(file_chosen)
+            if 1 <= choice <= len(gameboards):
+                file_chosen = os.path.join(GAMEBOARDS_DIR, gameboards[choice-1])
+                with open(file_chosen) as file:
+                    self.rush_hour_file = parse_board_csv(file)
 
                 # Extract board size from file name
-                match = re.search(r'(\d+)x\d+', file_chosen)
-                if match:
-                    self.board_size = int(match.group(1))
-                else:
+                self.board_size = board_size_from_name(file_chosen)
+                if self.board_size is None:
                     raise ValueError("Unable to determine board size from file name")
 
                 # Initialize board based off file
@@ -373,6 +482,7 @@ class RushHour:
 
                 # Initialize dictionaries and function
                 self.vehicles = {}
+                self.zobrist_hash = 0
                 self.read_all_vehicles()
                 self.initial_positions = {}
                 break
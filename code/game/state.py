@@ -0,0 +1,143 @@
+from code.game.rush_hour import RushHour, Vehicle
+from code.game.zobrist import zobrist_key
+
+
+class VehicleSpec:
+    """
+    In this class we store the static part of a vehicle: the values
+    that never change during a search. One spec is shared by all states.
+    """
+
+    __slots__ = ('name', 'length', 'orientation', 'lane')
+
+    def __init__(self, name, length, orientation, lane):
+        """
+        In this method we set the name, length, orientation and the fixed
+        lane (row for horizontal, column for vertical) of the vehicle.
+        """
+        self.name = name
+        self.length = length
+        self.orientation = orientation
+        self.lane = lane
+
+
+class State(bytes):
+    """
+    In this class we represent a board configuration by only the lane
+    offset of every vehicle, one byte per vehicle in spec order. Being
+    bytes, states hash and compare cheaply and cannot be changed.
+    """
+
+    __slots__ = ()
+
+    def move(self, index, distance):
+        """
+        In this method we return the state in which the vehicle with the
+        given index slid the given distance.
+        """
+        offsets = bytearray(self)
+        offsets[index] += distance
+        return State(offsets)
+
+
+class BoardSpec:
+    """
+    In this class we keep the static vehicle specs of one board, shared
+    by all compact states, and convert between RushHour games and states.
+    """
+
+    __slots__ = ('board_size', 'vehicles', 'index', 'red_index', 'zobrist_keys')
+
+    def __init__(self, game):
+        """
+        In this method we read the static vehicle specs from a rush hour
+        game, in the order of its vehicle dictionary.
+        """
+        self.board_size = game.board_size
+        self.vehicles = tuple(
+            VehicleSpec(vehicle.name, vehicle.length, vehicle.orientation,
+                        vehicle.row if vehicle.orientation == 'H' else vehicle.col)
+            for vehicle in game.vehicles.values()
+        )
+        self.index = {spec.name: i for i, spec in enumerate(self.vehicles)}
+        self.red_index = self.index.get('X')
+
+        # zobrist_keys[i][offset] is the key of vehicle i on that offset
+        self.zobrist_keys = tuple(
+            tuple(
+                zobrist_key(spec.name, spec.lane, offset) if spec.orientation == 'H' else zobrist_key(spec.name, offset, spec.lane)
+                for offset in range(self.board_size - spec.length + 1)
+            )
+            for spec in self.vehicles
+        )
+
+
+    def encode(self, game):
+        """
+        In this method we turn a rush hour game into a compact state.
+        """
+        return State(
+            vehicle.col if vehicle.orientation == 'H' else vehicle.row
+            for vehicle in game.vehicles.values()
+        )
+
+
+    def decode(self, state):
+        """
+        In this method we build a full rush hour game from a compact state.
+        """
+        board = [['.' for _ in range(self.board_size)] for _ in range(self.board_size)]
+        game = RushHour(start_game=False, board_size=self.board_size, board=board)
+
+        for spec, offset in zip(self.vehicles, state):
+            if spec.orientation == 'H':
+                game.add_vehicle(Vehicle(spec.name, spec.length, spec.orientation, spec.lane, offset))
+            else:
+                game.add_vehicle(Vehicle(spec.name, spec.length, spec.orientation, offset, spec.lane))
+
+        return game
+
+
+    def zobrist(self, state):
+        """
+        In this method we compute the zobrist hash of a compact state,
+        which equals the zobrist_hash of the decoded rush hour game.
+        """
+        zobrist_hash = 0
+        for keys, offset in zip(self.zobrist_keys, state):
+            zobrist_hash ^= keys[offset]
+        return zobrist_hash
+
+
+    def zobrist_move(self, zobrist_hash, state, index, distance):
+        """
+        In this method we update a zobrist hash for a slide of the vehicle
+        with the given index, without looking at the other vehicles.
+        """
+        keys = self.zobrist_keys[index]
+        offset = state[index]
+        return zobrist_hash ^ keys[offset] ^ keys[offset + distance]
+
+
+    def is_win(self, state):
+        """
+        In this method we check if the red car is at the exit.
+        """
+        if self.red_index is None:
+            return False
+
+        red_car = self.vehicles[self.red_index]
+        return state[self.red_index] + red_car.length == self.board_size
+
+
+    def move_between(self, previous_state, current_state):
+        """
+        In this method we find the move (vehicle name, distance) that
+        turns the previous state into the current state.
+        """
+        for spec, previous_offset, current_offset in zip(self.vehicles, previous_state, current_state):
+            if previous_offset != current_offset:
+                return (spec.name, current_offset - previous_offset)
+
+        # return None if we have not detected any move
+        return None
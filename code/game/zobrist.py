@@ -0,0 +1,110 @@
+import random
+
+
+# Seed for the zobrist keys, so the hashes are the same in every run
+ZOBRIST_SEED = 1337
+
+# Cache of the keys that have been generated so far
+_zobrist_keys = {}
+
+
+def zobrist_key(name, row, col):
+    """
+    In this function we return the random 64-bit key for a vehicle
+    standing with its first cell on (row, col). The hash of a board is
+    the XOR of the keys of all its vehicles, so moving one vehicle only
+    takes two XORs.
+    """
+    key = _zobrist_keys.get((name, row, col))
+
+    if key is None:
+        key = random.Random(f"{ZOBRIST_SEED}:{name}:{row}:{col}").getrandbits(64)
+        _zobrist_keys[(name, row, col)] = key
+
+    return key
+
+
+class ZobristDict:
+    """
+    In this class we map compact states to values, keyed on their 64-bit
+    zobrist hash. Next to the hash we keep the exact state, so that two
+    different states with the same hash are told apart: the first one
+    owns the hash, any later colliding state is stored on its exact key.
+    It can be used like a normal dictionary or set of states, or with a
+    hash that was already updated incrementally through the *_hashed
+    methods.
+    """
+
+    def __init__(self, spec):
+        """
+        In this method we create the hash table and the collision table
+        for states of the given board spec.
+        """
+        self.spec = spec
+
+        # zobrist hash -> (exact state, value)
+        self.entries = {}
+
+        # exact state -> value, for states whose hash was already taken
+        self.collisions = {}
+
+
+    def contains_hashed(self, zobrist_hash, state):
+        """
+        In this method we check if the state with the given hash is stored.
+        """
+        entry = self.entries.get(zobrist_hash)
+        if entry is None:
+            return False
+        return entry[0] == state or state in self.collisions
+
+
+    def get_hashed(self, zobrist_hash, state, default=None):
+        """
+        In this method we return the value stored for the state with the
+        given hash.
+        """
+        entry = self.entries.get(zobrist_hash)
+        if entry is None:
+            return default
+        if entry[0] == state:
+            return entry[1]
+        return self.collisions.get(state, default)
+
+
+    def set_hashed(self, zobrist_hash, state, value):
+        """
+        In this method we store a value for the state with the given hash.
+        """
+        entry = self.entries.get(zobrist_hash)
+        if entry is None or entry[0] == state:
+            self.entries[zobrist_hash] = (state, value)
+        else:
+            self.collisions[state] = value
+
+
+    def __contains__(self, state):
+        return self.contains_hashed(self.spec.zobrist(state), state)
+
+
+    def __getitem__(self, state):
+        zobrist_hash = self.spec.zobrist(state)
+        if not self.contains_hashed(zobrist_hash, state):
+            raise KeyError(state)
+        return self.get_hashed(zobrist_hash, state)
+
+
+    def __setitem__(self, state, value):
+        self.set_hashed(self.spec.zobrist(state), state, value)
+
+
+    def get(self, state, default=None):
+        return self.get_hashed(self.spec.zobrist(state), state, default)
+
+
+    def add(self, state):
+        self[state] = None
+
+
+    def __len__(self):
+        return len(self.entries) + len(self.collisions)
@@ -1,8 +1,8 @@
 import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
-from code.game.rush_hour import RushHour
-from code.algorithms.random_algorithm import RushHourSolver
+from code.game.loader import load_board
+from code.algorithms.random_playouts import RushHourRandomPlayouts
 
 def plot_histogram(data, num_bins=None):
     plt.figure(figsize=(10, 6))
@@ -43,9 +43,12 @@ def plot_cdf(data):
     plt.show()
 
 if __name__ == "__main__":
-    game= RushHour('gameboards/Rushhour6x6_1.csv')
-    solver = RushHourSolver(game)
-    results = solver.perform_experiments(num_experiments=10000)
+    game = load_board('gameboards/Rushhour6x6_1.csv')
+    playouts = RushHourRandomPlayouts(game, num_walks=10000)
+    moves, _ = playouts.run()
+
+    # only the walks that solved the board
+    results = moves[moves >= 0]
 
     # plotting
     plot_boxplot(results)
@@ -1,23 +1,62 @@
+import importlib
 import time
 
-from code.algorithms.astar import RushHourAStar
-from code.algorithms.astar2 import RushHourAStar2
-from code.algorithms.bfs import RushHourBFS
-from code.algorithms.dfs import RushHourDFS
-from code.algorithms.random_algorithm import RushHourSolver
+from code.game.rush_hour import RushHour
 
-from code.game.rush_hour import RushHour, Vehicle
+
+# The algorithms that can be chosen: name, module and class. The modules are only
+# imported when the algorithm runs, so starting up does not pay for the others.
+SOLVERS = {
+    '1': ("Random Algorithm", 'code.algorithms.random_algorithm', 'RushHourSolver'),
+    '2': ("A* Algorithm", 'code.algorithms.astar', 'RushHourAStar'),
+    '3': ("A* Algorithm with customizable heuristics", 'code.algorithms.astar2', 'RushHourAStar2'),
+    '4': ("Breadth-First Search", 'code.algorithms.bfs', 'RushHourBFS'),
+    '5': ("Depth-First Search", 'code.algorithms.dfs', 'RushHourDFS'),
+    '6': ("Bidirectional Breadth-First Search, only bidirectional on the 6x6 boards", 'code.algorithms.bidirectional_bfs', 'RushHourBidirectionalBFS'),
+    '7': ("Iterative Deepening A*", 'code.algorithms.ida_star', 'RushHourIDAStar'),
+    '8': ("Anytime Weighted A*", 'code.algorithms.ara_star', 'RushHourARAStar'),
+    '9': ("Precomputed Distance Table", 'code.algorithms.distance_table', 'RushHourDistanceTable'),
+    '10': ("Beam Search", 'code.algorithms.beam_search', 'RushHourBeamSearch'),
+    '11': ("Portfolio of solvers racing in parallel", 'code.algorithms.portfolio', 'RushHourPortfolio'),
+}
+
+
+def load_solver(choice):
+    """
+    Imports the module of the chosen algorithm and returns its solver class.
+    """
+    _, module_name, class_name = SOLVERS[choice]
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def load_shortcutter():
+    """
+    Imports the post-optimizer that makes the solutions of the depth first search and the random algorithm shorter.
+    """
+    return importlib.import_module('code.algorithms.shortcut').RushHourShortcutter
 
 
 def run_algorithm(choice):
     """
-    Runs algorithm based off of the user's choice. Input is an integer between 1 and 5.
+    Runs algorithm based off of the user's choice. Input is one of the keys of SOLVERS.
     """
+    if choice not in SOLVERS:
+        print("Invalid choice! Please choose a correct number!")
+        return
+
+    # Only the module of the chosen algorithm gets imported
+    Solver = load_solver(choice)
+
     # ----------------------------------------------------- Random ------------------------------------------------------
     if choice == '1':
         game = RushHour()
-        solver = RushHourSolver(game)
-        solver.solve_randomly()
+        solver = Solver(game)
+
+        # The shortcutter keeps the initial state, the random moves change the game itself
+        shortcutter = load_shortcutter()(game)
+        if solver.solve_randomly() is not None:
+            moves = shortcutter.optimize(solver.solution_moves)
+            print(f"Solution shortened to {len(moves)} moves!")
     
     
     # ----------------------------------------------------- AStar -------------------------------------------------------
@@ -25,7 +64,7 @@ def run_algorithm(choice):
     # 9x9 board in around 20 seconds with the shortest path as well. It keeps on running when trying a different board.
     elif choice == '2':
         rush_hour_game = RushHour()
-        solver = RushHourAStar(rush_hour_game)
+        solver = Solver(rush_hour_game)
         solution_path = solver.a_star()
         if solution_path:
             print(f"Solution found in {len(solution_path) - 1} moves!")
@@ -38,9 +77,9 @@ def run_algorithm(choice):
         rush_hour_game = RushHour()
         initial_state = rush_hour_game.get_state_hashable()
 
-        solver = RushHourAStar2(rush_hour_game, use_distance_heuristic=True, use_direct_blocking_heuristic=True, use_indirect_blocking_heuristic=True, use_car_mobility_heuristic=True, use_deadlock_penalty=True, distance_weight=6, direct_blocking_weight=3, indirect_blocking_weight=2, car_mobility_weight=4)
+        solver = Solver(rush_hour_game, use_distance_heuristic=True, use_direct_blocking_heuristic=True, use_indirect_blocking_heuristic=True, use_car_mobility_heuristic=True, use_deadlock_penalty=True, distance_weight=6, direct_blocking_weight=3, indirect_blocking_weight=2, car_mobility_weight=4)
         start_time = time.time()
-        solution_path = solver.bfs()
+        solution_path = solver.astar()
         end_time = time.time()
 
         if solution_path:
@@ -55,11 +94,11 @@ def run_algorithm(choice):
             print("No solution found.")
 
             
-    # ----------------------------------------------- Breadth-First Search ----------------------------------------------
-    elif choice == '4':
+    # ------------------------------------- Breadth-First Search, also bidirectional ------------------------------------
+    elif choice in ('4', '6'):
         rush_hour_game = RushHour()
         initial_state_hash = rush_hour_game.get_state_hashable()
-        solver = RushHourBFS(rush_hour_game)
+        solver = Solver(rush_hour_game)
         start_time = time.time()
         solution_path = solver.bfs()
 
@@ -82,7 +121,7 @@ def run_algorithm(choice):
     elif choice == '5':
         rush_hour_game = RushHour()
         start_time = time.time()
-        solver = RushHourDFS(rush_hour_game)
+        solver = Solver(rush_hour_game)
         solution_path = solver.depth_first_search()
         end_time = time.time()
 
@@ -99,18 +138,133 @@ def run_algorithm(choice):
             elapsed_time = end_time - start_time
             print(f"Time taken to solve the board: {elapsed_time:.2f} seconds")
 
+            # cut the loops and detours out of the solution
+            moves = load_shortcutter()(rush_hour_game).optimize_path_of_games(solution_path)
+            print(f"Solution shortened to {len(moves)} moves!")
+
         else:
             print("No solution found.")
 
+
+    # -------------------------------------------- Iterative Deepening A* ---------------------------------------------
+    # Only keeps the current path and a transposition table of a fixed size in memory, so it keeps running on the
+    # larger boards where the A* algorithms run out of memory, at the cost of searching states again.
+    elif choice == '7':
+        rush_hour_game = RushHour()
+        solver = Solver(rush_hour_game)
+        start_time = time.time()
+        solution_path = solver.ida_star()
+        end_time = time.time()
+
+        if solution_path is not None:
+            print("Solution sequence of moves:")
+            for move in solution_path:
+                print(move)
+            print(f"Solution found in {len(solution_path)} moves!")
+
+            elapsed_time = end_time - start_time
+            print(f"Time taken to solve the board: {elapsed_time:.2f} seconds")
+
+        else:
+            print("No solution found.")
+
+
+    # ---------------------------------------------- Anytime Weighted A* ----------------------------------------------
+    # Prints a first solution quickly and then shorter ones, each with a bound on how far it is from the shortest.
+    elif choice == '8':
+        rush_hour_game = RushHour()
+        solver = Solver(rush_hour_game)
+        start_time = time.time()
+        solution_path = solver.ara_star()
+        end_time = time.time()
+
+        if solution_path is not None:
+            print("Solution sequence of moves:")
+            for move in solution_path:
+                print(move)
+            print(f"Solution found in {len(solution_path)} moves!")
+
+            elapsed_time = end_time - start_time
+            print(f"Time taken to solve the board: {elapsed_time:.2f} seconds")
+
+        else:
+            print("No solution found.")
+
+
+    # ------------------------------------------- Precomputed Distance Table ------------------------------------------
+    # The first run on a board computes the distance to the exit of every reachable state and stores it on disk,
+    # after that every run only looks up the distances of the states on the way to the exit.
+    elif choice == '9':
+        rush_hour_game = RushHour()
+        start_time = time.time()
+        solver = Solver(rush_hour_game)
+        solution_path = solver.solve()
+        end_time = time.time()
+
+        if solution_path is not None:
+            print("Solution sequence of moves:")
+            for move in solution_path:
+                print(move)
+            print(f"Solution found in {len(solution_path)} moves!")
+
+            elapsed_time = end_time - start_time
+            print(f"Time taken to solve the board: {elapsed_time:.2f} seconds")
+
+        else:
+            print("No solution found.")
+
+
+
+    # -------------------------------------------------- Beam Search -------------------------------------------------
+    # Keeps only the best states of every depth, so its memory stays bounded on the larger boards. The solutions are
+    # not always the shortest, and a board can stay unsolved if the beam is too narrow.
+    elif choice == '10':
+        rush_hour_game = RushHour()
+        solver = Solver(rush_hour_game)
+        start_time = time.time()
+        solution_path = solver.beam_search()
+        end_time = time.time()
+
+        if solution_path is not None:
+            print("Solution sequence of moves:")
+            for move in solution_path:
+                print(move)
+            print(f"Solution found in {len(solution_path)} moves!")
+
+            elapsed_time = end_time - start_time
+            print(f"Time taken to solve the board: {elapsed_time:.2f} seconds")
+
+        else:
+            print("No solution found.")
+
+
+    # ------------------------------------------------ Solver Portfolio ----------------------------------------------
+    # Breadth-first search, depth-first search and both A* algorithms race on the board in their own processes. The
+    # first solution wins and the other solvers are stopped, after a minute all of them are stopped.
+    elif choice == '11':
+        rush_hour_game = RushHour()
+        solver = Solver(rush_hour_game, deadline=60)
+        start_time = time.time()
+        solution_path = solver.solve()
+        end_time = time.time()
+
+        if solution_path is not None:
+            print("Solution sequence of moves:")
+            for move in solution_path:
+                print(move)
+            print(f"Solution found in {len(solution_path)} moves by {solver.winner}!")
+
+            elapsed_time = end_time - start_time
+            print(f"Time taken to solve the board: {elapsed_time:.2f} seconds")
+
+        else:
+            print("No solution found.")
             
             
 if __name__ == "__main__":
     print("Choose an algorithm:")
-    print("1. Random Algorithm")
-    print("2. A* Algorithm")
-    print("3. A* Algorithm with customizable heuristics")
-    print("4. Breadth-First Search")
-    print("5. Depth-First Search")
+    for number, (name, _, _) in SOLVERS.items():
+        print(f"{number}. {name}")
 
     user_choice = input("Enter the number of the algorithm you want to run: ")
     run_algorithm(user_choice)